@@ -1,6 +1,6 @@
 from fastapi import APIRouter, FastAPI
 
-from app.api import chat_session, healthcheck
+from app.api import chat_message, chat_session, healthcheck
 from app.core.config import config
 
 
@@ -9,6 +9,7 @@ def add_routes(app: FastAPI, *, prefix=config.base_prefix) -> FastAPI:
 
     root_router.include_router(healthcheck.router)
     root_router.include_router(chat_session.router)
+    root_router.include_router(chat_message.router)
 
     app.include_router(root_router, prefix=prefix)
 
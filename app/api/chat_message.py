@@ -0,0 +1,39 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.dependencies import get_fields_dependency
+from app.core.enums import ApiTagEnum, TotalModeEnum
+from app.core.pagination import CursorPage
+from app.schemas.chat_message import ChatMessagePartialSchema, ChatMessageSchema, ChatMessageSearchResultSchema
+from app.services.chat_message import ChatMessageService
+
+router = APIRouter(
+    prefix="/messages",
+    tags=[ApiTagEnum.CHAT_MESSAGES],
+)
+
+
+@router.get("/by-document/{doc_id:path}", response_model=CursorPage[ChatMessagePartialSchema])
+async def get_document_messages(
+    # Document IDs may be paths or URLs
+    doc_id: str,
+    # `context` can be large, so it is only returned when requested explicitly
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatMessageSchema, exclude={"context"}))],
+    total_mode: Annotated[TotalModeEnum, Query()] = TotalModeEnum.NONE,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    return await message_service.get_all_by_document_id(doc_id=doc_id, total_mode=total_mode, fields=fields)
+
+
+@router.get("/search", response_model=CursorPage[ChatMessageSearchResultSchema])
+async def search_messages(
+    user_id: Annotated[UUID, Query()],
+    q: Annotated[str, Query(min_length=1, max_length=1000)],
+    total_mode: Annotated[TotalModeEnum, Query()] = TotalModeEnum.NONE,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    return await message_service.search(user_id=user_id, query=q, total_mode=total_mode)
@@ -1,19 +1,40 @@
+import codecs
+from collections.abc import AsyncIterator
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Header, Query, Request, Response, status
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.enums import ApiTagEnum
-from app.core.pagination import Page
-from app.schemas.chat_message import ChatMessageCreateSchema, ChatMessageDetailSchema, ChatMessageSchema
+from app.core.dependencies import get_fields_dependency, get_idempotency_request, get_session_maker
+from app.core.enums import ApiTagEnum, ChatSessionSortEnum, SortOrderEnum, TotalModeEnum
+from app.core.exceptions.exceptions import BadRequestError
+from app.core.pagination import CursorPage
+from app.core.schemas import IdempotencyRequestSchema
+from app.core.utils import format_server_sent_event
+from app.schemas.chat_message import (
+    ChatMessageChangesSchema,
+    ChatMessageCreateSchema,
+    ChatMessageDetailSchema,
+    ChatMessagePartialSchema,
+    ChatMessageSchema,
+    ChatMessageWindowSchema,
+)
 from app.schemas.chat_session import (
+    TITLE_MAX_LENGTH,
+    ChatSessionCreatedSchema,
     ChatSessionCreateSchema,
     ChatSessionDetailSchema,
+    ChatSessionPartialSchema,
     ChatSessionSchema,
     ChatSessionUpdateSchema,
 )
+from app.schemas.chat_session_summary import ChatSessionSummarySchema
 from app.services.chat_message import ChatMessageService
 from app.services.chat_session import ChatSessionService
+from app.services.chat_session_summary import ChatSessionSummaryService
+from app.services.idempotency_key import IdempotencyKeyService
 
 router = APIRouter(
     prefix="/sessions",
@@ -21,31 +42,81 @@ router = APIRouter(
 )
 
 
-@router.post("", response_model=ChatSessionDetailSchema, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=ChatSessionCreatedSchema, status_code=status.HTTP_201_CREATED)
 async def create_session(
     session_data: ChatSessionCreateSchema,
+    response: Response,
+    background_tasks: BackgroundTasks,
     *,
+    session_maker: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_maker)],
     service: Annotated[ChatSessionService, Depends()],
+    idempotency_service: Annotated[IdempotencyKeyService, Depends()],
+    idempotency_request: Annotated[IdempotencyRequestSchema | None, Depends(get_idempotency_request)],
 ):
-    return await service.create(obj=session_data)
+    if session_data.id is not None:
+        chat_session, created = await service.upsert(obj=session_data)
+
+        if not created:
+            response.status_code = status.HTTP_200_OK
+        else:
+            ChatSessionSummaryService.schedule_created_session(background_tasks, session_maker, chat_session)
+
+        return chat_session
+
+    if idempotency_request is None:
+        chat_session = await service.create(obj=session_data)
+        ChatSessionSummaryService.schedule_created_session(background_tasks, session_maker, chat_session)
+
+        return chat_session
+
+    result, replayed = await idempotency_service.get_or_create(
+        idempotency_request,
+        lambda: service.create(obj=session_data, autocommit=False),
+        ChatSessionCreatedSchema,
+    )
+    response.headers["Idempotent-Replayed"] = str(replayed).lower()
 
+    if not replayed:
+        ChatSessionSummaryService.schedule_created_session(
+            background_tasks, session_maker, ChatSessionCreatedSchema.model_validate(result)
+        )
 
-@router.get("/{session_id}", response_model=ChatSessionDetailSchema)
+    return result
+
+
+@router.get("/{session_id}", response_model=ChatSessionPartialSchema)
 async def get_session(
     session_id: UUID,
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatSessionDetailSchema))],
     *,
     service: Annotated[ChatSessionService, Depends()],
 ):
-    return await service.get(obj_id=session_id)
+    return await service.get(obj_id=session_id, fields=fields)
 
 
-@router.get("", response_model=Page[ChatSessionSchema])
+@router.get("", response_model=CursorPage[ChatSessionPartialSchema])
 async def get_user_sessions(
     user_id: Annotated[UUID, Query()],
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatSessionSchema))],
+    total_mode: Annotated[TotalModeEnum, Query()] = TotalModeEnum.NONE,
+    is_favorite: Annotated[bool | None, Query()] = None,
+    title_contains: Annotated[str | None, Query(max_length=TITLE_MAX_LENGTH)] = None,
+    fuzzy: Annotated[bool, Query(description="Also match titles with words similar to `title_contains`")] = False,
+    sort: Annotated[ChatSessionSortEnum, Query()] = ChatSessionSortEnum.LAST_ACTIVITY,
+    order: Annotated[SortOrderEnum, Query()] = SortOrderEnum.DESC,
     *,
     service: Annotated[ChatSessionService, Depends()],
 ):
-    return await service.get_all_by_user_id(user_id=user_id)
+    return await service.get_all_by_user_id(
+        user_id=user_id,
+        total_mode=total_mode,
+        fields=fields,
+        is_favorite=is_favorite,
+        title_contains=title_contains,
+        fuzzy=fuzzy,
+        sort=sort,
+        order=order,
+    )
 
 
 @router.patch("/{session_id}", response_model=ChatSessionDetailSchema)
@@ -71,22 +142,258 @@ async def delete_session(
 async def create_session_message(
     session_id: UUID,
     session_data: ChatMessageCreateSchema,
+    response: Response,
+    background_tasks: BackgroundTasks,
     *,
-    service: Annotated[ChatSessionService, Depends()],
+    session_maker: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_maker)],
     message_service: Annotated[ChatMessageService, Depends()],
+    idempotency_service: Annotated[IdempotencyKeyService, Depends()],
+    idempotency_request: Annotated[IdempotencyRequestSchema | None, Depends(get_idempotency_request)],
 ):
-    await service.get(obj_id=session_id)  # Check if ChatSession exists
     session_data.session_id = session_id
 
-    return await message_service.create(obj=session_data)
+    if session_data.id is not None:
+        message, created = await message_service.upsert(obj=session_data)
+
+        if not created:
+            response.status_code = status.HTTP_200_OK
+        else:
+            ChatSessionSummaryService.schedule(background_tasks, session_maker, [message])
+
+        return message
+
+    if idempotency_request is None:
+        message = await message_service.create(obj=session_data)
+        ChatSessionSummaryService.schedule(background_tasks, session_maker, [message])
+
+        return message
+
+    result, replayed = await idempotency_service.get_or_create(
+        idempotency_request,
+        lambda: message_service.create(obj=session_data, autocommit=False),
+        ChatMessageDetailSchema,
+    )
+    response.headers["Idempotent-Replayed"] = str(replayed).lower()
+
+    if not replayed:
+        ChatSessionSummaryService.schedule(
+            background_tasks, session_maker, [ChatMessageDetailSchema.model_validate(result)]
+        )
+
+    return result
+
+
+@router.post(
+    "/{session_id}/messages:batch",
+    response_model=list[ChatMessageDetailSchema],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_session_messages(
+    session_id: UUID,
+    messages_data: Annotated[list[ChatMessageCreateSchema], Body(min_length=1, max_length=200)],
+    response: Response,
+    background_tasks: BackgroundTasks,
+    *,
+    session_maker: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_maker)],
+    message_service: Annotated[ChatMessageService, Depends()],
+    idempotency_service: Annotated[IdempotencyKeyService, Depends()],
+    idempotency_request: Annotated[IdempotencyRequestSchema | None, Depends(get_idempotency_request)],
+):
+    for message_data in messages_data:
+        message_data.session_id = session_id
+
+    if idempotency_request is None:
+        messages = await message_service.create_many(objs=messages_data)
+        ChatSessionSummaryService.schedule(background_tasks, session_maker, messages)
 
+        return messages
 
-@router.get("/{session_id}/messages", response_model=Page[ChatMessageSchema])
+    result, replayed = await idempotency_service.get_or_create(
+        idempotency_request,
+        lambda: message_service.create_many(objs=messages_data, autocommit=False),
+        list[ChatMessageDetailSchema],
+    )
+    response.headers["Idempotent-Replayed"] = str(replayed).lower()
+
+    if not replayed:
+        ChatSessionSummaryService.schedule(
+            background_tasks, session_maker, [ChatMessageDetailSchema.model_validate(item) for item in result]
+        )
+
+    return result
+
+
+@router.get("/{session_id}/messages", response_model=CursorPage[ChatMessagePartialSchema])
 async def get_session_messages(
     session_id: UUID,
+    # `context` can be large, so it is only returned when requested explicitly
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatMessageSchema, exclude={"context"}))],
+    total_mode: Annotated[TotalModeEnum, Query()] = TotalModeEnum.NONE,
     *,
     service: Annotated[ChatSessionService, Depends()],
     message_service: Annotated[ChatMessageService, Depends()],
 ):
-    await service.get(obj_id=session_id)  # Check if ChatSession exists
-    return await message_service.get_all_by_session_id(session_id=session_id)
+    await service.get(obj_id=session_id, fields=["id"])  # Check if ChatSession exists
+    return await message_service.get_all_by_session_id(session_id=session_id, total_mode=total_mode, fields=fields)
+
+
+@router.get(
+    "/{session_id}/messages/since",
+    response_model=ChatMessageChangesSchema,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "No messages were added"}},
+)
+async def get_new_session_messages(
+    session_id: UUID,
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatMessageSchema, exclude={"context"}))],
+    after: Annotated[str | None, Query(description="Cursor of the last seen message")] = None,
+    size: Annotated[int, Query(ge=1, le=200)] = 20,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    # Unlike the message list, the session and its new messages are read by a single query, for frequent polling
+    result = await message_service.get_new_by_session_id(session_id=session_id, after=after, size=size, fields=fields)
+
+    if result is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
+    return result
+
+
+@router.get(
+    "/{session_id}/messages/stream",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+)
+async def stream_session_messages(
+    session_id: UUID,
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatMessageSchema, exclude={"context"}))],
+    after: Annotated[str | None, Query(description="Cursor of the last seen message")] = None,
+    last_event_id: Annotated[str | None, Header(description="Sent on reconnect, takes precedence over `after`")] = None,
+    size: Annotated[int, Query(ge=1, le=200)] = 20,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    stream = message_service.stream_new_by_session_id(
+        session_id=session_id, after=last_event_id or after, size=size, fields=fields
+    )
+    # The first read fails before the response starts, e.g. if the session does not exist
+    first_changes = await anext(stream)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            changes = first_changes
+
+            while True:
+                if changes is None:
+                    yield format_server_sent_event(None)
+                else:
+                    yield format_server_sent_event(changes.model_dump_json(), event="messages", event_id=changes.cursor)
+
+                changes = await anext(stream)
+
+        except StopAsyncIteration:
+            return
+
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxies must pass the events through as they are sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{session_id}/window", response_model=ChatMessageWindowSchema)
+async def get_session_window(
+    session_id: UUID,
+    max_tokens: Annotated[int, Query(ge=1, le=10_000_000, description="Budget of tokens of the returned messages")],
+    fields: Annotated[list[str], Depends(get_fields_dependency(ChatMessageSchema, exclude={"context"}))],
+    summary: Annotated[bool, Query(description="Start the window with the latest summary of the session")] = False,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    return await message_service.get_window_by_session_id(
+        session_id=session_id, max_tokens=max_tokens, fields=fields, with_summary=summary
+    )
+
+
+@router.get("/{session_id}/summary", response_model=ChatSessionSummarySchema)
+async def get_session_summary(
+    session_id: UUID,
+    *,
+    summary_service: Annotated[ChatSessionSummaryService, Depends()],
+):
+    return await summary_service.get_latest(session_id=session_id)
+
+
+@router.get("/{session_id}/messages/{message_id}", response_model=ChatMessageDetailSchema)
+async def get_session_message(
+    session_id: UUID,
+    message_id: UUID,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    return await message_service.get_session_message(session_id=session_id, message_id=message_id)
+
+
+@router.post(
+    "/{session_id}/messages/{message_id}/content",
+    status_code=status.HTTP_204_NO_CONTENT,
+    openapi_extra={"requestBody": {"required": True, "content": {"text/plain": {"schema": {"type": "string"}}}}},
+)
+async def append_session_message_content(
+    session_id: UUID,
+    message_id: UUID,
+    request: Request,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    # The body is read as it arrives, so a generated answer can be streamed to the message in a single request
+    async def chunks() -> AsyncIterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+
+        try:
+            async for data in request.stream():
+                if text := decoder.decode(data):
+                    yield text
+
+            if text := decoder.decode(b"", final=True):
+                yield text
+
+        except UnicodeDecodeError:
+            raise BadRequestError("Content is not valid UTF-8") from None
+
+    await message_service.append_content(session_id=session_id, message_id=message_id, chunks=chunks())
+
+
+@router.post("/{session_id}/messages/{message_id}:finalize", response_model=ChatMessageDetailSchema)
+async def finalize_session_message(
+    session_id: UUID,
+    message_id: UUID,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    return await message_service.finalize(session_id=session_id, message_id=message_id)
+
+
+@router.get("/{session_id}/messages/{message_id}/content", response_class=PlainTextResponse)
+async def get_session_message_content(
+    session_id: UUID,
+    message_id: UUID,
+    *,
+    message_service: Annotated[ChatMessageService, Depends()],
+):
+    message = await message_service.get_session_message(
+        session_id=session_id, message_id=message_id, load_offloaded=False
+    )
+
+    # Offloaded content is sent from its file, without reading it into memory
+    if (path := message_service.get_content_path(message)) is not None:
+        return FileResponse(path, media_type="text/plain; charset=utf-8")
+
+    if message.content_blob is not None:
+        (message,) = await message_service.load_offloaded([message])
+
+    return PlainTextResponse(message.content)
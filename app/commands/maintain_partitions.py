@@ -0,0 +1,66 @@
+"""
+Creates upcoming monthly partitions of `chat_message` and removes the expired ones.
+
+Partitions must exist before messages for their month arrive (rows without a partition go to the default one),
+so the command runs on startup and should be scheduled to run regularly, e.g. daily:
+
+    python -m app.commands.maintain_partitions [--months-ahead 3] [--retention-months 12] [--detach-only]
+
+The TOAST compression method of the message content and context is applied to all partitions as well
+(`--compression`, `MESSAGE_COMPRESSION`), the server default is used if it is not set, and expired idempotency keys
+are deleted.
+"""
+
+import argparse
+import asyncio
+
+from app.core.config import config
+from app.core.dependencies.db import engine, get_session_maker
+from app.core.enums import ToastCompressionEnum
+from app.core.logger import log
+from app.services.chat_message import ChatMessageService
+from app.services.idempotency_key import IdempotencyKeyService
+
+
+async def maintain_partitions(
+    months_ahead: int,
+    retention_months: int | None,
+    detach_only: bool,
+    compression: ToastCompressionEnum | None,
+) -> None:
+    async with get_session_maker()() as session:
+        service = ChatMessageService(session)
+        created, removed = await service.maintain_partitions(
+            months_ahead=months_ahead,
+            retention_months=retention_months,
+            detach_only=detach_only,
+        )
+        altered = await service.set_compression(compression)
+        purged_keys = await IdempotencyKeyService(session).purge_expired()
+
+    await engine.dispose()
+
+    log.info(
+        "chat_message partitions maintained",
+        created=created,
+        removed=removed,
+        detach_only=detach_only,
+        compression=compression,
+        altered_compression=altered,
+        purged_idempotency_keys=purged_keys,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=config.message_partitions_ahead)
+    parser.add_argument("--retention-months", type=int, default=config.message_retention_months)
+    parser.add_argument("--detach-only", action="store_true", help="keep expired partitions as standalone tables")
+    parser.add_argument("--compression", type=ToastCompressionEnum, default=config.message_compression)
+    args = parser.parse_args()
+
+    asyncio.run(maintain_partitions(args.months_ahead, args.retention_months, args.detach_only, args.compression))
+
+
+if __name__ == "__main__":
+    main()
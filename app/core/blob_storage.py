@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from pathlib import Path
+from uuid import uuid4
+
+from app.core.config import config
+from app.core.enums import BlobStorageEnum
+from app.core.exceptions.exceptions import NotFoundError
+
+BLOB_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStorage(ABC):
+    """
+    Storage of immutable binary objects, addressed by the SHA-256 of their content.
+    """
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """
+        Stores the data, storing the same data twice is a no-op.
+
+        :param data: The data to store.
+
+        :return: The key of the blob.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """
+        Reads the data of a blob.
+
+        :param key: The key of the blob.
+
+        :return: The data.
+
+        :raises NotFoundError: If the blob does not exist.
+        """
+
+    def get_path(self, key: str) -> Path | None:
+        """
+        Returns the local file of a blob, so that it can be sent without reading it into memory.
+
+        :param key: The key of the blob.
+
+        :return: Path of the file, or None if the backend doesn't keep blobs in local files.
+        """
+        return None
+
+    @staticmethod
+    def get_key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStorage(BlobStorage):
+    """
+    Keeps blobs in files of a local directory, under paths derived from their keys: `ab/cd/abcd...`.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def get_path(self, key: str) -> Path:
+        if not BLOB_KEY_PATTERN.match(key):
+            raise NotFoundError(detail="Blob not found", fields={"key": key})
+
+        return self.root / key[:2] / key[2:4] / key
+
+    def _write(self, path: Path, data: bytes) -> None:
+        if path.exists():
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Written to a temporary file first, so that readers never see a partially written blob
+        tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    async def put(self, data: bytes) -> str:
+        key = self.get_key(data)
+        await asyncio.to_thread(self._write, self.get_path(key), data)
+
+        return key
+
+    async def get(self, key: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self.get_path(key).read_bytes)
+
+        except FileNotFoundError:
+            raise NotFoundError(detail="Blob not found", fields={"key": key}) from None
+
+
+# Backends by `config.blob_storage`, other backends (e.g. object storages) can be plugged in here
+BLOB_STORAGES: dict[BlobStorageEnum, Callable[[], BlobStorage]] = {
+    BlobStorageEnum.LOCAL: lambda: LocalBlobStorage(config.blob_storage_path),
+}
+
+
+def get_blob_storage() -> BlobStorage:
+    return BLOB_STORAGES[config.blob_storage]()
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    In-process LRU cache whose entries expire after a time to live.
+
+    The cache is not shared between workers, so it can only be used as a front of a shared storage.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        :param maxsize: The maximum number of entries, the least recently used entry is evicted on overflow.
+        :param ttl: Default time to live of an entry, in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """
+        Returns the value of the key, if it is cached and has not expired.
+
+        :param key: The key to look up.
+
+        :return: The cached value or None.
+        """
+        if (item := self._data.get(key)) is None:
+            return None
+
+        expires_at, value = item
+
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+
+        return value
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        """
+        Caches the value of the key.
+
+        :param key: The key to cache the value for.
+        :param value: The value to cache.
+        :param ttl: Time to live of the entry in seconds, the cache default is used if not provided.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
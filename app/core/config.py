@@ -7,7 +7,7 @@ from pydantic import Field, computed_field, field_validator
 from pydantic_settings import BaseSettings as PydanticSettings
 from pydantic_settings import SettingsConfigDict
 
-from app.core.enums import AppEnvEnum
+from app.core.enums import AppEnvEnum, BlobStorageEnum, SummarizerEnum, ToastCompressionEnum, TokenizerEnum
 
 PROJECT_DIR = Path(__file__).parent.parent.parent
 
@@ -53,6 +53,50 @@ class Settings(BaseSettings):
 
     limiter_limit: str = "1/second"
 
+    # IDEMPOTENCY SETTINGS
+    idempotency_key_ttl: int = 24 * 60 * 60  # seconds
+    idempotency_cache_size: int = 10_000
+    idempotency_purge_batch_size: int = 1000  # expired keys deleted per statement by the maintenance command
+
+    # CONTEXT CHUNK SETTINGS
+    context_chunk_min_size: int = 128  # bytes, smaller chunks are kept inline as a reference would save nothing
+    context_chunk_cache_size: int = 10_000
+
+    # BLOB STORAGE SETTINGS
+    blob_storage: BlobStorageEnum = BlobStorageEnum.LOCAL
+    blob_storage_path: Path = PROJECT_DIR / "blobs"  # root directory of the LOCAL backend
+    blob_offload_threshold: int = 64 * 1024  # bytes, larger message content and context are moved to the blob storage
+    blob_content_preview_length: int = 1000  # characters of offloaded content kept in the table
+
+    # CHAT SESSION SETTINGS
+    session_preview_length: int = 200  # characters of the last message content kept in `last_message_preview`
+
+    # MESSAGE STREAM SETTINGS
+    message_stream_keepalive_interval: float = 15  # seconds of inactivity after which a stream sends a comment
+    # Content appended to a streaming message is stored in batches of this many characters, or after this many seconds
+    message_chunk_flush_size: int = 4096
+    message_chunk_flush_interval: float = 0.5
+
+    # CONTEXT WINDOW SETTINGS
+    # Counts the tokens of messages when they are stored, changing it doesn't recount the stored messages
+    tokenizer: TokenizerEnum = TokenizerEnum.WORDS
+
+    # SESSION SUMMARY SETTINGS
+    summarizer: SummarizerEnum = SummarizerEnum.TRUNCATE
+    # The history is compacted every this many messages, the latest messages (at least as many) are left out
+    summary_interval: int = 50
+    summary_max_length: int = 4000  # characters of a summary kept by the TRUNCATE summarizer
+
+    # SEARCH SETTINGS
+    # `ts_headline` options of result snippets, fragment mode (`MaxFragments`) cuts short messages down to the matches
+    search_snippet_options: str = "MaxWords=35, MinWords=15"
+
+    # PARTITIONING SETTINGS
+    message_partitions_ahead: int = 3  # months to create `chat_message` partitions for in advance
+    message_retention_months: int | None = None  # messages are kept forever by default
+    # TOAST compression of `chat_message.content` and `context`, the server `default_toast_compression` if not set
+    message_compression: ToastCompressionEnum | None = None
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def internal_env(self) -> bool:
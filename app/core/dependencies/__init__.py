@@ -1,5 +1,10 @@
 __all__ = [
     "get_db_session",
+    "get_fields_dependency",
+    "get_idempotency_request",
+    "get_session_maker",
 ]
 
-from app.core.dependencies.db import get_db_session
+from app.core.dependencies.db import get_db_session, get_session_maker
+from app.core.dependencies.fields import get_fields_dependency
+from app.core.dependencies.idempotency import get_idempotency_request
@@ -0,0 +1,41 @@
+from collections.abc import Callable, Iterable
+from typing import Annotated
+
+from fastapi import Query
+from pydantic import BaseModel
+
+from app.core.exceptions.exceptions import UnprocessableEntityError
+
+
+def get_fields_dependency(schema: type[BaseModel], *, exclude: Iterable[str] = ()) -> Callable[..., list[str]]:
+    """
+    Creates a dependency that reads the `fields` query parameter: a comma-separated list of fields to return.
+
+    :param schema: Schema the fields are picked from.
+    :param exclude: Fields that are only returned when requested explicitly, e.g. large ones.
+
+    :return: Dependency returning the names of the fields to return.
+    """
+    available = list(schema.model_fields)
+    default = [field for field in available if field not in set(exclude)]
+
+    def get_fields(
+        fields: Annotated[
+            str | None,
+            Query(description=f"Comma-separated fields to return, out of: {', '.join(available)}"),
+        ] = None,
+    ) -> list[str]:
+        if fields is None:
+            return default
+
+        requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+
+        if not requested:
+            return default
+
+        if unknown := [field for field in requested if field not in available]:
+            raise UnprocessableEntityError("Unknown fields requested", fields={"fields": ",".join(unknown)})
+
+        return requested
+
+    return get_fields
@@ -0,0 +1,27 @@
+import hashlib
+from typing import Annotated
+
+from fastapi import Header, Request
+
+from app.core.schemas import IdempotencyRequestSchema
+
+
+async def get_idempotency_request(
+    request: Request,
+    idempotency_key: Annotated[str | None, Header(min_length=1, max_length=255)] = None,
+) -> IdempotencyRequestSchema | None:
+    """
+    Reads the `Idempotency-Key` header and fingerprints the request it was sent with.
+
+    :return: The key with the request hash, or None if the header is not provided.
+    """
+    if idempotency_key is None:
+        return None
+
+    request_hash = hashlib.sha256()
+
+    for part in (request.method.encode(), request.url.path.encode(), await request.body()):
+        request_hash.update(part)
+        request_hash.update(b"\0")
+
+    return IdempotencyRequestSchema(key=idempotency_key, request_hash=request_hash.hexdigest())
@@ -24,6 +24,63 @@ class SenderTypeEnum(StrEnum):
     AI = "AI"
 
 
+class TotalModeEnum(StrEnum):
+    """
+    Enum for the way paginated endpoints calculate the total number of items
+    """
+
+    NONE = "NONE"  # Total is not calculated, `has_next` / `next_page` are used instead
+    EXACT = "EXACT"  # Exact total, taken from a maintained counter when the repository has one
+    ESTIMATE = "ESTIMATE"  # Query planner estimate
+
+
+class ChatSessionSortEnum(StrEnum):
+    """
+    Enum for the orders of the user session list
+    """
+
+    LAST_ACTIVITY = "LAST_ACTIVITY"
+    CREATED = "CREATED"
+
+
+class SortOrderEnum(StrEnum):
+    ASC = "ASC"
+    DESC = "DESC"
+
+
+class BlobStorageEnum(StrEnum):
+    """
+    Enum for backends of the blob storage, see `app.core.blob_storage`
+    """
+
+    LOCAL = "LOCAL"
+
+
+class TokenizerEnum(StrEnum):
+    """
+    Enum for tokenizers counting the tokens of messages, see `app.core.tokenizer`
+    """
+
+    WORDS = "WORDS"
+
+
+class SummarizerEnum(StrEnum):
+    """
+    Enum for summarizers compacting the history of sessions, see `app.core.summarizer`
+    """
+
+    TRUNCATE = "TRUNCATE"
+
+
+class ToastCompressionEnum(StrEnum):
+    """
+    Enum for compression methods of large column values stored by Postgres TOAST
+    """
+
+    PGLZ = "PGLZ"
+    LZ4 = "LZ4"  # Faster than PGLZ, requires a server built with lz4 support
+
+
 class PGErrorCodeEnum(StrEnum):
     """
     Enum for pg_code exception codes
@@ -0,0 +1,53 @@
+import hashlib
+import json
+from typing import Any
+
+# Key of the `ChatMessage.context` list with retrieved chunks, they are stored once per distinct content
+CHUNKS_KEY = "chunks"
+
+# Key of the reference a stored chunk is replaced with in the context: {"$chunk": "<hash>"}
+CHUNK_REF_KEY = "$chunk"
+
+# Key of the ID of the source document a chunk was retrieved from
+DOCUMENT_ID_KEY = "doc_id"
+
+
+def normalize_chunk(chunk: Any) -> bytes:
+    """
+    Serializes a chunk into canonical JSON, so that equal chunks have the same bytes regardless of key order.
+
+    :param chunk: JSON-serializable chunk.
+
+    :return: UTF-8 encoded canonical JSON.
+    """
+    return json.dumps(chunk, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def get_chunk_hash(normalized_chunk: bytes) -> str:
+    return hashlib.sha256(normalized_chunk).hexdigest()
+
+
+def get_document_ids(context: Any) -> list[str]:
+    """
+    Returns the IDs of the documents cited by the inline chunks of a context, without duplicates.
+
+    :param context: Message context.
+
+    :return: Document IDs in the order of the chunks, numeric IDs are converted to strings.
+    """
+    if not isinstance(context, dict) or not isinstance(chunks := context.get(CHUNKS_KEY), list):
+        return []
+
+    document_ids = (chunk.get(DOCUMENT_ID_KEY) for chunk in chunks if isinstance(chunk, dict))
+
+    return list(dict.fromkeys(str(i) for i in document_ids if isinstance(i, str | int) and not isinstance(i, bool)))
+
+
+def get_chunk_ref(chunk: Any) -> str | None:
+    """
+    Returns the hash a chunk reference points to, or None if the value is an inline chunk.
+    """
+    if isinstance(chunk, dict) and len(chunk) == 1 and isinstance(ref := chunk.get(CHUNK_REF_KEY), str):
+        return ref
+
+    return None
@@ -1,7 +1,10 @@
+import json
 import re
 from typing import NoReturn, Type
 
+from sqlalchemy import Select
 from sqlalchemy.exc import DBAPIError, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import PGErrorCodeEnum
 from app.core.exceptions import BaseError
@@ -73,3 +76,25 @@ def raise_db_error(ex: DBAPIError) -> NoReturn:
         raise error_class(fields=extract_field_values_from_pg_error(", ".join(ex.orig.args)))
 
     raise ex
+
+
+async def estimate_count(session: AsyncSession, stmt: Select) -> int:
+    """
+    Returns the query planner estimate of the number of rows matched by the query.
+
+    The estimate relies on table statistics, so it is cheap but may be inaccurate for stale statistics.
+
+    :param session: Database session.
+    :param stmt: Query to estimate.
+
+    :return: Estimated number of rows.
+    """
+    connection = await session.connection()
+    compiled = stmt.order_by(None).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return plan[0]["Plan"]["Plan Rows"]
@@ -0,0 +1,200 @@
+import re
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+# Names of partitions created by these helpers and by migrations: monthly, default and legacy (pre-partitioning data)
+PARTITION_NAME_PATTERN = re.compile(r"^.+_(p\d{6}|default|legacy)$")
+
+# Matches bounds like "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO (MAXVALUE)"
+PARTITION_BOUNDS_PATTERN = re.compile(r"FROM \((?:'([^']+)'|MINVALUE)\) TO \((?:'([^']+)'|MAXVALUE)\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    is_default: bool
+    lower_bound: datetime | None  # None for MINVALUE
+    upper_bound: datetime | None  # None for MAXVALUE
+
+    def overlaps(self, lower_bound: datetime, upper_bound: datetime) -> bool:
+        return (
+            not self.is_default
+            and (self.lower_bound is None or self.lower_bound < upper_bound)
+            and (self.upper_bound is None or self.upper_bound > lower_bound)
+        )
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """
+    Returns the first moment of the month of the value, shifted by a number of months.
+
+    :param value: Timezone-aware datetime.
+    :param months: Number of months to shift by, can be negative.
+
+    :return: Start of the month in UTC.
+    """
+    value = value.astimezone(UTC)
+    month_index = value.year * 12 + value.month - 1 + months
+
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=UTC)
+
+
+def get_partition_name(table: str, lower_bound: datetime) -> str:
+    return f"{table}_p{lower_bound:%Y%m}"
+
+
+async def get_partitions(session: AsyncSession | AsyncConnection, table: str) -> list[Partition]:
+    """
+    Returns partitions of a table partitioned by a timestamp range.
+
+    :param session: Database session or connection.
+    :param table: Name of the partitioned table.
+
+    :return: Partitions, ordered by name.
+    """
+    result = await session.execute(
+        text(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = CAST(:table AS regclass)
+            ORDER BY child.relname
+            """,
+        ),
+        {"table": table},
+    )
+
+    partitions = []
+
+    for name, bound in result.all():
+        lower_bound = upper_bound = None
+
+        if match := PARTITION_BOUNDS_PATTERN.search(bound):
+            lower_bound, upper_bound = (datetime.fromisoformat(value) if value else None for value in match.groups())
+
+        partitions.append(Partition(name, bound == "DEFAULT", lower_bound, upper_bound))
+
+    return partitions
+
+
+async def create_monthly_partitions(
+    session: AsyncSession | AsyncConnection,
+    table: str,
+    start: datetime,
+    months: int,
+) -> list[str]:
+    """
+    Creates missing monthly partitions, starting from the month of `start`.
+
+    Months already covered by other partitions (e.g. a legacy partition with all the older rows) are skipped.
+
+    :param session: Database session or connection.
+    :param table: Name of the table partitioned by a timestamp range.
+    :param start: Any moment of the first month to create a partition for.
+    :param months: Number of months to create partitions for.
+
+    :return: Names of the created partitions.
+    """
+    partitions = await get_partitions(session, table)
+    created = []
+
+    for month in range(months):
+        lower_bound, upper_bound = month_start(start, month), month_start(start, month + 1)
+
+        if any(partition.overlaps(lower_bound, upper_bound) for partition in partitions):
+            continue
+
+        name = get_partition_name(table, lower_bound)
+
+        await session.execute(
+            text(
+                f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{lower_bound.isoformat()}') TO ('{upper_bound.isoformat()}')",
+            ),
+        )
+        created.append(name)
+
+    return created
+
+
+async def create_default_partition(session: AsyncSession | AsyncConnection, table: str) -> None:
+    """
+    Creates a partition for rows that don't fit into any other partition, if it doesn't exist.
+
+    The default partition should stay empty: a partition can't be created for a range the default one has rows in.
+    """
+    await session.execute(text(f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}" DEFAULT'))
+
+
+async def remove_partition(
+    session: AsyncSession | AsyncConnection,
+    table: str,
+    name: str,
+    *,
+    detach_only: bool,
+) -> None:
+    """
+    Detaches a partition from its table and drops it.
+
+    :param session: Database session or connection.
+    :param table: Name of the partitioned table.
+    :param name: Name of the partition.
+    :param detach_only: If True, the partition is kept as a standalone table, e.g. to be archived.
+    """
+    await session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+
+    if not detach_only:
+        await session.execute(text(f'DROP TABLE "{name}"'))
+
+
+async def set_column_compression(
+    session: AsyncSession | AsyncConnection,
+    table: str,
+    columns: Sequence[str],
+    method: str | None,
+) -> list[str]:
+    """
+    Sets the TOAST compression method of columns of a partitioned table and all its partitions.
+
+    New partitions inherit the method of the table, but changing it doesn't propagate to the existing ones.
+    Only new values are compressed with the method, the stored ones are kept as they are. Tables that already use
+    the method are not altered, so that the exclusive lock is only taken when something changes.
+
+    :param session: Database session or connection.
+    :param table: Name of the partitioned table.
+    :param columns: Names of the columns.
+    :param method: Compression method, e.g. `lz4`, or None for the server `default_toast_compression`.
+
+    :return: Names of the altered tables.
+    """
+    method = method.lower() if method else "default"
+
+    result = await session.execute(
+        text(
+            """
+            SELECT DISTINCT relation.relname
+            FROM pg_class AS relation
+            JOIN pg_attribute ON pg_attribute.attrelid = relation.oid
+            WHERE (
+                    relation.oid = CAST(:table AS regclass)
+                    OR relation.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))
+                )
+                AND pg_attribute.attname = ANY(:columns)
+                -- "char" codes of the methods: 'p' for pglz, 'l' for lz4 and '' for the server default
+                AND CAST(pg_attribute.attcompression AS text) <> :code
+            ORDER BY relation.relname
+            """,
+        ),
+        {"table": table, "columns": list(columns), "code": "" if method == "default" else method[0]},
+    )
+    altered = list(result.scalars().all())
+
+    for name in altered:
+        alterations = ", ".join(f'ALTER COLUMN "{column}" SET COMPRESSION {method}' for column in columns)
+        await session.execute(text(f'ALTER TABLE "{name}" {alterations}'))
+
+    return altered
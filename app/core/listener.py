@@ -0,0 +1,138 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anyio
+import asyncpg
+from sqlalchemy import make_url
+
+from app.core.config import config
+from app.core.logger import log
+
+
+class Subscription:
+    """
+    Wake-up signal of a subscriber of a `NotificationListener` key.
+
+    Notifications are not queued: the ones that arrive while the subscriber is busy collapse into a single pending
+    wake-up, so a slow subscriber holds no memory and never delays the listener or the other subscribers.
+    """
+
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+
+    async def wait(self, seconds: float) -> bool:
+        """
+        Waits for a notification that has arrived since the previous wait.
+
+        :param seconds: Maximal time to wait.
+
+        :return: False if the time is out.
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), seconds)
+
+        except TimeoutError:
+            return False
+
+        self._event.clear()
+
+        return True
+
+
+class NotificationListener:
+    """
+    Listens to a Postgres notification channel for all subscribers of the worker, on a single connection.
+
+    The payload of a notification is a key (e.g. the ID of a session), and subscribers of the key are woken up.
+    The connection is opened by the first subscriber and closed after the last one leaves. If it is lost, all the
+    subscribers are woken up, as notifications could have been missed, and the next subscriber reconnects.
+    """
+
+    def __init__(self, channel: str):
+        """
+        :param channel: The name of the channel.
+        """
+        self.channel = channel
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._connection: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    @asynccontextmanager
+    async def subscribe(self, key: str) -> AsyncIterator[Subscription]:
+        """
+        Subscribes to notifications with the key for the duration of the context.
+
+        :param key: The payload of the notifications to wake up on.
+        """
+        subscription = Subscription()
+        self._subscriptions.setdefault(key, set()).add(subscription)
+
+        try:
+            await self.connect()
+            yield subscription
+
+        finally:
+            subscriptions = self._subscriptions[key]
+            subscriptions.discard(subscription)
+
+            if not subscriptions:
+                del self._subscriptions[key]
+
+            if not self._subscriptions:
+                # Subscribers leave when their requests are cancelled, the connection must be closed nonetheless
+                with anyio.CancelScope(shield=True):
+                    await self.close()
+
+    async def wait(self, subscription: Subscription, seconds: float) -> bool:
+        """
+        Waits for a notification of a subscription, reconnecting first if the connection is lost.
+
+        :param subscription: The subscription to wait for.
+        :param seconds: Maximal time to wait.
+
+        :return: False if the time is out.
+        """
+        await self.connect()
+
+        return await subscription.wait(seconds)
+
+    async def connect(self) -> None:
+        async with self._lock:
+            if self._connection is not None and not self._connection.is_closed():
+                return
+
+            dsn = make_url(config.db.pg_dsn).set(drivername="postgresql").render_as_string(hide_password=False)
+            connection = await asyncpg.connect(dsn)
+            connection.add_termination_listener(self._on_termination)
+            await connection.add_listener(self.channel, self._on_notification)
+
+            self._connection = connection
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._connection is None:
+                return
+
+            connection, self._connection = self._connection, None
+            connection.remove_termination_listener(self._on_termination)
+            await connection.close()
+
+    def _on_notification(self, _connection: asyncpg.Connection, _pid: int, _channel: str, payload: str) -> None:
+        for subscription in self._subscriptions.get(payload, ()):
+            subscription.notify()
+
+    def _on_termination(self, _connection: asyncpg.Connection) -> None:
+        log.warning("Notification listener connection lost", channel=self.channel)
+        self._connection = None
+
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.notify()
@@ -1,16 +1,17 @@
 from abc import ABC
-from typing import Any, Generic, Type
+from collections.abc import Sequence
+from typing import Any, Generic, Type, cast
 from uuid import UUID
 
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import Select, delete, select, update
+from sqlalchemy import Select, delete, func, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import DBAPIError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.enums import TotalModeEnum
 from app.core.exceptions.exceptions import NotFoundError
-from app.core.helpers.db import raise_db_error
-from app.core.pagination import Page
+from app.core.helpers.db import estimate_count, raise_db_error
+from app.core.pagination import Page, fetch_all, paginate_by_offset
 from app.core.types import Model, Schema
 
 
@@ -24,35 +25,80 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_query(self) -> Select:
+    def get_query(self, fields: Sequence[str] | None = None) -> Select:
         """
         Returns a query object for the model.
 
+        :param fields: Names of the columns to select, e.g. to skip large columns. If not provided, model objects
+                       are selected, otherwise the query returns rows with the columns.
+
         :return: Query object.
         """
-        return select(self.sql_model)
+        if fields is None:
+            return select(self.sql_model)
+
+        return select(*(getattr(self.sql_model, field) for field in dict.fromkeys(fields)))
+
+    async def get_total(self, stmt: Select, total_mode: TotalModeEnum, **kwargs: Any) -> int | None:
+        """
+        Calculates the total number of objects matched by the query.
+
+        Repositories that maintain counters for their listings should use them for the `EXACT` mode
+        instead of this COUNT(*) fallback.
+
+        :param stmt: Filtered query.
+        :param total_mode: The way to calculate the total.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The total number of objects, or None if the total is not requested.
+        """
+        if total_mode == TotalModeEnum.EXACT:
+            return await self.session.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
 
-    async def get_all(self, raw_result: bool = False, **kwargs: Any) -> Page[Schema] | list[Model]:  # type: ignore
+        if total_mode == TotalModeEnum.ESTIMATE:
+            return await estimate_count(self.session, stmt)
+
+        return None
+
+    async def get_all(  # type: ignore
+        self,
+        raw_result: bool = False,
+        *,
+        total_mode: TotalModeEnum = TotalModeEnum.EXACT,
+        fields: Sequence[str] | None = None,
+        **kwargs: Any,
+    ) -> Page[Schema] | list[Model]:
         """
         This method retrieves all objects from the database.
 
         :param raw_result: A flag that determines whether to return a list of raw results without pagination.
                            If True, a list of raw results will be returned.
                            If False, a Page object with paginated results will be returned. Default is False.
+        :param total_mode: The way to calculate the total number of objects for paginated results.
+        :param fields: Names of the columns to select, whole objects are selected if not provided.
         :param kwargs: Additional keyword arguments.
 
         :return: A Page object with paginated results if raw_result is False, otherwise a list of raw results.
 
         :raises NoResultFound: If no objects are found in the database.
         """
-        stmt = self.get_query()
+        stmt = self.get_query(fields).order_by(self.sql_model.created_at, self.sql_model.id)
 
         if raw_result:
-            return (await self.session.scalars(stmt)).unique().all()
+            return await fetch_all(self.session, stmt)
+
+        total = await self.get_total(stmt, total_mode)
 
-        return await paginate(self.session, stmt)
+        return await paginate_by_offset(self.session, stmt, total=total, total_mode=total_mode)
 
-    async def get(self, obj_id: int | UUID, *, raise_error: bool = True, **kwargs: Any) -> Model | None:
+    async def get(
+        self,
+        obj_id: int | UUID,
+        *,
+        raise_error: bool = True,
+        fields: Sequence[str] | None = None,
+        **kwargs: Any,
+    ) -> Model | None:
         """
         This method retrieves an object from the database using its ID.
 
@@ -60,6 +106,8 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
         :param raise_error: A flag that determines whether an error should be raised if the object is not found.
                             If True, a NotFoundError will be raised when the object is not found.
                             If False, the method will return None when the object is not found. Default is True.
+        :param fields: Names of the columns to select. If provided, a row with the columns is returned instead of
+                       the object.
         :param kwargs: Additional keyword arguments.
 
         :return: The retrieved object if it exists. If the object does not exist and raise_error is False, the method
@@ -67,9 +115,9 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
 
         :raises NotFoundError: If raise_error is True and the object is not found in the database.
         """
-        stmt = self.get_query().filter_by(id=obj_id)
+        stmt = self.get_query(fields).filter(self.sql_model.id == obj_id)
 
-        if not (result := await self.session.scalar(stmt)) and raise_error:
+        if not (result := next(iter(await fetch_all(self.session, stmt)), None)) and raise_error:
             raise NotFoundError(detail=f"{self.sql_model.__name__} object with {obj_id=!s} not found.")
 
         return result
@@ -79,10 +127,14 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
         stmt,
         obj_id: int | UUID | None = None,
         *,
-        is_unique: bool = True,
+        is_unique: bool = False,
         autocommit: bool = False,
     ) -> Model:
-        """Internal method to store changes in DB."""
+        """
+        Internal method to store changes in DB.
+
+        The statement is expected to return the whole row with RETURNING, so no additional SELECT is needed.
+        """
         try:
             result = await self.session.execute(stmt)
 
@@ -96,8 +148,6 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
             else:
                 await self.session.flush()
 
-            await self.session.refresh(result)
-
         except DBAPIError as ex:
             await self.session.rollback()
             raise_db_error(ex)
@@ -107,12 +157,40 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
 
         return result
 
+    async def _apply_bulk_changes(
+        self,
+        stmt,
+        params: list[dict] | None = None,
+        *,
+        is_unique: bool = False,
+        autocommit: bool = False,
+    ) -> list[Model]:
+        """Internal method to store changes of multiple rows in DB."""
+        try:
+            result = await self.session.execute(stmt, params)
+
+            if is_unique:
+                result = result.unique()
+
+            result = result.scalars().all()
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        return result
+
     async def create(
         self,
         obj_data: dict,
         *,
         autocommit: bool = True,
-        is_unique: bool = True,
+        is_unique: bool = False,
         **kwargs: Any,
     ) -> Model:
         """
@@ -121,6 +199,7 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
         :param obj_data: The object to create.
         :param autocommit: If True, commit changes immediately, otherwise flush changes.
         :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
+                          Only needed for models with joined eager loads.
         :param kwargs: Additional keyword arguments.
 
         :return: The created object.
@@ -130,13 +209,93 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
 
         return await self._apply_changes(stmt=stmt, autocommit=autocommit, is_unique=is_unique)
 
+    async def create_many(
+        self,
+        objs_data: list[dict],
+        *,
+        autocommit: bool = True,
+        is_unique: bool = False,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Creates entities in the database with a multi-row INSERT and returns the created objects.
+
+        :param objs_data: The objects to create.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+        :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
+                          Only needed for models with joined eager loads.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The created objects, in the order of `objs_data`.
+        """
+        if not objs_data:
+            return []
+
+        # Rows are sent as a single INSERT ... VALUES (...), (...) RETURNING statement,
+        # `sort_by_parameter_order` guarantees that the returned objects match the order of `objs_data`
+        stmt = insert(self.sql_model).returning(self.sql_model, sort_by_parameter_order=True)
+
+        return await self._apply_bulk_changes(stmt=stmt, params=objs_data, autocommit=autocommit, is_unique=is_unique)
+
+    async def upsert(
+        self,
+        obj_data: dict,
+        *,
+        autocommit: bool = True,
+        is_unique: bool = False,
+        **kwargs: Any,
+    ) -> tuple[Model, bool]:
+        """
+        Creates an entity with a client-supplied ID, or returns the stored entity if the ID is already taken.
+
+        Re-sending the same object is a no-op: the insert is skipped by ON CONFLICT DO NOTHING, and the stored
+        object is returned as is, without being updated.
+
+        :param obj_data: The object to create, including its `id`.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+        :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
+                          Only needed for models with joined eager loads.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The stored object and a flag that tells whether it was created.
+        """
+        stmt = (
+            insert(self.sql_model)
+            .values(**obj_data)
+            .on_conflict_do_nothing(index_elements=[self.sql_model.id])
+            .returning(self.sql_model)
+        )
+
+        try:
+            result = await self.session.execute(stmt)
+
+            if is_unique:
+                result = result.unique()
+
+            result = result.scalar_one_or_none()
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        if result is not None:
+            return result, True
+
+        # `get` raises NotFoundError instead of returning None, e.g. if the stored object was deleted meanwhile
+        return cast(Model, await self.get(obj_data["id"])), False
+
     async def update(
         self,
         obj_id: int | UUID,
         obj_data: dict,
         *,
         autocommit: bool = True,
-        is_unique: bool = True,
+        is_unique: bool = False,
         **kwargs: Any,
     ) -> Model:
         """
@@ -146,6 +305,7 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
         :param obj_data: The object data to update.
         :param autocommit: If True, commit changes immediately, otherwise flush changes.
         :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
+                          Only needed for models with joined eager loads.
         :param kwargs: Additional keyword arguments.
 
         :returns: The updated object.
@@ -166,12 +326,10 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
         :raises DBAPIError: If there is an error during database operations.
         :raises NotFoundError: If item does not exist in database.
         """
-        await self.get(obj_id=obj_id)
-
-        stmt = delete(self.sql_model).filter_by(id=obj_id)
+        stmt = delete(self.sql_model).filter_by(id=obj_id).returning(self.sql_model.id)
 
         try:
-            await self.session.execute(stmt)
+            (await self.session.execute(stmt)).scalar_one()
 
             if autocommit:
                 await self.session.commit()
@@ -181,3 +339,6 @@ class CRUDRepositoryMixin(ABC, Generic[Model, Schema]):
         except DBAPIError as ex:
             await self.session.rollback()
             raise_db_error(ex)
+
+        except NoResultFound:
+            raise NotFoundError(detail=f"{self.sql_model.__name__} object with {obj_id=!s} not found.")
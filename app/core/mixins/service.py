@@ -61,7 +61,47 @@ class CRUDServiceMixin(ABC, Generic[Repository, Model, Schema]):
 
         :return: Created entity.
         """
-        return await self.repository.create(obj.model_dump(), autocommit=autocommit, **kwargs)
+        return await self.repository.create(obj.model_dump(exclude_none=True), autocommit=autocommit, **kwargs)
+
+    async def create_many(
+        self,
+        objs: list[CreateSchema],
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Creates entities in the database in a single transaction, and returns the created objects.
+
+        :param objs: Pydantic models.
+        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Created entities, in the order of `objs`.
+        """
+        return await self.repository.create_many(
+            [obj.model_dump(exclude_none=True) for obj in objs],
+            autocommit=autocommit,
+            **kwargs,
+        )
+
+    async def upsert(
+        self,
+        obj: CreateSchema,
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> tuple[Model, bool]:
+        """
+        Creates an entity with a client-supplied ID, or returns the stored entity with the same ID.
+
+        :param obj: Pydantic model with the `id` field set.
+        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The stored entity and a flag that tells whether it was created.
+        """
+        return await self.repository.upsert(obj.model_dump(exclude_none=True), autocommit=autocommit, **kwargs)
 
     async def update(self, obj_id: int | UUID, obj: UpdateSchema, *, autocommit: bool = True, **kwargs: Any) -> Model:
         """
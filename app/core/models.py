@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, ClassVar
 from uuid import UUID, uuid4
 
 from sqlalchemy import DOUBLE_PRECISION, DateTime, Integer, String, func
@@ -27,13 +27,20 @@ class Base(AsyncAttrs, DeclarativeBase):
 
 
 class CommonMixin:
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    # Generator of primary keys, models with high insert rates should use the time-ordered `uuid7`
+    id_factory: ClassVar[Callable[[], UUID]] = uuid4
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=func.current_timestamp(),
         server_default=func.current_timestamp(),
     )
 
+    @declared_attr
+    @classmethod
+    def id(cls) -> Mapped[UUID]:
+        return mapped_column(primary_key=True, default=cls.id_factory)
+
     @declared_attr.directive
     @classmethod
     def __tablename__(cls) -> str:
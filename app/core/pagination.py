@@ -1,12 +1,199 @@
-from typing import TypeVar
+import json
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from fastapi import Query
+from fastapi.encoders import jsonable_encoder
 from fastapi_pagination import Page as FastAPIPaginationPage
-from fastapi_pagination.customization import CustomizedPage, UseParamsFields
+from fastapi_pagination.api import create_page, resolve_params
+from fastapi_pagination.cursor import CursorPage as FastAPIPaginationCursorPage
+from fastapi_pagination.cursor import decode_cursor, encode_cursor
+from fastapi_pagination.customization import (
+    CustomizedPage,
+    UseAdditionalFields,
+    UseIncludeTotal,
+    UseParamsFields,
+)
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.enums import TotalModeEnum
+from app.core.exceptions.exceptions import BadRequestError
 
 T = TypeVar("T")
 
-Page = CustomizedPage[
-    FastAPIPaginationPage[T],
-    UseParamsFields(size=Query(20, ge=1, le=200)),
-]
+if TYPE_CHECKING:
+    # `CustomizedPage` builds the page classes at runtime, type checkers see the pages they customize
+    class Page(FastAPIPaginationPage[T]): ...
+
+    class CursorPage(FastAPIPaginationCursorPage[T]): ...
+else:
+    # Totals are calculated by repositories according to the requested `TotalModeEnum`,
+    # `total_mode` tells the client which kind of total (if any) the page carries.
+    Page = CustomizedPage[
+        FastAPIPaginationPage[T],
+        UseParamsFields(size=Query(20, ge=1, le=200)),
+        UseIncludeTotal(False),
+        UseAdditionalFields(total_mode=(TotalModeEnum, TotalModeEnum.NONE), has_next=(bool, False)),
+    ]
+
+    CursorPage = CustomizedPage[
+        FastAPIPaginationCursorPage[T],
+        UseParamsFields(size=Query(20, ge=1, le=200)),
+        UseIncludeTotal(False),
+        UseAdditionalFields(total_mode=(TotalModeEnum, TotalModeEnum.NONE)),
+    ]
+
+
+async def fetch_all(session: AsyncSession, stmt: Select) -> list[Any]:
+    """
+    Executes a query that selects either a model or a set of columns.
+
+    :param session: Database session.
+    :param stmt: Query to execute.
+
+    :return: Model objects if the query selects a model, rows with attribute access to the columns otherwise.
+    """
+    result = await session.execute(stmt)
+
+    if len(stmt.column_descriptions) == 1 and isinstance(stmt.column_descriptions[0]["expr"], type):
+        return list(result.scalars().unique().all())
+
+    return list(result.all())
+
+
+def encode_keyset(values: Sequence[Any]) -> str:
+    """
+    Serialize keyset values of a row into a cursor payload.
+
+    :param values: Values of the keyset columns, in keyset order.
+
+    :return: JSON representation of the values.
+    """
+    return json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+
+
+def decode_keyset(cursor: str, keyset: Sequence[InstrumentedAttribute]) -> list[Any]:
+    """
+    Deserialize a cursor payload into typed keyset values.
+
+    :param cursor: JSON payload produced by `encode_keyset`.
+    :param keyset: Columns the cursor was built from.
+
+    :return: List of values converted to the python types of the keyset columns.
+
+    :raises BadRequestError: If the cursor does not match the keyset.
+    """
+    try:
+        values = json.loads(cursor)
+
+        if not isinstance(values, list) or len(values) != len(keyset):
+            raise ValueError
+
+        return [
+            TypeAdapter(column.type.python_type).validate_python(value)
+            for column, value in zip(keyset, values, strict=True)
+        ]
+
+    except (ValueError, ValidationError):
+        raise BadRequestError("Invalid cursor value") from None
+
+
+def encode_keyset_cursor(values: Sequence[Any]) -> str:
+    """
+    Builds a cursor like the `next_page` of a `CursorPage`, for endpoints that return cursors of their own.
+
+    :param values: Values of the keyset columns, in keyset order.
+    """
+    return encode_cursor(encode_keyset(values))
+
+
+def decode_keyset_cursor(cursor: str, keyset: Sequence[InstrumentedAttribute]) -> list[Any]:
+    """
+    Deserialize a cursor built by `encode_keyset_cursor` or a `CursorPage` into typed keyset values.
+
+    :raises BadRequestError: If the cursor does not match the keyset.
+    """
+    return decode_keyset(decode_cursor(cursor), keyset)
+
+
+async def paginate_by_offset(
+    session: AsyncSession,
+    stmt: Select,
+    *,
+    total: int | None = None,
+    total_mode: TotalModeEnum = TotalModeEnum.NONE,
+) -> Page[Any]:
+    """
+    Paginates a query using page/size parameters.
+
+    One extra row is fetched to find out whether there is a next page, so no COUNT(*) is needed.
+
+    :param session: Database session.
+    :param stmt: Ordered query, without limits.
+    :param total: Pre-calculated total number of items, if any.
+    :param total_mode: The way the total was calculated.
+
+    :return: A Page object with paginated results.
+    """
+    params = resolve_params()
+    raw_params = params.to_raw_params()
+
+    items = await fetch_all(session, stmt.offset(raw_params.offset).limit(raw_params.limit + 1))
+
+    return create_page(
+        items[: raw_params.limit],
+        total=total,
+        params=params,
+        total_mode=total_mode,
+        has_next=len(items) > raw_params.limit,
+    )
+
+
+async def paginate_by_keyset(
+    session: AsyncSession,
+    stmt: Select,
+    keyset: Sequence[InstrumentedAttribute],
+    *,
+    descending: bool = False,
+    total: int | None = None,
+    total_mode: TotalModeEnum = TotalModeEnum.NONE,
+) -> CursorPage[Any]:
+    """
+    Paginates a query by seeking past the last seen keyset instead of using OFFSET.
+
+    The last column of the keyset should be unique (e.g. `id`) to act as a tie-breaker,
+    so that each page boundary is unambiguous.
+
+    :param session: Database session.
+    :param stmt: Filtered query, without ordering and limits. If it selects columns, the keyset columns must be
+                 among them.
+    :param keyset: Columns to order and seek by.
+    :param descending: If True, items are returned in descending keyset order.
+    :param total: Pre-calculated total number of items, if any.
+    :param total_mode: The way the total was calculated.
+
+    :return: A CursorPage object with the next page cursor, if there are more items.
+    """
+    params = resolve_params()
+    raw_params = params.to_raw_params()
+
+    if raw_params.cursor:
+        values = decode_keyset(raw_params.cursor, keyset)
+        key = tuple_(*keyset)
+        last_seen = tuple_(*(literal(value, type_=column.type) for column, value in zip(keyset, values, strict=True)))
+
+        stmt = stmt.where(key < last_seen if descending else key > last_seen)
+
+    stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column in keyset))
+    items = await fetch_all(session, stmt.limit(raw_params.size + 1))
+
+    next_cursor = None
+
+    if len(items) > raw_params.size:
+        items = items[: raw_params.size]
+        next_cursor = encode_keyset([getattr(items[-1], column.key) for column in keyset])
+
+    return create_page(items, total=total, params=params, next_=next_cursor, total_mode=total_mode)
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, SerializerFunctionWrapHandler, model_serializer
 
 
 class BaseSchema(BaseModel):
@@ -7,3 +9,18 @@ class BaseSchema(BaseModel):
         populate_by_name=True,
         from_attributes=True,
     )
+
+
+class PartialSchema(BaseSchema):
+    """
+    Schema of an object with a subset of fields, only the fields that were set are serialized.
+    """
+
+    @model_serializer(mode="wrap")
+    def serialize_set_fields(self, handler: SerializerFunctionWrapHandler) -> dict[str, Any]:
+        return {key: value for key, value in handler(self).items() if key in self.model_fields_set}
+
+
+class IdempotencyRequestSchema(BaseSchema):
+    key: str
+    request_hash: str
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+
+from app.core.config import config
+from app.core.enums import SummarizerEnum
+from app.models import ChatMessage
+
+
+class Summarizer(ABC):
+    """
+    Compacts the history of a session into a summary, incrementally: each summary is made of the previous one
+    and the messages added since.
+    """
+
+    @abstractmethod
+    async def summarize(self, summary: str | None, messages: Sequence[ChatMessage]) -> str:
+        """
+        :param summary: The previous summary, None for the first one.
+        :param messages: The messages after the previous summary, in the order they were added.
+
+        :return: The summary of the previous summary and the messages.
+        """
+
+
+class TruncatingSummarizer(Summarizer):
+    """
+    Appends the first line of each message to the previous summary, and keeps the last `summary_max_length`
+    characters. It needs no model, e.g. for tests and local runs.
+    """
+
+    async def summarize(self, summary: str | None, messages: Sequence[ChatMessage]) -> str:
+        lines = [summary] if summary else []
+
+        for message in messages:
+            first_line, *_ = message.content.strip().splitlines() or [""]
+            lines.append(f"{message.sender}: {first_line}")
+
+        return "\n".join(lines)[-config.summary_max_length :]
+
+
+# Summarizers by `config.summarizer`, summarizers calling a model can be plugged in here
+SUMMARIZERS: dict[SummarizerEnum, Callable[[], Summarizer]] = {
+    SummarizerEnum.TRUNCATE: TruncatingSummarizer,
+}
+
+
+def get_summarizer() -> Summarizer:
+    return SUMMARIZERS[config.summarizer]()
@@ -0,0 +1,47 @@
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from app.core.config import config
+from app.core.enums import TokenizerEnum
+
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class Tokenizer(ABC):
+    """
+    Counts the tokens of message content, to fit messages into the context window of a model.
+
+    Counts are computed offline when messages are stored, so a tokenizer must not call external services.
+    """
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        :param text: The text to count the tokens of.
+
+        :return: Number of tokens.
+        """
+
+
+class WordTokenizer(Tokenizer):
+    """
+    Counts words and punctuation marks, a rough approximation of subword tokenizers for English text.
+    """
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in WORD_PATTERN.finditer(text))
+
+
+# Tokenizers by `config.tokenizer`, tokenizers of specific models (e.g. BPE vocabularies) can be plugged in here
+TOKENIZERS: dict[TokenizerEnum, Callable[[], Tokenizer]] = {
+    TokenizerEnum.WORDS: WordTokenizer,
+}
+
+
+def get_tokenizer() -> Tokenizer:
+    """
+    Returns the tokenizer set in `config.tokenizer`. The messages stored before the counts were added are counted
+    with it by the migration that adds `ChatMessage.token_count`.
+    """
+    return TOKENIZERS[config.tokenizer]()
@@ -1,7 +1,19 @@
-from typing import Type, TypeVar
+from datetime import datetime
+from typing import Protocol, TypeVar
+from uuid import UUID
 
 from pydantic import BaseModel
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
 
-Model = TypeVar("Model", bound=Type[DeclarativeBase])
+
+class SQLModel(Protocol):
+    """
+    Columns of `CommonMixin` that generic repositories rely on.
+    """
+
+    id: Mapped[UUID]
+    created_at: Mapped[datetime]
+
+
+Model = TypeVar("Model", bound=SQLModel)
 Schema = TypeVar("Schema", bound=BaseModel)
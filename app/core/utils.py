@@ -1,5 +1,9 @@
 import json
 import re
+import secrets
+import threading
+import time
+from uuid import UUID
 
 from httpx import Response
 
@@ -23,6 +27,42 @@ def pascal_to_snake(pascal_string: str) -> str:
     return snake_string.lower()
 
 
+class UUID7Generator:
+    """
+    Generator of time-ordered UUIDs version 7 (RFC 9562).
+
+    The first 48 bits are a Unix timestamp in milliseconds, so new keys are appended to the right edge of a B-tree
+    index instead of being scattered across it like random `uuid4` keys.
+    Within one millisecond, the 12 bits after the version are used as a counter (RFC 9562, method 1),
+    so the UUIDs generated by the process are strictly increasing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timestamp = 0
+        self._counter = 0
+
+    def __call__(self) -> UUID:
+        with self._lock:
+            timestamp = time.time_ns() // 1_000_000
+
+            if timestamp > self._timestamp:
+                # A random start leaves room for at least 2048 UUIDs in the same millisecond
+                self._timestamp, self._counter = timestamp, secrets.randbits(11)
+            elif self._counter < 0xFFF:
+                self._counter += 1
+            else:
+                # The counter is exhausted (or the clock went backwards), borrow the next millisecond
+                self._timestamp, self._counter = self._timestamp + 1, 0
+
+            value = self._timestamp << 80 | 0x7 << 76 | self._counter << 64 | 0b10 << 62 | secrets.randbits(62)
+
+        return UUID(int=value)
+
+
+uuid7 = UUID7Generator()
+
+
 def stringify_response(response: Response) -> str:
     """
     Convert the content of an HTTP response to a string with
@@ -47,3 +87,23 @@ def stringify_response(response: Response) -> str:
 
     except json.JSONDecodeError:
         return response.text
+
+
+def format_server_sent_event(data: str | None, *, event: str | None = None, event_id: str | None = None) -> str:
+    """
+    Format a message of a `text/event-stream` response.
+
+    :param data: The data of the event. If None, a comment is returned, which keeps the connection alive
+                 without dispatching an event.
+    :param event: The type of the event, `message` for clients if not provided.
+    :param event_id: The ID of the event, clients send the ID of the last received event
+                     in the `Last-Event-ID` header when they reconnect.
+
+    :return: The message, terminated by a blank line.
+    """
+    if data is None:
+        return ": keepalive\n\n"
+
+    fields = [("id", event_id), ("event", event), *(("data", line) for line in data.splitlines())]
+
+    return "".join(f"{name}: {value}\n" for name, value in fields if value is not None) + "\n"
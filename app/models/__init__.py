@@ -1,7 +1,17 @@
 __all__ = [
     "ChatMessage",
+    "ChatMessageChunk",
+    "ChatMessageDocument",
     "ChatSession",
+    "ChatSessionSummary",
+    "ContextChunk",
+    "IdempotencyKey",
 ]
 
 from app.models.chat_message import ChatMessage
+from app.models.chat_message_chunk import ChatMessageChunk
+from app.models.chat_message_document import ChatMessageDocument
 from app.models.chat_session import ChatSession
+from app.models.chat_session_summary import ChatSessionSummary
+from app.models.context_chunk import ContextChunk
+from app.models.idempotency_key import IdempotencyKey
@@ -1,18 +1,88 @@
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Index
-from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy import (
+    ColumnElement,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    PrimaryKeyConstraint,
+    String,
+    false,
+    func,
+    or_,
+)
+from sqlalchemy.dialects.postgresql import ENUM, TSVECTOR
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.enums import SenderTypeEnum
 from app.core.models import Base, CommonMixin
+from app.core.utils import uuid7
+
+# Text search configuration of `ChatMessage.search_vector`, search queries must be parsed with the same one
+SEARCH_CONFIG = "english"
+# Postgres notification channel of new messages, the payload is the ID of their session
+NEW_MESSAGE_CHANNEL = "chat_message"
 
 
 class ChatMessage(CommonMixin, Base):
+    id_factory = uuid7
+
     session_id: Mapped[UUID] = mapped_column(ForeignKey("chat_session.id", ondelete="CASCADE"))
+    # Position of the message in its session, allocated from `ChatSession.last_message_seq`
+    seq: Mapped[int]
+    # Position of the last change of the message in its session, see `ChatMessageRepository.get_new_by_session_id`:
+    # the `seq` of an added message, and the last allocated `seq` of the session with `ChatSession.change_count`
+    # when the message is finalized
+    change_seq: Mapped[int] = mapped_column(default=lambda context: context.get_current_parameters()["seq"])
+    change_no: Mapped[int] = mapped_column(default=0, server_default="0")
     sender: Mapped[SenderTypeEnum] = mapped_column(ENUM(SenderTypeEnum, name="sender_type_enum"))
     content: Mapped[str]
     context: Mapped[dict[str, Any]] = mapped_column(default=dict, server_default="{}")
+    # Keys of oversized content and context moved to the blob storage, see `ChatMessageRepository.offload`.
+    # The columns then hold a preview of the content and an empty context.
+    content_blob: Mapped[str | None] = mapped_column(String(64))
+    context_blob: Mapped[str | None] = mapped_column(String(64))
+    # While True, content is being appended to the message: the appended content is kept in `ChatMessageChunk`
+    # rows until the message is finalized, and readers get it by `ChatMessageRepository.get_content_expression`
+    is_streaming: Mapped[bool] = mapped_column(default=False, server_default=false())
+    # Tokens of the full content by `config.tokenizer`, counted when the content is written, see `get_tokenizer`
+    token_count: Mapped[int]
+    # Lexemes of the content (the preview of offloaded content) for full-text search, never loaded with the message
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, content)", persisted=True),
+        deferred=True,
+    )
+    # The partition key, so it is a part of the primary key
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=func.current_timestamp(),
+        server_default=func.current_timestamp(),
+    )
+
+    @hybrid_property
+    def is_offloaded(self) -> bool:
+        return self.content_blob is not None or self.context_blob is not None
+
+    @is_offloaded.inplace.expression
+    @classmethod
+    def _is_offloaded_expression(cls) -> ColumnElement[bool]:
+        return or_(cls.content_blob.isnot(None), cls.context_blob.isnot(None))
 
-    __table_args__ = (Index("ix_chat_message_session_id_created_at", "session_id", "created_at"),)
+    # The table is partitioned by month, see `ChatMessageRepository.create_partitions` and `drop_partitions`.
+    # Unique indexes must include the partition key, so `id` and `seq` uniqueness is guaranteed by the application:
+    # generated ids are `uuid7`, client-supplied ids are checked against the stored messages under an advisory lock
+    # on the id (see `ChatMessageRepository._lock_ids`), and seqs are allocated under the row lock of the session.
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        Index("ix_chat_message_session_id_created_at", "session_id", "created_at"),
+        Index("ix_chat_message_session_id_seq", "session_id", "seq"),
+        Index("ix_chat_message_session_id_change_seq_change_no", "session_id", "change_seq", "change_no"),
+        Index("ix_chat_message_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
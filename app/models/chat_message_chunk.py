@@ -0,0 +1,30 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import Base, CommonMixin
+from app.core.utils import uuid7
+
+
+class ChatMessageChunk(CommonMixin, Base):
+    """
+    Content appended to a streaming message, until the message is finalized.
+
+    Appends insert small rows instead of rewriting the growing content of the message, which is written once
+    by `ChatMessageRepository.finalize`. `created_at` is the creation time of the message.
+    """
+
+    id_factory = uuid7
+
+    message_id: Mapped[UUID]
+    # Messages are not referenced, so that their expired partitions can be dropped. The rows are deleted with them.
+    session_id: Mapped[UUID] = mapped_column(ForeignKey("chat_session.id", ondelete="CASCADE"))
+    # Order of the chunk in the message, starting from 1
+    position: Mapped[int]
+    content: Mapped[str]
+
+    __table_args__ = (
+        # Concurrent appends to the same message can't take the same position
+        Index("ix_chat_message_chunk_message_id_position", "message_id", "position", unique=True),
+    )
@@ -0,0 +1,35 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import Base, CommonMixin
+from app.core.utils import uuid7
+
+
+class ChatMessageDocument(CommonMixin, Base):
+    """
+    Reverse index from the documents cited in message contexts to the messages, filled when messages are created.
+
+    `created_at` is the creation time of the message, so that the message is looked up in its partition only.
+    """
+
+    id_factory = uuid7
+
+    doc_id: Mapped[str]
+    message_id: Mapped[UUID]
+    # Messages are not referenced, so that their expired partitions can be dropped. The rows are deleted with them.
+    session_id: Mapped[UUID] = mapped_column(ForeignKey("chat_session.id", ondelete="CASCADE"))
+
+    __table_args__ = (
+        # Serves the messages of a document, see `ChatMessageRepository.get_all_by_document_id`
+        Index(
+            "ix_chat_message_document_doc_id_created_at_message_id",
+            "doc_id",
+            "created_at",
+            "message_id",
+            unique=True,
+        ),
+        # Serves deletes of messages and sessions
+        Index("ix_chat_message_document_session_id_message_id", "session_id", "message_id"),
+    )
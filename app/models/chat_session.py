@@ -1,15 +1,67 @@
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import Index
+from sqlalchemy import DateTime, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import false
 
 from app.core.models import Base, CommonMixin
+from app.core.utils import uuid7
 
 
 class ChatSession(CommonMixin, Base):
+    id_factory = uuid7
+
     user_id: Mapped[UUID]
     title: Mapped[str]
     is_favorite: Mapped[bool] = mapped_column(default=False, server_default=false())
 
-    __table_args__ = (Index("ix_chat_session_user_id_created_at", "user_id", "created_at"),)
+    # Maintained by ChatMessageRepository on message inserts and deletes
+    message_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # The last `ChatMessage.seq` allocated in the session, never decremented
+    last_message_seq: Mapped[int] = mapped_column(default=0, server_default="0")
+    # The number of finalized streaming messages, orders the changes made after the same `last_message_seq`
+    change_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Maintained by ChatMessageRepository on message inserts: the time of the last insert, or the session creation
+    last_activity_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=func.current_timestamp(),
+        server_default=func.current_timestamp(),
+    )
+    # Maintained by ChatMessageRepository on message inserts and deletes: the beginning of the last message content
+    last_message_preview: Mapped[str | None]
+
+    # The session list of a user is served by index-only scans of these indexes, see `ChatSessionRepository.keysets`.
+    # They include all the listed columns, `title` and the preview are bounded to fit the index row size limit.
+    __table_args__ = (
+        Index(
+            "ix_chat_session_user_id_created_at",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_include=["title", "is_favorite", "message_count", "last_activity_at", "last_message_preview"],
+        ),
+        Index(
+            "ix_chat_session_user_id_last_activity_at",
+            "user_id",
+            text("last_activity_at DESC"),
+            text("id DESC"),
+            postgresql_include=["title", "is_favorite", "message_count", "last_message_preview"],
+        ),
+        # Favorites are a small part of the sessions, so the list of favorites doesn't filter the full index
+        Index(
+            "ix_chat_session_user_id_last_activity_at_favorite",
+            "user_id",
+            text("last_activity_at DESC"),
+            text("id DESC"),
+            postgresql_include=["title", "is_favorite", "message_count", "last_message_preview"],
+            postgresql_where=text("is_favorite"),
+        ),
+        # Serves substring and fuzzy title searches, see `ChatSessionRepository.get_all_by_user_id`
+        Index(
+            "ix_chat_session_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
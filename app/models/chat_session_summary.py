@@ -0,0 +1,31 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import Base, CommonMixin
+from app.core.utils import uuid7
+
+
+class ChatSessionSummary(CommonMixin, Base):
+    """
+    Checkpoint of the history of a session: a summary of its messages up to `last_seq`.
+
+    Summaries are created by `ChatSessionSummaryService.summarize` every `summary_interval` messages, each one from
+    the previous summary and the messages added since, and the history is read as the latest summary followed by
+    the messages after it.
+    """
+
+    id_factory = uuid7
+
+    session_id: Mapped[UUID] = mapped_column(ForeignKey("chat_session.id", ondelete="CASCADE"))
+    # Sequence number of the last summarized message
+    last_seq: Mapped[int]
+    content: Mapped[str]
+    # Tokens of the content by `config.tokenizer`, like `ChatMessage.token_count`
+    token_count: Mapped[int]
+
+    __table_args__ = (
+        # Serves the latest summary of a session, and concurrent jobs can't store the same checkpoint twice
+        Index("ix_chat_session_summary_session_id_last_seq", "session_id", "last_seq", unique=True),
+    )
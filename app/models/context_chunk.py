@@ -0,0 +1,17 @@
+from typing import Any
+
+from sqlalchemy import Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import Base, CommonMixin
+
+
+class ContextChunk(CommonMixin, Base):
+    # SHA-256 of the normalized chunk, messages reference the chunk by it, see `app.core.helpers.context_chunks`
+    hash: Mapped[str] = mapped_column(String(64))
+    content: Mapped[Any] = mapped_column(JSONB)
+    # Size of the normalized chunk in bytes
+    size: Mapped[int]
+
+    __table_args__ = (Index("ix_context_chunk_hash", "hash", unique=True),)
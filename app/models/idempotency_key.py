@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import Base, CommonMixin
+
+
+class IdempotencyKey(CommonMixin, Base):
+    key: Mapped[str] = mapped_column(String(255))
+    # SHA-256 of the request the key was first used with, a key can't be reused for another request
+    request_hash: Mapped[str] = mapped_column(String(64))
+    # JSON body of the original response, returned as is when the request is replayed
+    response: Mapped[Any] = mapped_column(JSONB)
+    # Expired keys are ignored and overwritten by the next request with the same key, the others are deleted by
+    # `app.commands.maintain_partitions`
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_idempotency_key_key", "key", unique=True),
+        # Serves the purge of expired keys
+        Index("ix_idempotency_key_expires_at", "expires_at"),
+    )
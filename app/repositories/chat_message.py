@@ -1,25 +1,1183 @@
+import asyncio
+import json
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from fastapi_pagination.ext.sqlalchemy import paginate
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Integer,
+    Select,
+    Text,
+    and_,
+    case,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    text,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import REAL, aggregate_order_by, insert
+from sqlalchemy.exc import DBAPIError, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased, defer
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.blob_storage import BlobStorage, get_blob_storage
+from app.core.config import config
+from app.core.enums import ToastCompressionEnum, TotalModeEnum
+from app.core.exceptions.exceptions import ConflictError, ForeignKeyError, NotFoundError
+from app.core.helpers.context_chunks import get_document_ids
+from app.core.helpers.db import raise_db_error
+from app.core.helpers.partitions import (
+    create_monthly_partitions,
+    get_partitions,
+    remove_partition,
+    set_column_compression,
+)
 from app.core.mixins.repository import CRUDRepositoryMixin
-from app.core.pagination import Page
-from app.models import ChatMessage
-from app.schemas.chat_message import ChatMessageSchema
+from app.core.pagination import CursorPage, fetch_all, paginate_by_keyset
+from app.core.tokenizer import Tokenizer, get_tokenizer
+from app.models import ChatMessage, ChatMessageChunk, ChatMessageDocument, ChatSession, ChatSessionSummary
+from app.models.chat_message import NEW_MESSAGE_CHANNEL, SEARCH_CONFIG
+from app.repositories.chat_session_summary import ChatSessionSummaryRepository
+from app.schemas.chat_message import ChatMessageSchema, ChatMessageSearchResultSchema
 
 
 class ChatMessageRepository(CRUDRepositoryMixin[ChatMessage, ChatMessageSchema]):
     sql_model = ChatMessage
 
+    # Matches `ix_chat_message_session_id_seq`, `seq` is unique within a session
+    keyset = (ChatMessage.seq,)
+    # Orders the messages by their last change, see `get_new_by_session_id`
+    changes_keyset = (ChatMessage.change_seq, ChatMessage.change_no)
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        blob_storage: BlobStorage | None = None,
+        tokenizer: Tokenizer | None = None,
+    ):
+        super().__init__(session)
+        self.blob_storage = blob_storage or get_blob_storage()
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def offload(self, obj_data: dict, blobs: dict[str, bytes]) -> dict:
+        """
+        Moves oversized content and context of a message to be written to the blob storage.
+
+        Content larger than `blob_offload_threshold` bytes is replaced with its preview, and a larger context
+        is replaced with an empty one. The keys of the blobs are stored in `content_blob` and `context_blob`.
+        The tokens of the content are counted into `token_count` beforehand, so the count is of the full content.
+
+        The blobs are only added to `blobs`, to be stored by `put_blobs` once the message is written, so that
+        a message that is not written (e.g. of a missing session or with a taken ID) leaves no blobs behind.
+
+        :param obj_data: The message to write.
+        :param blobs: The data of the blobs to store, by key.
+
+        :return: The message to store in the table.
+        """
+        obj_data = {
+            **obj_data,
+            "content_blob": None,
+            "context_blob": None,
+            "token_count": self.tokenizer.count(obj_data["content"]),
+        }
+
+        if len(content := obj_data["content"].encode()) > config.blob_offload_threshold:
+            obj_data["content_blob"] = self.blob_storage.get_key(content)
+            obj_data["content"] = obj_data["content"][: config.blob_content_preview_length]
+            blobs[obj_data["content_blob"]] = content
+
+        if len(context := json.dumps(obj_data.get("context", {})).encode()) > config.blob_offload_threshold:
+            obj_data["context_blob"] = self.blob_storage.get_key(context)
+            obj_data["context"] = {}
+            blobs[obj_data["context_blob"]] = context
+
+        return obj_data
+
+    async def put_blobs(self, blobs: dict[str, bytes]) -> None:
+        """
+        Stores the blobs of offloaded messages, see `offload`.
+
+        The blobs are stored after the messages are written and before the transaction is committed, so committed
+        messages always have their blobs. A transaction that fails after that leaves blobs no message refers to.
+
+        :param blobs: The data of the blobs, by key.
+        """
+        await asyncio.gather(*(self.blob_storage.put(data) for data in blobs.values()))
+
+    async def load_offloaded(self, messages: Sequence[ChatMessage]) -> Sequence[ChatMessage]:
+        """
+        Replaces the previews of offloaded content and context with the full ones, reading the blobs concurrently.
+
+        The loaded values are not tracked as changes, so they are never written back to the table.
+
+        :param messages: Stored messages.
+
+        :return: The same messages.
+        """
+
+        async def load(message: ChatMessage) -> None:
+            if message.content_blob is not None:
+                set_committed_value(message, "content", (await self.blob_storage.get(message.content_blob)).decode())
+
+            if message.context_blob is not None:
+                set_committed_value(message, "context", json.loads(await self.blob_storage.get(message.context_blob)))
+
+        await asyncio.gather(*(load(message) for message in messages if message.is_offloaded))
+
+        return messages
+
+    @staticmethod
+    def get_content_expression() -> ColumnElement[str]:
+        """
+        Returns an expression of the message content, with the content appended to streaming messages so far.
+
+        The chunks are only aggregated for streaming messages, others are returned as they are.
+        """
+        appended = (
+            select(
+                func.string_agg(
+                    ChatMessageChunk.content,
+                    aggregate_order_by(literal_column("''"), ChatMessageChunk.position),
+                ),
+            )
+            .filter(ChatMessageChunk.message_id == ChatMessage.id)
+            .scalar_subquery()
+        )
+
+        return case(
+            (ChatMessage.is_streaming, ChatMessage.content + func.coalesce(appended, "")),
+            else_=ChatMessage.content,
+        )
+
+    def get_query(self, fields: Sequence[str] | None = None) -> Select:
+        """
+        Returns a query object for messages, see `CRUDRepositoryMixin.get_query`.
+
+        A selected `content` column includes the content appended to streaming messages so far.
+        Whole messages don't, it is added to them by `load_streaming`.
+        """
+        if fields is None or "content" not in fields:
+            return super().get_query(fields)
+
+        return select(
+            *(
+                self.get_content_expression().label(field) if field == "content" else getattr(ChatMessage, field)
+                for field in dict.fromkeys(fields)
+            ),
+        )
+
+    async def load_streaming(self, messages: Sequence[ChatMessage]) -> Sequence[ChatMessage]:
+        """
+        Adds the content appended so far to streaming messages, reading the chunks of all of them in a single query.
+
+        The loaded content is not tracked as a change, so it is never written back to the table.
+
+        :param messages: Stored messages.
+
+        :return: The same messages.
+        """
+        if not (streaming := {message.id: message for message in messages if message.is_streaming}):
+            return messages
+
+        result = await self.session.execute(
+            select(
+                ChatMessageChunk.message_id,
+                func.string_agg(
+                    ChatMessageChunk.content,
+                    aggregate_order_by(literal_column("''"), ChatMessageChunk.position),
+                ),
+            )
+            .filter(ChatMessageChunk.message_id.in_(streaming))
+            .group_by(ChatMessageChunk.message_id),
+        )
+
+        for message_id, content in result.tuples():
+            message = streaming[message_id]
+            set_committed_value(message, "content", message.content + content)
+
+        return messages
+
+    async def append_content(
+        self,
+        session_id: UUID,
+        message_id: UUID,
+        content: str,
+        *,
+        autocommit: bool = True,
+    ) -> int:
+        """
+        Appends content to a streaming message, by inserting a chunk after the last one.
+
+        The message row is locked before the position is read, so that concurrent appends take consecutive
+        positions in the order they lock it, and the message can't be finalized in the middle of an append.
+        The row is locked in the no-key mode, which doesn't block readers, and is not rewritten.
+
+        :param session_id: The ID of the session.
+        :param message_id: The ID of the message.
+        :param content: The content to append.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+
+        :return: The position of the chunk.
+
+        :raises NotFoundError: If the session has no message with the ID.
+        :raises ConflictError: If the message is not streaming.
+        """
+        try:
+            stmt = (
+                self.get_session_query(session_id, ["id", "created_at", "is_streaming"])
+                .filter(ChatMessage.id == message_id)
+                .with_for_update(key_share=True)
+            )
+
+            if (message := (await self.session.execute(stmt)).one_or_none()) is None:
+                raise NotFoundError(detail=f"ChatMessage object with {message_id=!s} not found.")
+
+            if not message.is_streaming:
+                raise ConflictError(detail="ChatMessage is not streaming", fields={"id": message.id})
+
+            # A statement of its own, so that it sees the chunks committed by the appends it has waited for
+            next_position = (
+                select(func.coalesce(func.max(ChatMessageChunk.position), 0) + 1)
+                .filter(ChatMessageChunk.message_id == message_id)
+                .scalar_subquery()
+            )
+            stmt = (
+                insert(ChatMessageChunk)
+                .values(
+                    id=ChatMessageChunk.id_factory(),
+                    message_id=message_id,
+                    session_id=session_id,
+                    created_at=message.created_at,
+                    position=next_position,
+                    content=content,
+                )
+                .returning(ChatMessageChunk.position)
+            )
+            position = (await self.session.execute(stmt)).scalar_one()
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        except (NotFoundError, ConflictError):
+            await self.session.rollback()
+            raise
+
+        return position
+
+    async def finalize(self, session_id: UUID, message_id: UUID, *, autocommit: bool = True) -> ChatMessage:
+        """
+        Ends a streaming message: its content and the appended chunks are written to the message at once,
+        and the chunks are deleted.
+
+        The content is offloaded like the content of a created message, and becomes the last message preview
+        of the session if the message is the last one. The session is notified on `NEW_MESSAGE_CHANNEL`, and
+        the finalized message is returned again by `get_new_by_session_id` with the `changes_keyset`.
+
+        :param session_id: The ID of the session.
+        :param message_id: The ID of the message.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+
+        :return: The finalized message, with a preview of offloaded content.
+
+        :raises NotFoundError: If the session has no message with the ID.
+        :raises ConflictError: If the message is not streaming.
+        """
+        try:
+            # Waits for the appends in progress, later ones find the message finalized
+            stmt = self.get_session_query(session_id).filter(ChatMessage.id == message_id).with_for_update()
+
+            if (message := await self.session.scalar(stmt)) is None:
+                raise NotFoundError(detail=f"ChatMessage object with {message_id=!s} not found.")
+
+            if not message.is_streaming:
+                raise ConflictError(detail="ChatMessage is not streaming", fields={"id": message.id})
+
+            (message,) = await self.load_offloaded([message])
+            chunks = await self.session.scalars(
+                select(ChatMessageChunk.content).filter_by(message_id=message.id).order_by(ChatMessageChunk.position),
+            )
+            content = message.content + "".join(chunks)
+            blobs: dict[str, bytes] = {}
+            offloaded = self.offload({"content": content}, blobs)
+
+            # The change is positioned after the messages and the changes committed so far, like an added message
+            # is, so `get_new_by_session_id` returns the message again
+            change_seq, change_no, _ = (
+                await self.session.execute(
+                    update(ChatSession)
+                    .filter_by(id=session_id)
+                    .values(
+                        change_count=ChatSession.change_count + 1,
+                        last_message_preview=case(
+                            (ChatSession.last_message_seq == message.seq, content[: config.session_preview_length]),
+                            else_=ChatSession.last_message_preview,
+                        ),
+                    )
+                    .returning(
+                        ChatSession.last_message_seq,
+                        ChatSession.change_count,
+                        func.pg_notify(NEW_MESSAGE_CHANNEL, cast(ChatSession.id, Text)),
+                    )
+                    .execution_options(synchronize_session=False),
+                )
+            ).one()
+            message = (
+                await self.session.scalars(
+                    update(ChatMessage)
+                    .filter(ChatMessage.id == message.id, ChatMessage.created_at == message.created_at)
+                    .values(
+                        content=offloaded["content"],
+                        content_blob=offloaded["content_blob"],
+                        token_count=offloaded["token_count"],
+                        is_streaming=False,
+                        change_seq=change_seq,
+                        change_no=change_no,
+                    )
+                    .returning(ChatMessage)
+                    .options(defer(ChatMessage.search_vector))
+                    .execution_options(populate_existing=True),
+                )
+            ).one()
+            await self.session.execute(
+                delete(ChatMessageChunk).filter_by(message_id=message.id).execution_options(synchronize_session=False),
+            )
+            await self.put_blobs(blobs)
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        except (NotFoundError, ConflictError):
+            await self.session.rollback()
+            raise
+
+        return message
+
+    @staticmethod
+    def split_document_ids(obj_data: dict) -> tuple[dict, list[str]]:
+        """
+        Separates the IDs of the documents cited by a message to be created from its columns.
+
+        :param obj_data: The message to create, with `document_ids` if its context chunks were already replaced
+                         with references. Otherwise, the IDs are taken from the chunks.
+
+        :return: The message columns and the document IDs.
+        """
+        obj_data = {**obj_data}
+
+        if (document_ids := obj_data.pop("document_ids", None)) is None:
+            document_ids = get_document_ids(obj_data.get("context"))
+
+        return obj_data, document_ids
+
+    async def index_documents(
+        self,
+        messages: Sequence[ChatMessage],
+        messages_document_ids: Sequence[list[str]],
+        *,
+        autocommit: bool = True,
+    ) -> None:
+        """
+        Stores the IDs of the documents cited by created messages in `chat_message_document`, in a single statement.
+
+        :param messages: The created messages.
+        :param messages_document_ids: The IDs of the documents cited by each of the messages.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+        """
+        rows = [
+            {
+                "id": ChatMessageDocument.id_factory(),
+                "doc_id": doc_id,
+                "message_id": message.id,
+                "session_id": message.session_id,
+                "created_at": message.created_at,
+            }
+            for message, document_ids in zip(messages, messages_document_ids, strict=True)
+            for doc_id in document_ids
+        ]
+
+        try:
+            if rows:
+                await self.session.execute(insert(ChatMessageDocument).values(rows))
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+    async def get_all_by_document_id(
+        self,
+        doc_id: str,
+        *,
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+        fields: Sequence[str] | None = None,
+    ) -> CursorPage[ChatMessageSchema]:
+        """
+        Returns messages that cite a document in their contexts, the most recent first, the ones created at the same
+        time (e.g. in a batch) in the descending order of their IDs.
+
+        The messages are found by a range scan of `ix_chat_message_document_doc_id_created_at_message_id`, and each
+        of them is looked up by its primary key in its partition.
+
+        :param doc_id: The ID of the document.
+        :param total_mode: The way to calculate the total number of messages.
+        :param fields: Names of the columns to select, all the fields of `ChatMessageSchema` if not provided.
+        """
+        # Client-supplied and legacy message IDs are not time-ordered, `message_id` only breaks ties
+        keyset = (ChatMessageDocument.created_at, ChatMessageDocument.message_id)
+        # `ChatMessageDocument.created_at` is the creation time of the message, it's selected for the cursor instead
+        fields = [field for field in fields or ChatMessageSchema.model_fields if field != "created_at"]
+
+        stmt = (
+            self.get_query(fields)
+            .add_columns(*keyset)
+            .join(
+                ChatMessageDocument,
+                and_(
+                    ChatMessageDocument.message_id == ChatMessage.id,
+                    ChatMessageDocument.created_at == ChatMessage.created_at,
+                ),
+            )
+            .filter(ChatMessageDocument.doc_id == doc_id)
+        )
+        total = await self.get_total(stmt, total_mode)
+
+        return await paginate_by_keyset(
+            self.session,
+            stmt,
+            keyset,
+            descending=True,
+            total=total,
+            total_mode=total_mode,
+        )
+
+    async def get_session_message(self, session_id: UUID, message_id: UUID) -> ChatMessage:
+        """
+        Returns a message of a session.
+
+        :raises NotFoundError: If the session has no message with the ID.
+        """
+        stmt = self.get_session_query(session_id).filter(ChatMessage.id == message_id)
+
+        if (message := await self.session.scalar(stmt)) is None:
+            raise NotFoundError(detail=f"ChatMessage object with {message_id=!s} not found.")
+
+        return message
+
+    def get_session_query(self, session_id: UUID, fields: Sequence[str] | None = None) -> Select:
+        """
+        Returns a query for messages of a session.
+
+        Messages can't be older than their session, so the creation time of the session bounds the partitions
+        to scan. It is passed as a subquery, which is evaluated before the scan and prunes partitions at run time.
+
+        :param session_id: The ID of the session.
+        :param fields: Names of the columns to select, whole messages are selected if not provided.
+
+        :return: Query object.
+        """
+        session_created_at = select(ChatSession.created_at).filter_by(id=session_id).scalar_subquery()
+
+        return self.get_query(fields).filter(
+            ChatMessage.session_id == session_id, ChatMessage.created_at >= session_created_at
+        )
+
     async def get_all_by_session_id(
         self,
         session_id: UUID,
         *,
         raw_result: bool = False,
-    ) -> Page[ChatMessageSchema] | list[ChatMessage]:
-        stmt = self.get_query().filter_by(session_id=session_id)
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+        fields: Sequence[str] | None = None,
+    ) -> CursorPage[ChatMessageSchema] | list[ChatMessage]:
+        """
+        Returns messages of a session, in the order they were added.
+
+        :param session_id: The ID of the session.
+        :param raw_result: If True, a list of all messages is returned without pagination.
+        :param total_mode: The way to calculate the total number of messages for paginated results.
+        :param fields: Names of the columns to select, e.g. to skip the large `context` column. The keyset columns
+                       are always selected to build the cursor. If not provided, whole messages are selected.
+        """
+        if fields is not None:
+            fields = [*fields, *(column.key for column in self.keyset)]
+
+        stmt = self.get_session_query(session_id, fields)
 
         if raw_result:
-            return (await self.session.scalars(stmt)).unique().all()
+            return await fetch_all(self.session, stmt.order_by(*self.keyset))
+
+        if total_mode == TotalModeEnum.EXACT:
+            total = await self.session.scalar(select(ChatSession.message_count).filter_by(id=session_id))
+        else:
+            total = await self.get_total(stmt, total_mode)
+
+        return await paginate_by_keyset(self.session, stmt, self.keyset, total=total, total_mode=total_mode)
+
+    async def get_new_by_session_id(
+        self,
+        session_id: UUID,
+        after: Sequence[Any] | None,
+        *,
+        limit: int,
+        fields: Sequence[str] | None = None,
+        keyset: Sequence[InstrumentedAttribute] | None = None,
+    ) -> Sequence[Any]:
+        """
+        Returns messages of a session added after the given position, in the order they were added.
+
+        With the `changes_keyset`, messages are returned in the order of their last change instead: a streaming
+        message is returned when it is added and again when it is finalized, after the messages added before.
+        The content appended in between is not a change, it is read with the message.
+
+        The session row and its new messages are read by a single statement: the messages are a lateral subquery
+        of the session, a range scan of the `(session_id, *keyset)` index in the partitions not older than
+        the session. A session without new messages yields one row without a message, so its existence is known
+        without a separate query.
+
+        :param session_id: The ID of the session.
+        :param after: Keyset values of the last seen message, or None to return messages from the first one.
+        :param limit: Maximum number of messages to return.
+        :param fields: Names of the columns to select. `seq` and the keyset columns are always selected.
+                       If not provided, whole messages are selected.
+        :param keyset: Columns the messages are ordered by, the `keyset` by default.
+
+        :raises NotFoundError: If the session does not exist.
+        """
+        keyset = keyset or self.keyset
+
+        if fields is not None:
+            fields = [*fields, "seq", *(column.key for column in keyset)]
+
+        new_messages = self.get_query(fields).filter(
+            ChatMessage.session_id == ChatSession.id,
+            ChatMessage.created_at >= ChatSession.created_at,
+        )
+
+        if after is not None:
+            last_seen = tuple_(
+                *(literal(value, type_=column.type) for column, value in zip(keyset, after, strict=True)),
+            )
+            new_messages = new_messages.filter(tuple_(*keyset) > last_seen)
+
+        new_messages = new_messages.order_by(*keyset).limit(limit).subquery("new_message").lateral()
+        new_message = aliased(ChatMessage, new_messages)
+
+        stmt = (
+            select(new_message if fields is None else new_messages)
+            .select_from(ChatSession)
+            .outerjoin(new_messages, true())
+            .filter(ChatSession.id == session_id)
+            .order_by(*(getattr(new_message, column.key) for column in keyset))
+        )
+        result = await self.session.execute(stmt)
+        rows = result.scalars().all() if fields is None else result.all()
+
+        if not rows:
+            raise NotFoundError(detail=f"ChatSession object with {session_id=!s} not found.")
+
+        return [row for row in rows if row is not None and row.seq is not None]
+
+    async def get_window_by_session_id(
+        self,
+        session_id: UUID,
+        max_tokens: int,
+        *,
+        with_summary: bool = False,
+    ) -> tuple[Sequence[ChatMessage], int, bool, ChatSessionSummary | None]:
+        """
+        Returns the most recent messages of a session whose total `token_count` fits into a budget.
+
+        The messages are walked newest-first by a recursive CTE, which steps through `ix_chat_message_session_id_seq`
+        one message at a time and sums their token counts, and stops at the first message over the budget, so
+        older messages are never read. The messages of the window are then read by a range scan of the same index.
+        Like in `get_new_by_session_id`, the session is read by the same statement.
+
+        :param session_id: The ID of the session.
+        :param max_tokens: The budget of tokens.
+        :param with_summary: If True, the window is the latest summary of the session followed by the messages
+                             after it, and the summary takes its tokens from the budget. A summary over the budget
+                             is left out.
+
+        :return: The messages in the order they were added, the total tokens of the window, whether messages were
+                 left out, and the summary.
+
+        :raises NotFoundError: If the session does not exist.
+        """
+        tail = self.get_session_query(session_id, ["seq", "token_count"])
+        budget = literal(max_tokens)
+
+        if with_summary:
+            latest_summary = ChatSessionSummaryRepository.get_latest_query(session_id).subquery("latest_summary")
+            # A summary over the budget is left out, the window is then the messages alone
+            summary = select(latest_summary).filter(latest_summary.c.token_count <= max_tokens).cte("summary")
+            tail = tail.filter(ChatMessage.seq > func.coalesce(select(summary.c.last_seq).scalar_subquery(), 0))
+            budget = budget - func.coalesce(select(summary.c.token_count).scalar_subquery(), 0)
+
+        newest = tail.order_by(ChatMessage.seq.desc()).limit(1).subquery("newest")
+        window = select(newest.c.seq, newest.c.token_count.label("total")).cte("window", recursive=True)
+        previous = (
+            tail.filter(ChatMessage.seq < window.c.seq).order_by(ChatMessage.seq.desc()).limit(1).lateral("previous")
+        )
+        # The first message over the budget is walked as well, it tells that older messages are left out
+        window = window.union_all(
+            select(previous.c.seq, window.c.total + previous.c.token_count)
+            .select_from(window)
+            .join(previous, true())
+            .filter(window.c.total <= budget),
+        )
+
+        fits = window.c.total <= budget
+        bounds = select(
+            func.min(window.c.seq).filter(fits).label("first_seq"),
+            func.coalesce(func.max(window.c.total).filter(fits), 0).label("token_count"),
+            func.coalesce(func.bool_or(~fits), False).label("has_more"),
+        ).subquery("bounds")
+
+        window_messages = (
+            self.get_session_query(session_id)
+            .filter(ChatMessage.seq >= bounds.c.first_seq)
+            .order_by(ChatMessage.seq)
+            .subquery("window_message")
+            .lateral()
+        )
+        window_message = aliased(ChatMessage, window_messages)
+
+        stmt = (
+            select(window_message, bounds.c.token_count, bounds.c.has_more)
+            .select_from(ChatSession)
+            .join(bounds, true())
+            .outerjoin(window_messages, true())
+            .filter(ChatSession.id == session_id)
+            .order_by(window_message.seq)
+        )
+
+        if with_summary:
+            stmt = stmt.outerjoin(summary, true()).add_columns(aliased(ChatSessionSummary, summary))
+        else:
+            stmt = stmt.add_columns(null())
+
+        rows = (await self.session.execute(stmt)).all()
+
+        if not rows:
+            raise NotFoundError(detail=f"ChatSession object with {session_id=!s} not found.")
+
+        _, token_count, has_more, summary = rows[0]
+
+        if summary is not None:
+            token_count += summary.token_count
+
+        return [message for message, *_ in rows if message is not None], token_count, has_more, summary
+
+    async def search(
+        self,
+        user_id: UUID,
+        query: str,
+        *,
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+    ) -> CursorPage[ChatMessageSearchResultSchema]:
+        """
+        Returns messages of all sessions of a user that match a full-text query, the most relevant first.
+
+        The matches are found by `ix_chat_message_search_vector`. The creation time of the oldest session of the user
+        bounds the partitions to scan, like in `get_session_query`. Snippets are only built for the returned page.
+
+        :param user_id: The ID of the user.
+        :param query: Search query in the web search syntax: words, "quoted phrases", `or` and `-excluded` words.
+        :param total_mode: The way to calculate the total number of matches.
+        """
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), query)
+        user_sessions = select(ChatSession.id).filter(ChatSession.user_id == user_id)
+        sessions_created_at = select(func.min(ChatSession.created_at)).filter(ChatSession.user_id == user_id)
+
+        matches = (
+            select(
+                ChatMessage.id,
+                ChatMessage.session_id,
+                ChatMessage.seq,
+                ChatMessage.sender,
+                ChatMessage.created_at,
+                ChatMessage.content,
+                func.ts_rank(ChatMessage.search_vector, tsquery, type_=REAL).label("rank"),
+            )
+            .filter(
+                ChatMessage.search_vector.bool_op("@@")(tsquery),
+                ChatMessage.session_id.in_(user_sessions),
+                ChatMessage.created_at >= sessions_created_at.scalar_subquery(),
+            )
+            .subquery("matches")
+        )
+        # Ranks are unique enough to page by, `id` is a tie-breaker for messages with equal ranks
+        keyset = (matches.c.rank, matches.c.id)
+
+        stmt = select(
+            *(matches.c[key] for key in ("id", "session_id", "seq", "sender", "created_at", "rank")),
+            func.ts_headline(
+                literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+                matches.c.content,
+                tsquery,
+                config.search_snippet_options,
+            ).label("snippet"),
+        )
+        total = await self.get_total(select(matches), total_mode)
+
+        return await paginate_by_keyset(
+            self.session,
+            stmt,
+            keyset,
+            descending=True,
+            total=total,
+            total_mode=total_mode,
+        )
+
+    async def _lock_ids(self, objs_data: list[dict]) -> list[UUID]:
+        """
+        Takes transaction-level advisory locks on the client-supplied IDs of messages to be created.
+
+        `id` alone can't be unique in the partitioned table, so the locks serialize concurrent inserts of the same ID
+        (into any session) until their transactions end, and the existence checks that follow see the messages
+        they have committed. The locks are taken in the order of the IDs, so that concurrent batches can't deadlock.
+
+        :param objs_data: Messages to create, the ones without `id` get generated IDs and are not locked.
+
+        :return: The locked IDs.
+
+        :raises ConflictError: If an ID is repeated in `objs_data`, the transaction is rolled back.
+        """
+        ids = [obj_data["id"] for obj_data in objs_data if obj_data.get("id")]
+
+        if not ids:
+            return []
+
+        if (duplicate_id := next((i for n, i in enumerate(ids) if i in ids[:n]), None)) is not None:
+            await self.session.rollback()
+            raise ConflictError(detail="ChatMessage ID is repeated", fields={"id": duplicate_id})
+
+        locked_ids = values(column("id", ChatMessage.id.type), name="locked_id").data([(i,) for i in sorted(ids)])
+
+        try:
+            await self.session.execute(
+                select(func.pg_advisory_xact_lock(func.hashtextextended(cast(locked_ids.c.id, Text), 0))),
+            )
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        return ids
+
+    async def _check_ids(self, objs_data: list[dict]) -> None:
+        """
+        Makes sure that the client-supplied IDs of messages to be created are not taken, see `_lock_ids`.
+
+        :raises ConflictError: If an ID is taken or repeated, the transaction is rolled back.
+        """
+        if not (ids := await self._lock_ids(objs_data)):
+            return
+
+        if (taken_id := await self.session.scalar(select(ChatMessage.id).filter(ChatMessage.id.in_(ids)))) is not None:
+            await self.session.rollback()
+            raise ConflictError(detail="ChatMessage ID is already taken", fields={"id": taken_id})
+
+    def _get_insert_query(self, session_id: UUID, objs_data: list[dict], *, skip_existing: bool = False) -> Insert:
+        """
+        Returns a query that inserts messages into a session with consecutive sequence numbers.
+
+        The sequence numbers are allocated by incrementing `ChatSession.last_message_seq` in a CTE, the row lock
+        taken by the UPDATE serializes concurrent inserts into the same session until the transaction ends.
+        The same UPDATE maintains the message counter, the last activity time and the last message preview,
+        and notifies `NEW_MESSAGE_CHANNEL` of the session.
+        When the session does not exist, the CTE returns no rows and nothing is inserted.
+
+        :param session_id: The ID of the session.
+        :param objs_data: Messages to insert, in order.
+        :param skip_existing: If True, nothing is inserted (and no sequence numbers are allocated) when a message
+                              with one of the IDs exists.
+
+        :return: Insert query returning the created messages.
+        """
+        # Python-side column defaults are not applied to INSERT ... SELECT statements
+        objs_data = [
+            {
+                **obj_data,
+                "id": obj_data.get("id") or ChatMessage.id_factory(),
+                "is_streaming": bool(obj_data.get("is_streaming")),
+                "change_no": 0,
+            }
+            for obj_data in objs_data
+        ]
+
+        session_seq = (
+            update(ChatSession)
+            .filter_by(id=session_id)
+            .values(
+                last_message_seq=ChatSession.last_message_seq + len(objs_data),
+                message_count=ChatSession.message_count + len(objs_data),
+                last_activity_at=func.current_timestamp(),
+                last_message_preview=objs_data[-1]["content"][: config.session_preview_length],
+            )
+            .returning(
+                ChatSession.id,
+                ChatSession.last_message_seq,
+                # Delivered to the listeners when the transaction commits, and dropped if it rolls back
+                func.pg_notify(NEW_MESSAGE_CHANNEL, cast(ChatSession.id, Text)),
+            )
+        )
+
+        if skip_existing:
+            session_seq = session_seq.where(
+                ~exists().where(ChatMessage.id.in_([obj_data["id"] for obj_data in objs_data])),
+            )
+
+        session_seq = session_seq.cte("session_seq")
+        keys = [key for key in objs_data[0] if key != "session_id"]
+
+        columns = ChatMessage.__table__.c
+        new_message = values(
+            column("position", Integer),
+            *(column(key, columns[key].type) for key in keys),
+            name="new_message",
+        ).data([(position, *(obj_data[key] for key in keys)) for position, obj_data in enumerate(objs_data, 1)])
+
+        seq = session_seq.c.last_message_seq - len(objs_data) + new_message.c.position
+        stmt = (
+            insert(ChatMessage)
+            .add_cte(session_seq)
+            .from_select(
+                [*keys, columns.session_id, columns.seq, columns.change_seq],
+                select(
+                    *(new_message.c[key] for key in keys),
+                    session_seq.c.id,
+                    seq,
+                    seq,
+                ).join_from(session_seq, new_message, true()),
+            )
+        )
+
+        # Deferred columns are still returned by inserts unless deferred explicitly
+        return stmt.returning(ChatMessage).options(defer(ChatMessage.search_vector))
+
+    async def create(
+        self,
+        obj_data: dict,
+        *,
+        autocommit: bool = True,
+        is_unique: bool = False,
+        **kwargs: Any,
+    ) -> ChatMessage:
+        """
+        Creates a message with the next sequence number of its session in a single statement.
+
+        :raises NotFoundError: If the session does not exist.
+        :raises ConflictError: If the client-supplied ID is taken.
+        """
+        session_id = obj_data["session_id"]
+        obj_data, document_ids = self.split_document_ids(obj_data)
+        await self._check_ids([obj_data])
+        blobs: dict[str, bytes] = {}
+        stmt = self._get_insert_query(session_id, [self.offload(obj_data, blobs)])
+
+        try:
+            message = await self._apply_changes(stmt=stmt, autocommit=False, is_unique=is_unique)
+
+        except (NotFoundError, ForeignKeyError):
+            raise NotFoundError(detail=f"ChatSession object with {session_id=!s} not found.") from None
+
+        await self.put_blobs(blobs)
+        await self.index_documents([message], [document_ids], autocommit=autocommit)
+
+        return message
+
+    async def upsert(
+        self,
+        obj_data: dict,
+        *,
+        autocommit: bool = True,
+        is_unique: bool = False,
+        **kwargs: Any,
+    ) -> tuple[ChatMessage, bool]:
+        """
+        Creates a message with a client-supplied ID, or returns the stored message with the same ID.
+
+        Re-sending a stored message allocates no sequence number and doesn't change the session counters.
+
+        :raises NotFoundError: If the session does not exist.
+        :raises ConflictError: If the ID is taken by a message of another session.
+        """
+        session_id = obj_data["session_id"]
+        obj_data, document_ids = self.split_document_ids(obj_data)
+        blobs: dict[str, bytes] = {}
+        stmt = self._get_insert_query(session_id, [self.offload(obj_data, blobs)], skip_existing=True)
+
+        # `id` alone can't be unique in the partitioned table, so ON CONFLICT can't be used. Instead, the ID is locked
+        # first: the insert then starts after concurrent inserts of the same ID have finished, and its existence check
+        # sees the messages they have committed.
+        await self._lock_ids([obj_data])
+
+        try:
+            message = (await self.session.scalars(stmt)).one_or_none()
+
+            # The blobs of a stored message are not written again
+            if message is not None:
+                await self.put_blobs(blobs)
+
+            if message is not None and document_ids:
+                await self.index_documents([message], [document_ids], autocommit=False)
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        created = message is not None
+
+        if not created and (message := await self.get(obj_data["id"], raise_error=False)) is None:
+            raise NotFoundError(detail=f"ChatSession object with {session_id=!s} not found.")
+
+        if message.session_id != session_id:
+            raise ConflictError(detail="ChatMessage ID is taken by another session", fields={"id": message.id})
+
+        return message, created
+
+    async def create_many(
+        self,
+        objs_data: list[dict],
+        *,
+        autocommit: bool = True,
+        is_unique: bool = False,
+        **kwargs: Any,
+    ) -> list[ChatMessage]:
+        """
+        Creates messages with consecutive sequence numbers, one multi-row statement per session.
+
+        :return: The created messages, grouped by session in the order the sessions first appear in `objs_data`,
+                 the messages of each session in the order of `objs_data`.
+
+        :raises NotFoundError: If any of the sessions does not exist.
+        :raises ConflictError: If a client-supplied ID is taken or repeated.
+        """
+        await self._check_ids(objs_data)
+
+        session_messages: dict[UUID, list[dict]] = {}
+        session_document_ids: dict[UUID, list[list[str]]] = {}
+        blobs: dict[str, bytes] = {}
+
+        for obj_data in objs_data:
+            obj_data, document_ids = self.split_document_ids(obj_data)
+            session_messages.setdefault(obj_data["session_id"], []).append(self.offload(obj_data, blobs))
+            session_document_ids.setdefault(obj_data["session_id"], []).append(document_ids)
+
+        results: list[ChatMessage] = []
+
+        for session_id, messages_data in session_messages.items():
+            stmt = self._get_insert_query(session_id, messages_data)
+
+            result = await self._apply_bulk_changes(stmt=stmt, autocommit=False, is_unique=is_unique)
+
+            if not result:
+                await self.session.rollback()
+                raise NotFoundError(detail=f"ChatSession object with {session_id=!s} not found.")
+
+            results.extend(sorted(result, key=lambda message: message.seq))
+
+        await self.put_blobs(blobs)
+
+        # The messages of each session are in the order of `objs_data` after sorting by `seq`
+        messages_document_ids = [ids for session_id in session_messages for ids in session_document_ids[session_id]]
+        await self.index_documents(results, messages_document_ids, autocommit=autocommit)
+
+        return results
+
+    async def delete(self, obj_id: int | UUID, *, autocommit: bool = True, **kwargs: Any) -> None:
+        """
+        Deletes a message with its cited documents and appended chunks, and decrements the message counter
+        of its session in the same transaction.
+
+        The last message preview of the session is taken from the message that is the last one after the deletion.
+        """
+        stmt = delete(ChatMessage).filter_by(id=obj_id).returning(ChatMessage.session_id)
+
+        try:
+            session_id = (await self.session.execute(stmt)).scalar_one()
+            last_message_preview = (
+                self.get_session_query(session_id)
+                .with_only_columns(func.left(ChatMessage.content, config.session_preview_length))
+                .order_by(ChatMessage.seq.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+            await self.session.execute(
+                update(ChatSession)
+                .filter_by(id=session_id)
+                .values(message_count=ChatSession.message_count - 1, last_message_preview=last_message_preview)
+                .execution_options(synchronize_session=False),
+            )
+            await self.session.execute(
+                delete(ChatMessageDocument)
+                .filter_by(session_id=session_id, message_id=obj_id)
+                .execution_options(synchronize_session=False),
+            )
+            await self.session.execute(
+                delete(ChatMessageChunk).filter_by(message_id=obj_id).execution_options(synchronize_session=False),
+            )
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        except NoResultFound:
+            raise NotFoundError(detail=f"ChatMessage object with {obj_id=!s} not found.")
+
+    async def create_partitions(self, start: datetime, months: int, *, autocommit: bool = True) -> list[str]:
+        """
+        Creates missing monthly partitions of the table.
+
+        :param start: Any moment of the first month to create a partition for.
+        :param months: Number of months to create partitions for.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+
+        :return: Names of the created partitions.
+        """
+        try:
+            created = await create_monthly_partitions(self.session, ChatMessage.__tablename__, start, months)
+
+            if autocommit:
+                await self.session.commit()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        return created
+
+    async def drop_partitions(
+        self, before: datetime, *, detach_only: bool = False, autocommit: bool = True
+    ) -> list[str]:
+        """
+        Removes partitions that only hold messages created before the given moment.
+
+        Removing a partition takes constant time regardless of its size, unlike deleting its rows. The message counters
+        of the affected sessions are decremented by a single aggregate over the partition, and the last message preview
+        is cleared for sessions that have no messages left. The cited documents and appended chunks of the expired
+        messages are deleted by their creation time.
+
+        :param before: Messages created before this moment are expired.
+        :param detach_only: If True, the partitions are kept as standalone tables, e.g. to be archived.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+
+        :return: Names of the removed partitions.
+        """
+        table = ChatMessage.__tablename__
+        expired_partitions = [
+            partition
+            for partition in await get_partitions(self.session, table)
+            if partition.upper_bound is not None and partition.upper_bound <= before
+        ]
+        expired = [partition.name for partition in expired_partitions]
+
+        try:
+            for name in expired:
+                await self.session.execute(
+                    text(
+                        f"""
+                        UPDATE chat_session
+                        SET message_count = chat_session.message_count - expired.message_count,
+                            last_message_preview = CASE
+                                WHEN chat_session.message_count = expired.message_count THEN NULL
+                                ELSE chat_session.last_message_preview
+                            END
+                        FROM (SELECT session_id, count(*) AS message_count FROM "{name}" GROUP BY session_id) AS expired
+                        WHERE chat_session.id = expired.session_id
+                        """,
+                    ),
+                )
+                await remove_partition(self.session, table, name, detach_only=detach_only)
+
+            if expired_partitions:
+                # Partitions don't overlap, so all the messages created before the last expired partition ends are gone
+                expired_before = max(
+                    partition.upper_bound for partition in expired_partitions if partition.upper_bound is not None
+                )
+
+                for model in (ChatMessageDocument, ChatMessageChunk):
+                    await self.session.execute(
+                        delete(model)
+                        .filter(model.created_at < expired_before)
+                        .execution_options(synchronize_session=False),
+                    )
+
+            if autocommit:
+                await self.session.commit()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        return expired
+
+    async def set_compression(self, method: ToastCompressionEnum | None, *, autocommit: bool = True) -> list[str]:
+        """
+        Sets the TOAST compression method of the message content and context in the table and all its partitions.
+
+        TOAST only compresses values of rows larger than about 2 KB, shorter messages are stored as they are.
+
+        :param method: Compression method, or None for the server default.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+
+        :return: Names of the altered tables.
+        """
+        try:
+            altered = await set_column_compression(
+                self.session,
+                ChatMessage.__tablename__,
+                ["content", "context"],
+                method,
+            )
+
+            if autocommit:
+                await self.session.commit()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
 
-        return await paginate(self.session, stmt)
+        return altered
@@ -1,9 +1,9 @@
+from collections.abc import Sequence
 from uuid import UUID
 
-from fastapi_pagination.ext.sqlalchemy import paginate
-
+from app.core.enums import ChatSessionSortEnum, SortOrderEnum, TotalModeEnum
 from app.core.mixins.repository import CRUDRepositoryMixin
-from app.core.pagination import Page
+from app.core.pagination import CursorPage, fetch_all, paginate_by_keyset
 from app.models import ChatSession
 from app.schemas.chat_session import ChatSessionSchema
 
@@ -11,15 +11,72 @@ from app.schemas.chat_session import ChatSessionSchema
 class ChatSessionRepository(CRUDRepositoryMixin[ChatSession, ChatSessionSchema]):
     sql_model = ChatSession
 
+    # Match `ix_chat_session_user_id_last_activity_at` and `ix_chat_session_user_id_created_at`, which are scanned
+    # backwards for the ascending order. `id` is a tie-breaker for sessions with equal timestamps.
+    keysets = {
+        ChatSessionSortEnum.LAST_ACTIVITY: (ChatSession.last_activity_at, ChatSession.id),
+        ChatSessionSortEnum.CREATED: (ChatSession.created_at, ChatSession.id),
+    }
+
     async def get_all_by_user_id(
         self,
         user_id: UUID,
         *,
         raw_result: bool = False,
-    ) -> Page[ChatSessionSchema] | list[ChatSession]:
-        stmt = self.get_query().filter_by(user_id=user_id)
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+        fields: Sequence[str] | None = None,
+        is_favorite: bool | None = None,
+        title_contains: str | None = None,
+        fuzzy: bool = False,
+        sort: ChatSessionSortEnum = ChatSessionSortEnum.LAST_ACTIVITY,
+        order: SortOrderEnum = SortOrderEnum.DESC,
+    ) -> CursorPage[ChatSessionSchema] | list[ChatSession]:
+        """
+        Returns user sessions, the most recently active first by default.
+
+        The message counts and previews are maintained on the sessions, so `chat_message` is not read. The listed
+        columns are included in the indexes of the keysets, so the sessions are read by a single index-only scan.
+
+        :param fields: Names of the columns to select, the keyset columns are always selected to build the cursor.
+                       If not provided, whole sessions are selected.
+        :param is_favorite: If provided, only the sessions with the flag are returned.
+        :param title_contains: If provided, only the sessions with the text in their titles are returned, ignoring case.
+                               Both kinds of title search are served by `ix_chat_session_title_trgm`.
+        :param fuzzy: If True, titles that contain words similar to the text (e.g. with typos) are returned as well,
+                      by `pg_trgm.word_similarity_threshold` (0.6 by default).
+        :param sort: The timestamp to order the sessions by.
+        :param order: The direction to order the sessions in.
+        """
+        keyset = self.keysets[sort]
+        descending = order == SortOrderEnum.DESC
+
+        if fields is not None:
+            fields = [*fields, *(column.key for column in keyset)]
+
+        stmt = self.get_query(fields).filter(ChatSession.user_id == user_id)
+
+        # The flag is not passed as a parameter, so that the planner can match the partial index of favorites
+        if is_favorite is not None:
+            stmt = stmt.filter(ChatSession.is_favorite if is_favorite else ~ChatSession.is_favorite)
+
+        if title_contains:
+            title_filter = ChatSession.title.icontains(title_contains, autoescape=True)
+
+            if fuzzy:
+                title_filter |= ChatSession.title.bool_op("%>")(title_contains)
+
+            stmt = stmt.filter(title_filter)
 
         if raw_result:
-            return (await self.session.scalars(stmt)).unique().all()
+            return await fetch_all(self.session, stmt.order_by(*(i.desc() if descending else i for i in keyset)))
+
+        total = await self.get_total(stmt, total_mode)
 
-        return await paginate(self.session, stmt)
+        return await paginate_by_keyset(
+            self.session,
+            stmt,
+            keyset,
+            descending=descending,
+            total=total,
+            total_mode=total_mode,
+        )
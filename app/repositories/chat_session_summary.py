@@ -0,0 +1,69 @@
+from uuid import UUID
+
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+
+from app.core.helpers.db import raise_db_error
+from app.core.mixins.repository import CRUDRepositoryMixin
+from app.models import ChatSessionSummary
+from app.schemas.chat_session_summary import ChatSessionSummarySchema
+
+
+class ChatSessionSummaryRepository(CRUDRepositoryMixin[ChatSessionSummary, ChatSessionSummarySchema]):
+    sql_model = ChatSessionSummary
+
+    @staticmethod
+    def get_latest_query(session_id: UUID) -> Select:
+        """
+        Returns a query for the latest summary of a session, a single lookup of
+        `ix_chat_session_summary_session_id_last_seq`.
+
+        :param session_id: The ID of the session, or a column of an enclosing query.
+        """
+        return (
+            select(ChatSessionSummary)
+            .filter(ChatSessionSummary.session_id == session_id)
+            .order_by(ChatSessionSummary.last_seq.desc())
+            .limit(1)
+        )
+
+    async def get_latest(self, session_id: UUID) -> ChatSessionSummary | None:
+        """
+        Returns the latest summary of a session, or None if the session has none.
+
+        :param session_id: The ID of the session.
+        """
+        return await self.session.scalar(self.get_latest_query(session_id))
+
+    async def create_checkpoint(self, obj_data: dict, *, autocommit: bool = True) -> ChatSessionSummary | None:
+        """
+        Stores a summary, unless a summary up to the same message is stored already, e.g. by a concurrent job.
+
+        :param obj_data: The summary with `session_id`, `last_seq`, `content` and `token_count`.
+        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+
+        :return: The stored summary, or None if it was stored already.
+
+        :raises ForeignKeyError: If the session does not exist.
+        """
+        stmt = (
+            insert(ChatSessionSummary)
+            .values(id=ChatSessionSummary.id_factory(), **obj_data)
+            .on_conflict_do_nothing(index_elements=[ChatSessionSummary.session_id, ChatSessionSummary.last_seq])
+            .returning(ChatSessionSummary)
+        )
+
+        try:
+            summary = await self.session.scalar(stmt)
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        return summary
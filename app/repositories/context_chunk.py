@@ -0,0 +1,83 @@
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+
+from app.core.helpers.context_chunks import CHUNK_REF_KEY, CHUNKS_KEY
+from app.core.helpers.db import raise_db_error
+from app.core.mixins.repository import CRUDRepositoryMixin
+from app.models import ContextChunk
+from app.schemas.context_chunk import ContextChunkSchema, ContextChunkStatsSchema
+
+
+class ContextChunkRepository(CRUDRepositoryMixin[ContextChunk, ContextChunkSchema]):
+    sql_model = ContextChunk
+
+    async def create_missing(self, objs_data: list[dict]) -> None:
+        """
+        Stores the chunks that are not stored yet, in a single statement.
+
+        The statement is not committed: the chunks are stored in the transaction of the messages that reference them.
+
+        :param objs_data: Chunks with `hash`, `content` and `size`.
+        """
+        # Chunks are inserted in the order of their hashes, so that concurrent inserts of the same chunks can't deadlock
+        stmt = (
+            insert(ContextChunk)
+            .values(sorted(objs_data, key=lambda obj_data: obj_data["hash"]))
+            .on_conflict_do_nothing(index_elements=[ContextChunk.hash])
+        )
+
+        try:
+            await self.session.execute(stmt)
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+    async def get_contents(self, hashes: Sequence[str]) -> dict[str, Any]:
+        """
+        Returns the contents of the stored chunks with the hashes.
+
+        :param hashes: Hashes of the chunks.
+
+        :return: Mapping of the hashes of the found chunks to their contents.
+        """
+        result = await self.session.execute(
+            select(ContextChunk.hash, ContextChunk.content).filter(ContextChunk.hash.in_(hashes)),
+        )
+
+        return dict(result.tuples().all())
+
+    async def get_stats(self) -> ContextChunkStatsSchema:
+        """
+        Calculates how much space the deduplication saves, by scanning the contexts of all messages.
+        """
+        result = await self.session.execute(
+            text(
+                f"""
+                WITH ref AS (
+                    SELECT value ->> '{CHUNK_REF_KEY}' AS hash, octet_length(value::text) AS size
+                    FROM chat_message, jsonb_array_elements(
+                        CASE jsonb_typeof(context -> '{CHUNKS_KEY}')
+                            WHEN 'array' THEN context -> '{CHUNKS_KEY}'
+                            ELSE '[]'::jsonb
+                        END
+                    )
+                    WHERE jsonb_typeof(value) = 'object' AND value ? '{CHUNK_REF_KEY}'
+                )
+                SELECT
+                    (SELECT count(*) FROM context_chunk) AS chunks,
+                    (SELECT coalesce(sum(size), 0) FROM context_chunk) AS stored_bytes,
+                    count(*) AS references,
+                    coalesce(sum(context_chunk.size), 0) AS referenced_bytes,
+                    coalesce(sum(ref.size), 0) AS reference_bytes
+                FROM ref
+                JOIN context_chunk ON context_chunk.hash = ref.hash
+                """,
+            ),
+        )
+
+        return ContextChunkStatsSchema.model_validate(result.mappings().one())
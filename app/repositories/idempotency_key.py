@@ -0,0 +1,97 @@
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+
+from app.core.exceptions.exceptions import ConflictError
+from app.core.helpers.db import raise_db_error
+from app.core.mixins.repository import CRUDRepositoryMixin
+from app.models import IdempotencyKey
+from app.schemas.idempotency_key import IdempotencyKeySchema
+
+
+class IdempotencyKeyRepository(CRUDRepositoryMixin[IdempotencyKey, IdempotencyKeySchema]):
+    sql_model = IdempotencyKey
+
+    async def get_active(self, key: str) -> IdempotencyKey | None:
+        """
+        Returns the key if it exists and has not expired.
+
+        :param key: The idempotency key.
+
+        :return: The stored key or None.
+        """
+        return await self.session.scalar(
+            self.get_query().filter(IdempotencyKey.key == key, IdempotencyKey.expires_at > func.now()),
+        )
+
+    async def create(
+        self,
+        obj_data: dict,
+        *,
+        autocommit: bool = True,
+        is_unique: bool = False,
+        **kwargs: Any,
+    ) -> IdempotencyKey:
+        """
+        Stores a key, taking over the row of an expired key with the same value.
+
+        If another transaction holds the same key, the insert waits for it to finish.
+
+        :raises ConflictError: If an active key with the same value exists, the transaction is rolled back.
+        """
+        stmt = insert(IdempotencyKey).values(**obj_data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                **{key: stmt.excluded[key] for key in obj_data if key != "id"},
+                "created_at": func.current_timestamp(),
+            },
+            where=IdempotencyKey.expires_at <= func.now(),
+        ).returning(IdempotencyKey)
+
+        try:
+            result = (await self.session.execute(stmt)).scalar_one_or_none()
+
+            if result is None:
+                await self.session.rollback()
+                raise ConflictError(detail="Idempotency key is already in use", fields={"key": obj_data["key"]})
+
+            if autocommit:
+                await self.session.commit()
+            else:
+                await self.session.flush()
+
+        except DBAPIError as ex:
+            await self.session.rollback()
+            raise_db_error(ex)
+
+        return result
+
+    async def purge_expired(self, batch_size: int) -> int:
+        """
+        Deletes expired keys in batches, each one committed on its own so that no long lock is held.
+
+        Keys that are being taken over by a request are skipped, they are not expired any more once it commits.
+
+        :param batch_size: Maximal number of keys deleted by a statement.
+
+        :return: The number of deleted keys.
+        """
+        expired = (
+            select(IdempotencyKey.id)
+            .filter(IdempotencyKey.expires_at <= func.now())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(IdempotencyKey).filter(IdempotencyKey.id.in_(expired.scalar_subquery()))
+        purged = 0
+
+        while True:
+            deleted = (await self.session.execute(stmt)).rowcount
+            await self.session.commit()
+            purged += deleted
+
+            if deleted < batch_size:
+                return purged
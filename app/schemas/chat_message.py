@@ -1,18 +1,27 @@
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from pydantic.json_schema import SkipJsonSchema
 
 from app.core.enums import SenderTypeEnum
-from app.core.schemas import BaseSchema
+from app.core.schemas import BaseSchema, PartialSchema
+from app.schemas.chat_session_summary import ChatSessionSummarySchema
 
 
 class ChatMessageBaseSchema(BaseSchema):
     id: UUID
     session_id: UUID
+    seq: int
     sender: SenderTypeEnum
     content: str
     context: dict[str, Any]
+    # If True, `content` is a preview and `context` is empty, the full message is returned by its own endpoint
+    is_offloaded: bool = False
+    # If True, content is still being appended to the message
+    is_streaming: bool = False
+    # Tokens of the full content, content appended to a streaming message is counted when it is finalized
+    token_count: int = 0
 
 
 class ChatMessageSchema(ChatMessageBaseSchema): ...
@@ -21,8 +30,57 @@ class ChatMessageSchema(ChatMessageBaseSchema): ...
 class ChatMessageDetailSchema(ChatMessageBaseSchema): ...
 
 
+class ChatMessagePartialSchema(PartialSchema):
+    # Only the fields selected with the `fields` query parameter are set
+    id: UUID = None
+    session_id: UUID = None
+    seq: int = None
+    sender: SenderTypeEnum = None
+    content: str = None
+    context: dict[str, Any] = None
+    is_offloaded: bool = None
+    is_streaming: bool = None
+    token_count: int = None
+
+
+class ChatMessageChangesSchema(BaseSchema):
+    # Messages added after the requested position, in the order they were added
+    items: list[ChatMessagePartialSchema]
+    # Position of the last returned message, to be passed as `after` to fetch the messages added since
+    cursor: str
+    # Whether more messages were added than returned, they can be fetched right away with `cursor`
+    has_more: bool
+
+
+class ChatMessageWindowSchema(BaseSchema):
+    # The most recent messages that fit into the token budget, in the order they were added
+    items: list[ChatMessagePartialSchema]
+    # Total tokens of the returned summary and messages
+    token_count: int
+    # Whether older messages were left out to fit into the budget
+    has_more: bool
+    # The latest summary of the session, followed by the messages, if requested and the session has one
+    summary: ChatSessionSummarySchema | None = None
+
+
+class ChatMessageSearchResultSchema(BaseSchema):
+    id: UUID
+    session_id: UUID
+    seq: int
+    sender: SenderTypeEnum
+    created_at: datetime
+    # Relevance of the message to the query, results are returned the most relevant first
+    rank: float
+    # Fragments of the content around the matched words, which are wrapped in <b></b>
+    snippet: str
+
+
 class ChatMessageCreateSchema(BaseSchema):
+    # Client-supplied ID, re-sending a message with the same ID returns the stored message
+    id: UUID | None = None
     session_id: SkipJsonSchema[UUID] = None
     sender: SenderTypeEnum
     content: str
     context: dict[str, Any]
+    # If True, the message is opened for its content to be appended, and must be finalized afterwards
+    is_streaming: bool = False
@@ -1,6 +1,13 @@
+from datetime import datetime
 from uuid import UUID
 
-from app.core.schemas import BaseSchema
+from pydantic import Field
+
+from app.core.schemas import BaseSchema, PartialSchema
+from app.schemas.chat_message import ChatMessageCreateSchema
+
+# Titles are included in the indexes of the session list, which limit the size of an index row
+TITLE_MAX_LENGTH = 255
 
 
 class ChatSessionBaseSchema(BaseSchema):
@@ -8,6 +15,9 @@ class ChatSessionBaseSchema(BaseSchema):
     user_id: UUID
     title: str
     is_favorite: bool
+    message_count: int
+    last_activity_at: datetime
+    last_message_preview: str | None
 
 
 class ChatSessionSchema(ChatSessionBaseSchema): ...
@@ -16,11 +26,29 @@ class ChatSessionSchema(ChatSessionBaseSchema): ...
 class ChatSessionDetailSchema(ChatSessionBaseSchema): ...
 
 
+class ChatSessionPartialSchema(PartialSchema):
+    # Only the fields selected with the `fields` query parameter are set
+    id: UUID = None
+    user_id: UUID = None
+    title: str = None
+    is_favorite: bool = None
+    message_count: int = None
+    last_activity_at: datetime = None
+    last_message_preview: str | None = None
+
+
+class ChatSessionCreatedSchema(ChatSessionDetailSchema):
+    message_ids: list[UUID] = []
+
+
 class ChatSessionCreateSchema(BaseSchema):
+    # Client-supplied ID, re-sending a session with the same ID returns the stored session
+    id: UUID | None = None
     user_id: UUID
-    title: str
+    title: str = Field(max_length=TITLE_MAX_LENGTH)
+    messages: list[ChatMessageCreateSchema] = Field(default_factory=list, max_length=200)
 
 
 class ChatSessionUpdateSchema(BaseSchema):
-    title: str = None
+    title: str = Field(None, max_length=TITLE_MAX_LENGTH)
     is_favorite: bool = None
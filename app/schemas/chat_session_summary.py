@@ -0,0 +1,22 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import computed_field
+
+from app.core.pagination import encode_keyset_cursor
+from app.core.schemas import BaseSchema
+
+
+class ChatSessionSummarySchema(BaseSchema):
+    session_id: UUID
+    # Sequence number of the last summarized message
+    last_seq: int
+    content: str
+    token_count: int
+    created_at: datetime
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def cursor(self) -> str:
+        # Position of the last summarized message, the messages after it are read by `/messages/since`
+        return encode_keyset_cursor([self.last_seq])
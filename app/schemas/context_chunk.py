@@ -0,0 +1,31 @@
+from typing import Any
+
+from pydantic import computed_field
+
+from app.core.schemas import BaseSchema
+
+
+class ContextChunkSchema(BaseSchema):
+    hash: str
+    content: Any
+    size: int
+
+
+class ContextChunkStatsSchema(BaseSchema):
+    # Number and total size of the stored distinct chunks
+    chunks: int
+    stored_bytes: int
+    # Number of chunk references in message contexts, the size of the chunks they point to and of the references
+    references: int
+    referenced_bytes: int
+    reference_bytes: int
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def dedup_ratio(self) -> float:
+        return self.referenced_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def saved_bytes(self) -> int:
+        return self.referenced_bytes - self.stored_bytes - self.reference_bytes
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Any
+
+from app.core.schemas import BaseSchema
+
+
+class IdempotencyKeySchema(BaseSchema):
+    key: str
+    request_hash: str
+    response: Any
+    expires_at: datetime
@@ -1,20 +1,453 @@
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi_pagination.links import Page
+import anyio
+from fastapi import Depends
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.config import config
+from app.core.dependencies import get_db_session
+from app.core.enums import ToastCompressionEnum, TotalModeEnum
+from app.core.exceptions.exceptions import BadRequestError, NotFoundError
+from app.core.helpers.context_chunks import get_document_ids
+from app.core.helpers.partitions import month_start
+from app.core.listener import NotificationListener
 from app.core.mixins.service import CRUDServiceMixin
+from app.core.pagination import CursorPage, decode_keyset_cursor, encode_keyset_cursor
 from app.models import ChatMessage
+from app.models.chat_message import NEW_MESSAGE_CHANNEL
 from app.repositories.chat_message import ChatMessageRepository
-from app.schemas.chat_message import ChatMessageSchema
+from app.schemas.chat_message import (
+    ChatMessageChangesSchema,
+    ChatMessageCreateSchema,
+    ChatMessagePartialSchema,
+    ChatMessageSchema,
+    ChatMessageSearchResultSchema,
+    ChatMessageWindowSchema,
+)
+from app.services.context_chunk import ContextChunkService
 
 
 class ChatMessageService(CRUDServiceMixin[ChatMessageRepository, ChatMessage, ChatMessageSchema]):
     repository_class = ChatMessageRepository
 
+    # Wakes up streams of sessions with new messages, shared by all requests of the worker
+    listener = NotificationListener(NEW_MESSAGE_CHANNEL)
+
+    def __init__(self, db_session: Annotated[AsyncSession, Depends(get_db_session)]):
+        super().__init__(db_session)
+        self.chunk_service = ContextChunkService(db_session)
+
+    async def _dump(self, objs: list[ChatMessageCreateSchema]) -> list[dict]:
+        """
+        Dumps messages to be stored, with the chunks of their contexts replaced by references.
+
+        The IDs of the cited documents are taken from the chunks before they are replaced.
+        """
+        contexts = await self.chunk_service.deduplicate([obj.context for obj in objs])
+
+        return [
+            {**obj.model_dump(exclude_none=True), "context": context, "document_ids": get_document_ids(obj.context)}
+            for obj, context in zip(objs, contexts)
+        ]
+
+    async def expand_contexts(self, messages: Sequence[Any]) -> list[Any]:
+        """
+        Replaces chunk references in the contexts of stored messages with the chunks.
+
+        :param messages: Message objects, schemas or rows with the `context` column.
+
+        :return: The messages, rows are converted to dicts.
+        """
+        contexts = await self.chunk_service.expand([message.context for message in messages])
+        results: list[Any] = []
+
+        for message, context in zip(messages, contexts):
+            if isinstance(message, ChatMessage):
+                # Not tracked as a change, so the expanded context is never written back
+                set_committed_value(message, "context", context)
+                results.append(message)
+            elif isinstance(message, BaseModel):
+                results.append(message.model_copy(update={"context": context}))
+            else:
+                results.append({**message._mapping, "context": context})
+
+        return results
+
+    async def get_session_message(
+        self,
+        session_id: UUID,
+        message_id: UUID,
+        *,
+        load_offloaded: bool = True,
+    ) -> ChatMessage:
+        """
+        Returns a message of a session with its full content and context, including the content appended so far
+        to a streaming message.
+
+        :param session_id: The ID of the session.
+        :param message_id: The ID of the message.
+        :param load_offloaded: If False, offloaded content and context are not read from the blob storage.
+
+        :raises NotFoundError: If the session has no message with the ID.
+        """
+        message = await self.repository.get_session_message(session_id, message_id)
+
+        if not load_offloaded:
+            (message,) = await self.repository.load_streaming([message])
+            return message
+
+        (message,) = await self.load_offloaded([message])
+        (message,) = await self.repository.load_streaming([message])
+
+        return (await self.expand_contexts([message]))[0]
+
+    async def load_offloaded(self, messages: Sequence[ChatMessage]) -> Sequence[ChatMessage]:
+        return await self.repository.load_offloaded(messages)
+
+    def get_content_path(self, message: ChatMessage) -> Path | None:
+        """
+        Returns the local file with the offloaded content of a message, if the blob storage keeps one.
+        """
+        if message.content_blob is None:
+            return None
+
+        return self.repository.blob_storage.get_path(message.content_blob)
+
+    async def create(
+        self,
+        obj: ChatMessageCreateSchema,
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> ChatMessage:
+        (obj_data,) = await self._dump([obj])
+        message = await self.repository.create(obj_data, autocommit=autocommit, **kwargs)
+
+        return (await self.expand_contexts([message]))[0]
+
+    async def create_many(
+        self,
+        objs: list[ChatMessageCreateSchema],
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> list[ChatMessage]:
+        messages = await self.repository.create_many(await self._dump(objs), autocommit=autocommit, **kwargs)
+
+        return await self.expand_contexts(messages)
+
+    async def upsert(
+        self,
+        obj: ChatMessageCreateSchema,
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> tuple[ChatMessage, bool]:
+        (obj_data,) = await self._dump([obj])
+        message, created = await self.repository.upsert(obj_data, autocommit=autocommit, **kwargs)
+
+        return (await self.expand_contexts([message]))[0], created
+
+    async def append_content(self, session_id: UUID, message_id: UUID, chunks: AsyncIterator[str]) -> None:
+        """
+        Appends content to a streaming message as it arrives, e.g. the tokens of an answer being generated.
+
+        The content is buffered and stored in batches, when `message_chunk_flush_size` characters are buffered or
+        `message_chunk_flush_interval` seconds have passed since the previous batch, and when the chunks end.
+        Each batch is committed, so readers see the content stored so far.
+
+        :param session_id: The ID of the session.
+        :param message_id: The ID of the message.
+        :param chunks: The content to append, in parts.
+
+        :raises NotFoundError: If the session has no message with the ID.
+        :raises ConflictError: If the message is not streaming.
+        """
+        buffer: list[str] = []
+        buffered = 0
+        flushed_at = time.monotonic()
+        flushed = False
+
+        async for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+
+            if (
+                buffered >= config.message_chunk_flush_size
+                or time.monotonic() - flushed_at >= config.message_chunk_flush_interval
+            ):
+                await self.repository.append_content(session_id, message_id, "".join(buffer))
+                buffer, buffered, flushed_at, flushed = [], 0, time.monotonic(), True
+
+        # An empty append still checks that the message can be appended to
+        if buffer or not flushed:
+            await self.repository.append_content(session_id, message_id, "".join(buffer))
+
+    async def finalize(self, session_id: UUID, message_id: UUID) -> ChatMessage:
+        """
+        Ends a streaming message, see `ChatMessageRepository.finalize`.
+
+        :return: The message with its full content and context.
+
+        :raises NotFoundError: If the session has no message with the ID.
+        :raises ConflictError: If the message is not streaming.
+        """
+        message = await self.repository.finalize(session_id, message_id)
+        (message,) = await self.load_offloaded([message])
+
+        return (await self.expand_contexts([message]))[0]
+
     async def get_all_by_session_id(
         self,
         session_id: UUID,
         *,
         raw_result: bool = False,
-    ) -> Page[ChatMessageSchema] | list[ChatMessage]:
-        return await self.repository.get_all_by_session_id(session_id=session_id, raw_result=raw_result)
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+        fields: Sequence[str] | None = None,
+    ) -> CursorPage[ChatMessageSchema] | list[ChatMessage]:
+        result = await self.repository.get_all_by_session_id(
+            session_id=session_id,
+            raw_result=raw_result,
+            total_mode=total_mode,
+            fields=fields,
+        )
+
+        if fields is not None and "context" not in fields:
+            return result
+
+        if isinstance(result, list):
+            return await self.expand_contexts(result)
+
+        result.items = await self.expand_contexts(result.items)
+
+        return result
+
+    async def get_new_by_session_id(
+        self,
+        session_id: UUID,
+        after: str | None,
+        *,
+        size: int,
+        fields: Sequence[str] | None = None,
+    ) -> ChatMessageChangesSchema | None:
+        """
+        Returns messages of a session added or finalized after a cursor, see `changes_keyset` of
+        `ChatMessageRepository.get_new_by_session_id`.
+
+        :param session_id: The ID of the session.
+        :param after: Cursor of the last seen message, a `cursor` returned by this method, a `next_page`
+                      of the session messages or the `cursor` of a summary. If None, messages are returned from
+                      the first one.
+        :param size: Maximum number of messages to return.
+        :param fields: Names of the columns to select, whole messages are selected if not provided.
+
+        :return: The messages, or None if no messages were added or finalized.
+
+        :raises NotFoundError: If the session does not exist.
+        :raises BadRequestError: If the cursor is not valid.
+        """
+        keyset = self.repository.changes_keyset
+        last_seen = None
+
+        if after:
+            try:
+                last_seen = decode_keyset_cursor(after, keyset)
+
+            except BadRequestError:
+                # A `seq` of the message list or a summary, the messages finalized since it was allocated follow it
+                (seq,) = decode_keyset_cursor(after, self.repository.keyset)
+                last_seen = [seq, 0]
+
+        # One extra message is fetched to find out whether there are more
+        messages = await self.repository.get_new_by_session_id(
+            session_id, last_seen, limit=size + 1, fields=fields, keyset=keyset
+        )
+
+        if not messages:
+            return None
+
+        has_more = len(messages) > size
+        messages = messages[:size]
+        cursor = encode_keyset_cursor([getattr(messages[-1], column.key) for column in keyset])
+
+        if fields is None or "context" in fields:
+            messages = await self.expand_contexts(messages)
+
+        return ChatMessageChangesSchema(items=messages, cursor=cursor, has_more=has_more)
+
+    async def get_window_by_session_id(
+        self,
+        session_id: UUID,
+        *,
+        max_tokens: int,
+        fields: Sequence[str],
+        with_summary: bool = False,
+    ) -> ChatMessageWindowSchema:
+        """
+        Returns the most recent messages of a session that fit into a budget of tokens, e.g. for the context window
+        of a model, see `ChatMessageRepository.get_window_by_session_id`.
+
+        The token counts are of the full content, so offloaded content is returned in full.
+
+        :param session_id: The ID of the session.
+        :param max_tokens: The budget of tokens.
+        :param fields: Names of the fields to return.
+        :param with_summary: If True, the window starts with the latest summary of the session.
+
+        :raises NotFoundError: If the session does not exist.
+        """
+        messages, token_count, has_more, summary = await self.repository.get_window_by_session_id(
+            session_id, max_tokens, with_summary=with_summary
+        )
+
+        if {"content", "context"} & set(fields):
+            messages = await self.load_offloaded(messages)
+            messages = await self.repository.load_streaming(messages)
+
+        if "context" in fields:
+            messages = await self.expand_contexts(messages)
+
+        return ChatMessageWindowSchema(
+            items=[
+                ChatMessagePartialSchema.model_validate({field: getattr(message, field) for field in fields})
+                for message in messages
+            ],
+            token_count=token_count,
+            has_more=has_more,
+            summary=summary,
+        )
+
+    async def stream_new_by_session_id(
+        self,
+        session_id: UUID,
+        after: str | None,
+        *,
+        size: int,
+        fields: Sequence[str] | None = None,
+    ) -> AsyncGenerator[ChatMessageChangesSchema | None, None]:
+        """
+        Yields messages of a session added or finalized after a cursor, as they are added or finalized.
+
+        The stream subscribes to the session before the first read, so that no message is missed between them.
+        On a notification, the messages after the last yielded one are read by `get_new_by_session_id`,
+        so the notifications that arrive while the consumer is slow collapse into a single read.
+        The read transaction is ended after each read, so no connection is held while the stream waits.
+
+        :param session_id: The ID of the session.
+        :param after: Cursor of the last seen message, see `get_new_by_session_id`.
+        :param size: Maximum number of messages to yield at once.
+        :param fields: Names of the columns to select, whole messages are selected if not provided.
+
+        :return: The messages added since the last yield. The first yield is the messages added after `after`,
+                 or None if there are none, then None is yielded after `message_stream_keepalive_interval` seconds
+                 without new messages.
+
+        :raises NotFoundError: If the session does not exist, before the first yield. The stream ends when
+                               the session is deleted.
+        :raises BadRequestError: If the cursor is not valid, before the first yield.
+        """
+
+        async def read(after: str | None) -> ChatMessageChangesSchema | None:
+            # The stream is cancelled when the client disconnects, which must not interrupt a query,
+            # or the connection would not be returned to the pool cleanly
+            with anyio.CancelScope(shield=True):
+                changes = await self.get_new_by_session_id(session_id, after, size=size, fields=fields)
+                await self.repository.session.commit()
+
+            return changes
+
+        async with self.listener.subscribe(str(session_id)) as subscription:
+            changes = await read(after)
+
+            yield changes
+
+            while True:
+                if changes is not None:
+                    after = changes.cursor
+
+                # A consumer that is behind reads the rest of the messages without waiting
+                waits = changes is None or not changes.has_more
+
+                if waits and not await self.listener.wait(subscription, config.message_stream_keepalive_interval):
+                    changes = None
+                    yield None
+                    continue
+
+                try:
+                    changes = await read(after)
+
+                except NotFoundError:
+                    return  # The session is deleted
+
+                if changes is not None:
+                    yield changes
+
+    async def get_all_by_document_id(
+        self,
+        doc_id: str,
+        *,
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+        fields: Sequence[str] | None = None,
+    ) -> CursorPage[ChatMessageSchema]:
+        result = await self.repository.get_all_by_document_id(doc_id=doc_id, total_mode=total_mode, fields=fields)
+
+        if fields is not None and "context" not in fields:
+            return result
+
+        result.items = await self.expand_contexts(result.items)
+
+        return result
+
+    async def search(
+        self,
+        user_id: UUID,
+        query: str,
+        *,
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+    ) -> CursorPage[ChatMessageSearchResultSchema]:
+        return await self.repository.search(user_id=user_id, query=query, total_mode=total_mode)
+
+    async def maintain_partitions(
+        self,
+        *,
+        months_ahead: int,
+        retention_months: int | None = None,
+        detach_only: bool = False,
+    ) -> tuple[list[str], list[str]]:
+        """
+        Creates partitions for the current and upcoming months, and removes expired partitions.
+
+        :param months_ahead: Number of months after the current one to create partitions for.
+        :param retention_months: Number of full months to keep messages for, besides the current one.
+                                 If None, messages are kept forever.
+        :param detach_only: If True, expired partitions are detached and kept as standalone tables.
+
+        :return: Names of the created and removed partitions.
+        """
+        now = datetime.now(UTC)
+
+        created = await self.repository.create_partitions(now, months_ahead + 1)
+
+        if retention_months is None:
+            return created, []
+
+        removed = await self.repository.drop_partitions(month_start(now, -retention_months), detach_only=detach_only)
+
+        return created, removed
+
+    async def set_compression(self, method: ToastCompressionEnum | None) -> list[str]:
+        """
+        Sets the TOAST compression method of the message content and context.
+
+        :param method: Compression method, or None for the server default.
+
+        :return: Names of the altered tables.
+        """
+        return await self.repository.set_compression(method)
@@ -1,19 +1,127 @@
+from collections.abc import Sequence
+from typing import Annotated, Any
 from uuid import UUID
 
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.dependencies import get_db_session
+from app.core.enums import ChatSessionSortEnum, SortOrderEnum, TotalModeEnum
 from app.core.mixins.service import CRUDServiceMixin
-from app.core.pagination import Page
+from app.core.pagination import CursorPage
 from app.models import ChatSession
 from app.repositories.chat_session import ChatSessionRepository
-from app.schemas.chat_session import ChatSessionSchema
+from app.schemas.chat_session import ChatSessionCreatedSchema, ChatSessionCreateSchema, ChatSessionSchema
+from app.services.chat_message import ChatMessageService
 
 
 class ChatSessionService(CRUDServiceMixin[ChatSessionRepository, ChatSession, ChatSessionSchema]):
     repository_class = ChatSessionRepository
 
+    def __init__(self, db_session: Annotated[AsyncSession, Depends(get_db_session)]):
+        super().__init__(db_session)
+        self.message_service = ChatMessageService(db_session)
+
+    async def create(
+        self,
+        obj: ChatSessionCreateSchema,
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> ChatSessionCreatedSchema:
+        """
+        Creates a session together with its initial messages in a single transaction.
+
+        :param obj: Session data with optional initial messages.
+        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Created session with the IDs of the created messages.
+        """
+        chat_session = await self.repository.create(
+            obj.model_dump(exclude={"messages"}, exclude_none=True),
+            autocommit=autocommit and not obj.messages,
+            **kwargs,
+        )
+
+        return await self._create_messages(chat_session, obj, autocommit=autocommit)
+
+    async def upsert(
+        self,
+        obj: ChatSessionCreateSchema,
+        *,
+        autocommit: bool = True,
+        **kwargs: Any,
+    ) -> tuple[ChatSessionCreatedSchema, bool]:
+        """
+        Creates a session with a client-supplied ID together with its initial messages,
+        or returns the stored session with the same ID.
+
+        The messages are only created with the session, re-sending a stored session doesn't create them again.
+
+        :param obj: Session data with the `id` and optional initial messages.
+        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The stored session and a flag that tells whether it was created.
+        """
+        chat_session, created = await self.repository.upsert(
+            obj.model_dump(exclude={"messages"}, exclude_none=True),
+            autocommit=autocommit and not obj.messages,
+            **kwargs,
+        )
+
+        if not created:
+            return ChatSessionCreatedSchema.model_validate(chat_session), False
+
+        return await self._create_messages(chat_session, obj, autocommit=autocommit), True
+
+    async def _create_messages(
+        self,
+        chat_session: ChatSession,
+        obj: ChatSessionCreateSchema,
+        *,
+        autocommit: bool,
+    ) -> ChatSessionCreatedSchema:
+        messages = await self.message_service.create_many(
+            [message.model_copy(update={"session_id": chat_session.id}) for message in obj.messages],
+            autocommit=autocommit,
+        )
+
+        update: dict[str, Any] = {"message_ids": [message.id for message in messages]}
+
+        if messages:
+            # The message inserts have updated the session row, the same values are set here without reading it back
+            update |= {
+                "message_count": len(messages),
+                "last_activity_at": messages[-1].created_at,
+                "last_message_preview": messages[-1].content[: config.session_preview_length],
+            }
+
+        return ChatSessionCreatedSchema.model_validate(chat_session).model_copy(update=update)
+
     async def get_all_by_user_id(
         self,
         user_id: UUID,
         *,
         raw_result: bool = False,
-    ) -> Page[ChatSessionSchema] | list[ChatSession]:
-        return await self.repository.get_all_by_user_id(user_id=user_id, raw_result=raw_result)
+        total_mode: TotalModeEnum = TotalModeEnum.NONE,
+        fields: Sequence[str] | None = None,
+        is_favorite: bool | None = None,
+        title_contains: str | None = None,
+        fuzzy: bool = False,
+        sort: ChatSessionSortEnum = ChatSessionSortEnum.LAST_ACTIVITY,
+        order: SortOrderEnum = SortOrderEnum.DESC,
+    ) -> CursorPage[ChatSessionSchema] | list[ChatSession]:
+        return await self.repository.get_all_by_user_id(
+            user_id=user_id,
+            raw_result=raw_result,
+            total_mode=total_mode,
+            fields=fields,
+            is_favorite=is_favorite,
+            title_contains=title_contains,
+            fuzzy=fuzzy,
+            sort=sort,
+            order=order,
+        )
@@ -0,0 +1,196 @@
+from collections.abc import Sequence
+from itertools import takewhile
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import BackgroundTasks, Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import config
+from app.core.dependencies import get_db_session
+from app.core.exceptions.exceptions import NotFoundError
+from app.core.logger import log
+from app.core.mixins.service import CRUDServiceMixin
+from app.core.summarizer import get_summarizer
+from app.core.tokenizer import get_tokenizer
+from app.models import ChatMessage, ChatSessionSummary
+from app.repositories.chat_session_summary import ChatSessionSummaryRepository
+from app.schemas.chat_message import ChatMessageBaseSchema
+from app.schemas.chat_session import ChatSessionCreatedSchema
+from app.schemas.chat_session_summary import ChatSessionSummarySchema
+from app.services.chat_message import ChatMessageService
+
+
+class ChatSessionSummaryService(
+    CRUDServiceMixin[ChatSessionSummaryRepository, ChatSessionSummary, ChatSessionSummarySchema],
+):
+    repository_class = ChatSessionSummaryRepository
+
+    def __init__(self, db_session: Annotated[AsyncSession, Depends(get_db_session)]):
+        super().__init__(db_session)
+        self.message_service = ChatMessageService(db_session)
+        self.summarizer = get_summarizer()
+        self.tokenizer = get_tokenizer()
+
+    @classmethod
+    def get_due_positions(cls, messages: Sequence[ChatMessage | ChatMessageBaseSchema]) -> dict[UUID, int]:
+        """
+        Returns the positions up to which the histories of sessions are due to be summarized after messages were
+        added to them.
+
+        A summary is due every `summary_interval` messages, and covers all the messages but the latest
+        `summary_interval` ones, which are kept as they are. E.g. with an interval of 50, the 100th message of
+        a session triggers a summary up to the 50th one, and the 150th message a summary up to the 100th one.
+
+        :param messages: The added messages, models or their responses.
+
+        :return: Mapping of the IDs of the sessions to the sequence numbers of their last messages to summarize.
+        """
+        seqs: dict[UUID, list[int]] = {}
+
+        for message in messages:
+            seqs.setdefault(message.session_id, []).append(message.seq)
+
+        positions = {}
+
+        for session_id, session_seqs in seqs.items():
+            if (position := cls.get_due_position(min(session_seqs), max(session_seqs))) is not None:
+                positions[session_id] = position
+
+        return positions
+
+    @staticmethod
+    def get_due_position(first_seq: int, last_seq: int) -> int | None:
+        """
+        Returns the position up to which the history of a session is due to be summarized after the messages from
+        `first_seq` to `last_seq` were added to it, see `get_due_positions`.
+
+        :param first_seq: The sequence number of the first added message.
+        :param last_seq: The sequence number of the last added message.
+
+        :return: The sequence number of the last message to summarize, or None if no summary is due.
+        """
+        intervals = last_seq // config.summary_interval
+
+        # The messages have reached a multiple of the interval
+        if intervals > (first_seq - 1) // config.summary_interval and intervals > 1:
+            return (intervals - 1) * config.summary_interval
+
+        return None
+
+    @classmethod
+    def schedule(
+        cls,
+        background_tasks: BackgroundTasks,
+        session_maker: async_sessionmaker[AsyncSession],
+        messages: Sequence[ChatMessage | ChatMessageBaseSchema],
+    ) -> None:
+        """
+        Schedules the summaries that are due after messages were added, to run after the response is sent.
+
+        :param background_tasks: Background tasks of the request.
+        :param session_maker: Maker of the database sessions of the tasks, the session of the request is closed
+                              by the time they run.
+        :param messages: The added messages.
+        """
+        for session_id, up_to_seq in cls.get_due_positions(messages).items():
+            background_tasks.add_task(cls.summarize_in_background, session_maker, session_id, up_to_seq)
+
+    @classmethod
+    def schedule_created_session(
+        cls,
+        background_tasks: BackgroundTasks,
+        session_maker: async_sessionmaker[AsyncSession],
+        chat_session: ChatSessionCreatedSchema,
+    ) -> None:
+        """
+        Schedules the summary that is due after a session was created with initial messages, see `schedule`.
+
+        The initial messages are the first ones of the session, so their sequence numbers are known without reading
+        them: from 1 to the number of the messages.
+
+        :param background_tasks: Background tasks of the request.
+        :param session_maker: Maker of the database sessions of the tasks.
+        :param chat_session: The created session.
+        """
+        if (up_to_seq := cls.get_due_position(1, len(chat_session.message_ids))) is not None:
+            background_tasks.add_task(cls.summarize_in_background, session_maker, chat_session.id, up_to_seq)
+
+    async def get_latest(self, session_id: UUID) -> ChatSessionSummary:
+        """
+        Returns the latest summary of a session.
+
+        :param session_id: The ID of the session.
+
+        :raises NotFoundError: If the session has no summary.
+        """
+        if (summary := await self.repository.get_latest(session_id)) is None:
+            raise NotFoundError(detail=f"ChatSessionSummary object with {session_id=!s} not found.")
+
+        return summary
+
+    async def summarize(self, session_id: UUID, up_to_seq: int) -> ChatSessionSummary | None:
+        """
+        Summarizes the history of a session up to a message, incrementally: the latest summary is compacted with
+        the messages after it, which are read in pages of `summary_interval` messages. The summary ends before
+        the first streaming message.
+
+        :param session_id: The ID of the session.
+        :param up_to_seq: The sequence number of the last message to summarize.
+
+        :return: The created summary, or None if the history is summarized up to the message already.
+
+        :raises NotFoundError: If the session does not exist.
+        """
+        latest = await self.repository.get_latest(session_id)
+        content, last_seq = (latest.content, latest.last_seq) if latest else (None, 0)
+        summarized_seq = last_seq
+
+        while summarized_seq < up_to_seq:
+            messages = await self.message_service.repository.get_new_by_session_id(
+                session_id, [summarized_seq], limit=config.summary_interval
+            )
+
+            page = [message for message in messages if message.seq <= up_to_seq]
+            # The content of a streaming message is not complete yet, the summary stops before it and a later one
+            # summarizes it once it is finalized
+            messages = list(takewhile(lambda message: not message.is_streaming, page))
+
+            if messages:
+                messages = await self.message_service.load_offloaded(messages)
+                content = await self.summarizer.summarize(content, messages)
+                summarized_seq = messages[-1].seq
+
+            if not messages or len(messages) < len(page):
+                break
+
+        if content is None or summarized_seq == last_seq:
+            return None
+
+        return await self.repository.create_checkpoint(
+            {
+                "session_id": session_id,
+                "last_seq": summarized_seq,
+                "content": content,
+                "token_count": self.tokenizer.count(content),
+            },
+        )
+
+    @classmethod
+    async def summarize_in_background(
+        cls,
+        session_maker: async_sessionmaker[AsyncSession],
+        session_id: UUID,
+        up_to_seq: int,
+    ) -> None:
+        """
+        Runs `summarize` in a database session of its own, e.g. after the response to a request is sent.
+
+        Failures are logged, the messages are summarized by the next summary of the session.
+        """
+        async with session_maker() as db_session:
+            try:
+                await cls(db_session).summarize(session_id, up_to_seq)
+
+            except Exception:
+                log.exception("Session summary failed", session_id=str(session_id), up_to_seq=up_to_seq)
@@ -0,0 +1,107 @@
+import math
+from typing import Any
+
+from app.core.cache import TTLCache
+from app.core.config import config
+from app.core.helpers.context_chunks import CHUNK_REF_KEY, CHUNKS_KEY, get_chunk_hash, get_chunk_ref, normalize_chunk
+from app.core.mixins.service import CRUDServiceMixin
+from app.models import ContextChunk
+from app.repositories.context_chunk import ContextChunkRepository
+from app.schemas.context_chunk import ContextChunkSchema, ContextChunkStatsSchema
+
+
+class ContextChunkService(CRUDServiceMixin[ContextChunkRepository, ContextChunk, ContextChunkSchema]):
+    repository_class = ContextChunkRepository
+
+    # Contents of the chunks by their hashes, shared by all requests of the worker.
+    # Chunks never change, so the entries don't expire and only the least recently used ones are evicted.
+    cache: TTLCache[str, Any] = TTLCache(maxsize=config.context_chunk_cache_size, ttl=math.inf)
+
+    async def deduplicate(self, contexts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Replaces the chunks of the contexts with references to their hashes, and stores the chunks that are new.
+
+        Chunks smaller than `context_chunk_min_size` are kept inline, unless they look like references: those are
+        stored as well, so that they are not mistaken for references to other chunks when they are expanded.
+
+        :param contexts: Message contexts with inline chunks.
+
+        :return: The contexts with chunk references, in the same order.
+        """
+        chunks: dict[str, dict] = {}
+        results = []
+
+        for context in contexts:
+            if not isinstance(context_chunks := context.get(CHUNKS_KEY), list):
+                results.append(context)
+                continue
+
+            refs = []
+
+            for chunk in context_chunks:
+                normalized_chunk = normalize_chunk(chunk)
+
+                if len(normalized_chunk) < config.context_chunk_min_size and get_chunk_ref(chunk) is None:
+                    refs.append(chunk)
+                    continue
+
+                chunk_hash = get_chunk_hash(normalized_chunk)
+                chunks[chunk_hash] = {"hash": chunk_hash, "content": chunk, "size": len(normalized_chunk)}
+                # The content of a hash is always the same, so it can be cached before the chunk is committed
+                self.cache.set(chunk_hash, chunk)
+                refs.append({CHUNK_REF_KEY: chunk_hash})
+
+            results.append({**context, CHUNKS_KEY: refs})
+
+        if chunks:
+            await self.repository.create_missing(list(chunks.values()))
+
+        return results
+
+    async def expand(self, contexts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Replaces the chunk references of the contexts with the chunks.
+
+        The chunks are looked up in the cache first, and the missing ones are fetched in a single query.
+        References to unknown chunks are left as is.
+
+        :param contexts: Message contexts with chunk references.
+
+        :return: The contexts with inline chunks, in the same order.
+        """
+        hashes = {
+            ref
+            for context in contexts
+            if isinstance(context_chunks := context.get(CHUNKS_KEY), list)
+            for chunk in context_chunks
+            if (ref := get_chunk_ref(chunk)) is not None
+        }
+
+        if not hashes:
+            return contexts
+
+        contents = {chunk_hash: content for chunk_hash in hashes if (content := self.cache.get(chunk_hash)) is not None}
+
+        if missing := hashes.difference(contents):
+            for chunk_hash, content in (await self.repository.get_contents(list(missing))).items():
+                self.cache.set(chunk_hash, content)
+                contents[chunk_hash] = content
+
+        results = []
+
+        for context in contexts:
+            if isinstance(context_chunks := context.get(CHUNKS_KEY), list):
+                context = {
+                    **context,
+                    CHUNKS_KEY: [
+                        contents.get(ref, chunk) if (ref := get_chunk_ref(chunk)) is not None else chunk
+                        for chunk in context_chunks
+                    ],
+                }
+
+            results.append(context)
+
+        return results
+
+    async def get_stats(self) -> ContextChunkStatsSchema:
+        return await self.repository.get_stats()
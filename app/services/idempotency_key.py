@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import config
+from app.core.exceptions.exceptions import ConflictError, UnprocessableEntityError
+from app.core.mixins.service import CRUDServiceMixin
+from app.core.schemas import IdempotencyRequestSchema
+from app.models import IdempotencyKey
+from app.repositories.idempotency_key import IdempotencyKeyRepository
+from app.schemas.idempotency_key import IdempotencyKeySchema
+
+
+class IdempotencyKeyService(CRUDServiceMixin[IdempotencyKeyRepository, IdempotencyKey, IdempotencyKeySchema]):
+    repository_class = IdempotencyKeyRepository
+
+    # In-process front of the `idempotency_key` table, shared by all requests of the worker
+    cache: TTLCache[str, IdempotencyKeySchema] = TTLCache(
+        maxsize=config.idempotency_cache_size,
+        ttl=config.idempotency_key_ttl,
+    )
+
+    def _cache(self, stored: IdempotencyKeySchema) -> IdempotencyKeySchema:
+        ttl = (stored.expires_at - datetime.now(timezone.utc)).total_seconds()
+        self.cache.set(stored.key, stored, ttl=ttl)
+
+        return stored
+
+    async def get_stored(self, request: IdempotencyRequestSchema) -> IdempotencyKeySchema | None:
+        """
+        Looks up an active key in the cache first and in the database on a cache miss.
+
+        :param request: The idempotency key with the hash of the current request.
+
+        :return: The stored key or None if the key has not been used yet.
+
+        :raises UnprocessableEntityError: If the key was used with a different request.
+        """
+        if (stored := self.cache.get(request.key)) is None:
+            if (obj := await self.repository.get_active(request.key)) is None:
+                return None
+
+            stored = self._cache(IdempotencyKeySchema.model_validate(obj))
+
+        if stored.request_hash != request.request_hash:
+            raise UnprocessableEntityError(
+                detail="Idempotency key has already been used with a different request",
+                fields={"key": request.key},
+            )
+
+        return stored
+
+    async def get_or_create(
+        self,
+        request: IdempotencyRequestSchema,
+        create: Callable[[], Awaitable[Any]],
+        response_type: Any,
+    ) -> tuple[Any, bool]:
+        """
+        Returns the stored response of the key, or performs the request and stores its response.
+
+        `create` must not commit: the key is inserted in the same transaction, so if a concurrent request
+        with the same key wins, the changes made by `create` are rolled back and the winner's response is returned.
+
+        :param request: The idempotency key with the hash of the current request.
+        :param create: Coroutine function that performs the request without committing.
+        :param response_type: Type the result of `create` is serialized with, usually the endpoint response model.
+
+        :return: The response and a flag that tells whether it was replayed.
+        """
+        if (stored := await self.get_stored(request)) is not None:
+            return stored.response, True
+
+        adapter = TypeAdapter(response_type)
+        response = adapter.dump_python(adapter.validate_python(await create(), from_attributes=True), mode="json")
+
+        try:
+            obj = await self.repository.create(
+                {
+                    "key": request.key,
+                    "request_hash": request.request_hash,
+                    "response": response,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=config.idempotency_key_ttl),
+                },
+            )
+
+        except ConflictError:
+            if (stored := await self.get_stored(request)) is None:
+                raise
+
+            return stored.response, True
+
+        self._cache(IdempotencyKeySchema.model_validate(obj))
+
+        return response, False
+
+    async def purge_expired(self) -> int:
+        """
+        Deletes the expired keys, in batches of `idempotency_purge_batch_size`.
+
+        :return: The number of deleted keys.
+        """
+        return await self.repository.purge_expired(config.idempotency_purge_batch_size)
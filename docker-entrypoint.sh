@@ -2,4 +2,5 @@
 ###############################################################################
 
 alembic upgrade head
+python -m app.commands.maintain_partitions
 uvicorn "${UVICORN_APP}" --host "${UVICORN_HOST}" --port "${UVICORN_PORT}" --proxy-headers --reload
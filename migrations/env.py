@@ -9,6 +9,7 @@ from sqlalchemy import Connection, engine_from_config, pool
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.core.config import config as env_config
+from app.core.helpers.partitions import PARTITION_NAME_PATTERN
 from app.core.models import Base
 from app.models import *  # noqa
 
@@ -34,6 +35,11 @@ def suppress_empty_migration(migration_context, revision, op: ops.MigrationScrip
     return op
 
 
+def include_name(name: str | None, type_: str, parent_names: dict) -> bool:
+    """Hook to skip partitions, they are managed by migrations and `app.commands.maintain_partitions`."""
+    return not (type_ == "table" and name and PARTITION_NAME_PATTERN.match(name))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -50,6 +56,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -62,6 +69,7 @@ def do_run_migrations(connection: Connection) -> None:
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
+        include_name=include_name,
         process_revision_directives=writer,
     )
 
@@ -0,0 +1,35 @@
+"""add message_count to chat_session
+
+Revision ID: 5b0f3c9e21d4
+Revises: 2156796338a0
+Create Date: 2026-10-18 09:00:12.418305
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b0f3c9e21d4"
+down_revision: Union[str, Sequence[str], None] = "2156796338a0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_session", sa.Column("message_count", sa.Integer(), server_default="0", nullable=False))
+
+    op.execute(
+        """
+        UPDATE chat_session
+        SET message_count = counts.message_count
+        FROM (SELECT session_id, count(*) AS message_count FROM chat_message GROUP BY session_id) AS counts
+        WHERE chat_session.id = counts.session_id
+        """,
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("chat_session", "message_count")
@@ -0,0 +1,53 @@
+"""add seq to chat_message
+
+Revision ID: 8d41a7f0c2b6
+Revises: 5b0f3c9e21d4
+Create Date: 2026-10-18 09:30:41.102734
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d41a7f0c2b6"
+down_revision: Union[str, Sequence[str], None] = "5b0f3c9e21d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_session", sa.Column("last_message_seq", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("chat_message", sa.Column("seq", sa.Integer(), nullable=True))
+
+    # Existing messages are numbered in their current (created_at, id) order
+    op.execute(
+        """
+        UPDATE chat_message
+        SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY session_id ORDER BY created_at, id) AS seq
+            FROM chat_message
+        ) AS numbered
+        WHERE chat_message.id = numbered.id
+        """,
+    )
+    op.execute(
+        """
+        UPDATE chat_session
+        SET last_message_seq = seqs.last_message_seq
+        FROM (SELECT session_id, max(seq) AS last_message_seq FROM chat_message GROUP BY session_id) AS seqs
+        WHERE chat_session.id = seqs.session_id
+        """,
+    )
+
+    op.alter_column("chat_message", "seq", nullable=False)
+    op.create_index("ix_chat_message_session_id_seq", "chat_message", ["session_id", "seq"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_session_id_seq", table_name="chat_message")
+    op.drop_column("chat_message", "seq")
+    op.drop_column("chat_session", "last_message_seq")
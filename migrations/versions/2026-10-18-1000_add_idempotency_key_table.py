@@ -0,0 +1,44 @@
+"""add idempotency_key table
+
+Revision ID: c3a9e5d71f08
+Revises: 8d41a7f0c2b6
+Create Date: 2026-10-18 10:00:12.518904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a9e5d71f08"
+down_revision: Union[str, Sequence[str], None] = "8d41a7f0c2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_key",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("response", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index("ix_idempotency_key_key", "idempotency_key", ["key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_key_key", table_name="idempotency_key")
+    op.drop_table("idempotency_key")
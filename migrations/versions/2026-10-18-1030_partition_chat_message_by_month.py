@@ -0,0 +1,105 @@
+"""partition chat_message by month
+
+Revision ID: 4e7b2d9a6c15
+Revises: c3a9e5d71f08
+Create Date: 2026-10-18 10:30:27.336104
+
+"""
+
+from datetime import UTC, datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import config
+from app.core.helpers.partitions import month_start
+
+# revision identifiers, used by Alembic.
+revision: str = "4e7b2d9a6c15"
+down_revision: Union[str, Sequence[str], None] = "c3a9e5d71f08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_chat_message_table(*args, **kwargs) -> None:
+    op.create_table(
+        "chat_message",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("sender", postgresql.ENUM(name="sender_type_enum", create_type=False), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("context", postgresql.JSONB(astext_type=sa.Text()), server_default="{}", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["session_id"], ["chat_session.id"], ondelete="CASCADE"),
+        *args,
+        **kwargs,
+    )
+
+
+def upgrade() -> None:
+    # The existing table becomes the partition for all messages created before the next month,
+    # so no rows are copied. It is removed by retention as a whole, once all of its messages have expired.
+    next_month = month_start(datetime.now(UTC), 1)
+
+    op.rename_table("chat_message", "chat_message_legacy")
+    # A partition can't have a primary key that differs from the one of the partitioned table
+    op.execute(
+        "ALTER TABLE chat_message_legacy DROP CONSTRAINT chat_message_pkey, "
+        "ADD CONSTRAINT chat_message_legacy_pkey PRIMARY KEY (id, created_at)",
+    )
+    op.execute(
+        "ALTER TABLE chat_message_legacy RENAME CONSTRAINT chat_message_session_id_fkey "
+        "TO chat_message_legacy_session_id_fkey",
+    )
+    op.execute(
+        "ALTER INDEX ix_chat_message_session_id_created_at RENAME TO chat_message_legacy_session_id_created_at_idx"
+    )
+    op.drop_index("ix_chat_message_session_id_seq", table_name="chat_message_legacy")
+
+    create_chat_message_table(
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index("ix_chat_message_session_id_created_at", "chat_message", ["session_id", "created_at"], unique=False)
+    op.create_index("ix_chat_message_session_id_seq", "chat_message", ["session_id", "seq"], unique=False)
+
+    op.execute(
+        f"ALTER TABLE chat_message ATTACH PARTITION chat_message_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{next_month.isoformat()}')",
+    )
+    op.execute("CREATE TABLE chat_message_default PARTITION OF chat_message DEFAULT")
+
+    for month in range(config.message_partitions_ahead):
+        lower_bound, upper_bound = month_start(next_month, month), month_start(next_month, month + 1)
+        op.execute(
+            f"CREATE TABLE chat_message_p{lower_bound:%Y%m} PARTITION OF chat_message "
+            f"FOR VALUES FROM ('{lower_bound.isoformat()}') TO ('{upper_bound.isoformat()}')",
+        )
+
+
+def downgrade() -> None:
+    op.rename_table("chat_message", "chat_message_partitioned")
+    op.execute("ALTER TABLE chat_message_partitioned RENAME CONSTRAINT chat_message_pkey TO chat_message_old_pkey")
+    # Partitions have copies of the foreign key with the same name, dropping it from the table drops them all
+    op.drop_constraint("chat_message_session_id_fkey", "chat_message_partitioned", type_="foreignkey")
+
+    create_chat_message_table(sa.PrimaryKeyConstraint("id"))
+    op.execute(
+        """
+        INSERT INTO chat_message (id, session_id, seq, sender, content, context, created_at)
+        SELECT id, session_id, seq, sender, content, context, created_at
+        FROM chat_message_partitioned
+        """,
+    )
+    op.drop_table("chat_message_partitioned")  # drops the partitions and their indexes as well
+
+    op.create_index("ix_chat_message_session_id_created_at", "chat_message", ["session_id", "created_at"], unique=False)
+    op.create_index("ix_chat_message_session_id_seq", "chat_message", ["session_id", "seq"], unique=True)
@@ -0,0 +1,43 @@
+"""add context_chunk table
+
+Revision ID: 9f2c4e6a8b13
+Revises: 4e7b2d9a6c15
+Create Date: 2026-10-18 11:00:08.204117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9f2c4e6a8b13"
+down_revision: Union[str, Sequence[str], None] = "4e7b2d9a6c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "context_chunk",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("content", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index("ix_context_chunk_hash", "context_chunk", ["hash"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_context_chunk_hash", table_name="context_chunk")
+    op.drop_table("context_chunk")
@@ -0,0 +1,28 @@
+"""add blob keys to chat_message
+
+Revision ID: 1d8e3b5f7a24
+Revises: 9f2c4e6a8b13
+Create Date: 2026-10-18 11:30:41.662083
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1d8e3b5f7a24"
+down_revision: Union[str, Sequence[str], None] = "9f2c4e6a8b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_message", sa.Column("content_blob", sa.String(length=64), nullable=True))
+    op.add_column("chat_message", sa.Column("context_blob", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_message", "context_blob")
+    op.drop_column("chat_message", "content_blob")
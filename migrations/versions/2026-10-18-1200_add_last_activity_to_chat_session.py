@@ -0,0 +1,59 @@
+"""add last activity to chat_session
+
+Revision ID: 7a5c1e9d3b40
+Revises: 1d8e3b5f7a24
+Create Date: 2026-10-18 12:00:27.905316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a5c1e9d3b40"
+down_revision: Union[str, Sequence[str], None] = "1d8e3b5f7a24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "chat_session",
+        sa.Column(
+            "last_activity_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+    op.add_column("chat_session", sa.Column("last_message_preview", sa.String(), nullable=True))
+
+    # The last message of a session has the highest `seq`, the preview length is the `session_preview_length` default
+    op.execute(
+        """
+        UPDATE chat_session
+        SET last_activity_at = last_message.created_at, last_message_preview = left(last_message.content, 200)
+        FROM (
+            SELECT DISTINCT ON (session_id) session_id, created_at, content
+            FROM chat_message
+            ORDER BY session_id, seq DESC
+        ) AS last_message
+        WHERE chat_session.id = last_message.session_id
+        """,
+    )
+    op.execute("UPDATE chat_session SET last_activity_at = created_at WHERE message_count = 0")
+
+    op.create_index(
+        "ix_chat_session_user_id_last_activity_at",
+        "chat_session",
+        ["user_id", sa.text("last_activity_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_session_user_id_last_activity_at", table_name="chat_session")
+    op.drop_column("chat_session", "last_message_preview")
+    op.drop_column("chat_session", "last_activity_at")
@@ -0,0 +1,64 @@
+"""add covering indexes to chat_session
+
+Revision ID: e6b4d28f0a97
+Revises: 7a5c1e9d3b40
+Create Date: 2026-10-18 12:30:08.213674
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b4d28f0a97"
+down_revision: Union[str, Sequence[str], None] = "7a5c1e9d3b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_chat_session_user_id_created_at", table_name="chat_session")
+    op.drop_index("ix_chat_session_user_id_last_activity_at", table_name="chat_session")
+
+    op.create_index(
+        "ix_chat_session_user_id_created_at",
+        "chat_session",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_include=["title", "is_favorite", "message_count", "last_activity_at", "last_message_preview"],
+    )
+    op.create_index(
+        "ix_chat_session_user_id_last_activity_at",
+        "chat_session",
+        ["user_id", sa.text("last_activity_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_include=["title", "is_favorite", "message_count", "last_message_preview"],
+    )
+    op.create_index(
+        "ix_chat_session_user_id_last_activity_at_favorite",
+        "chat_session",
+        ["user_id", sa.text("last_activity_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_include=["title", "is_favorite", "message_count", "last_message_preview"],
+        postgresql_where=sa.text("is_favorite"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_chat_session_user_id_last_activity_at_favorite",
+        table_name="chat_session",
+        postgresql_where=sa.text("is_favorite"),
+    )
+    op.drop_index("ix_chat_session_user_id_last_activity_at", table_name="chat_session")
+    op.drop_index("ix_chat_session_user_id_created_at", table_name="chat_session")
+
+    op.create_index(
+        "ix_chat_session_user_id_last_activity_at",
+        "chat_session",
+        ["user_id", sa.text("last_activity_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index("ix_chat_session_user_id_created_at", "chat_session", ["user_id", "created_at"], unique=False)
@@ -0,0 +1,44 @@
+"""add search_vector to chat_message
+
+Revision ID: 3c7f9a1e5d82
+Revises: e6b4d28f0a97
+Create Date: 2026-10-18 13:00:44.571902
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3c7f9a1e5d82"
+down_revision: Union[str, Sequence[str], None] = "e6b4d28f0a97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A stored generated column is computed for the existing messages, so this rewrites all the partitions
+    op.add_column(
+        "chat_message",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english'::regconfig, content)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_chat_message_search_vector",
+        "chat_message",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_search_vector", table_name="chat_message", postgresql_using="gin")
+    op.drop_column("chat_message", "search_vector")
@@ -0,0 +1,39 @@
+"""add title trigram index to chat_session
+
+Revision ID: 5e2a8c4f1b69
+Revises: 3c7f9a1e5d82
+Create Date: 2026-10-18 13:30:19.084523
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2a8c4f1b69"
+down_revision: Union[str, Sequence[str], None] = "3c7f9a1e5d82"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_chat_session_title_trgm",
+        "chat_session",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    # The extension is kept, it may be used by other database objects
+    op.drop_index(
+        "ix_chat_session_title_trgm",
+        table_name="chat_session",
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
@@ -0,0 +1,79 @@
+"""add chat_message_document table
+
+Revision ID: 8b3d6f2a9c57
+Revises: 5e2a8c4f1b69
+Create Date: 2026-10-18 14:00:52.337160
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b3d6f2a9c57"
+down_revision: Union[str, Sequence[str], None] = "5e2a8c4f1b69"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_message_document",
+        sa.Column("doc_id", sa.String(), nullable=False),
+        sa.Column("message_id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["chat_session.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Documents cited by inline and deduplicated chunks of the stored messages, offloaded contexts are not read
+    op.execute(
+        """
+        INSERT INTO chat_message_document (id, doc_id, message_id, session_id, created_at)
+        SELECT gen_random_uuid(), cited.doc_id, cited.message_id, cited.session_id, cited.created_at
+        FROM (
+            SELECT DISTINCT
+                coalesce(chunk ->> 'doc_id', context_chunk.content ->> 'doc_id') AS doc_id,
+                chat_message.id AS message_id,
+                chat_message.session_id,
+                chat_message.created_at
+            FROM chat_message
+            CROSS JOIN jsonb_array_elements(
+                CASE jsonb_typeof(chat_message.context -> 'chunks')
+                    WHEN 'array' THEN chat_message.context -> 'chunks'
+                    ELSE '[]'::jsonb
+                END
+            ) AS chunk
+            LEFT JOIN context_chunk ON context_chunk.hash = chunk ->> '$chunk'
+            WHERE jsonb_typeof(coalesce(chunk -> 'doc_id', context_chunk.content -> 'doc_id')) IN ('string', 'number')
+        ) AS cited
+        """,
+    )
+
+    op.create_index(
+        "ix_chat_message_document_doc_id_message_id",
+        "chat_message_document",
+        ["doc_id", "message_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_chat_message_document_session_id_message_id",
+        "chat_message_document",
+        ["session_id", "message_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_document_session_id_message_id", table_name="chat_message_document")
+    op.drop_index("ix_chat_message_document_doc_id_message_id", table_name="chat_message_document")
+    op.drop_table("chat_message_document")
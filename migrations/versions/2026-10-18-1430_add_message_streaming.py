@@ -0,0 +1,52 @@
+"""add is_streaming to chat_message and chat_message_chunk table
+
+Revision ID: 3f7a1c9e5d24
+Revises: 8b3d6f2a9c57
+Create Date: 2026-10-18 14:30:17.482913
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a1c9e5d24"
+down_revision: Union[str, Sequence[str], None] = "8b3d6f2a9c57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default doesn't rewrite the table
+    op.add_column("chat_message", sa.Column("is_streaming", sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    op.create_table(
+        "chat_message_chunk",
+        sa.Column("message_id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["chat_session.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_chat_message_chunk_message_id_position",
+        "chat_message_chunk",
+        ["message_id", "position"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_chunk_message_id_position", table_name="chat_message_chunk")
+    op.drop_table("chat_message_chunk")
+    op.drop_column("chat_message", "is_streaming")
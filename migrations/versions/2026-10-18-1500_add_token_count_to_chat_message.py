@@ -0,0 +1,82 @@
+"""add token_count to chat_message
+
+Revision ID: 6c1e8b4d2f93
+Revises: 3f7a1c9e5d24
+Create Date: 2026-10-18 15:00:41.905276
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.blob_storage import get_blob_storage
+from app.core.tokenizer import get_tokenizer
+
+# revision identifiers, used by Alembic.
+revision: str = "6c1e8b4d2f93"
+down_revision: Union[str, Sequence[str], None] = "3f7a1c9e5d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+chat_message = sa.table(
+    "chat_message",
+    sa.column("id", sa.UUID()),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("content", sa.String()),
+    sa.column("content_blob", sa.String()),
+    sa.column("token_count", sa.Integer()),
+)
+
+
+def upgrade() -> None:
+    op.add_column("chat_message", sa.Column("token_count", sa.Integer(), nullable=True))
+
+    # Stored messages are counted by the configured tokenizer, in batches in the order of the primary key.
+    # Offloaded content is read from its file, the preview is counted if the blob storage keeps no local files.
+    connection = op.get_bind()
+    tokenizer = get_tokenizer()
+    blob_storage = get_blob_storage()
+    last_id = None
+
+    while True:
+        stmt = sa.select(
+            chat_message.c.id, chat_message.c.created_at, chat_message.c.content, chat_message.c.content_blob
+        )
+
+        if last_id is not None:
+            stmt = stmt.where(chat_message.c.id > last_id)
+
+        rows = connection.execute(stmt.order_by(chat_message.c.id).limit(BATCH_SIZE)).all()
+
+        if not rows:
+            break
+
+        counts = []
+
+        for message_id, created_at, content, content_blob in rows:
+            if (
+                content_blob is not None
+                and (path := blob_storage.get_path(content_blob)) is not None
+                and path.is_file()
+            ):
+                content = path.read_text()
+
+            counts.append({"b_id": message_id, "b_created_at": created_at, "b_token_count": tokenizer.count(content)})
+
+        connection.execute(
+            chat_message.update()
+            .where(chat_message.c.id == sa.bindparam("b_id"), chat_message.c.created_at == sa.bindparam("b_created_at"))
+            .values(token_count=sa.bindparam("b_token_count")),
+            counts,
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("chat_message", "token_count", nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column("chat_message", "token_count")
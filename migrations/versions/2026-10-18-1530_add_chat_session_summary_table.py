@@ -0,0 +1,48 @@
+"""add chat_session_summary table
+
+Revision ID: 9d4a2e7c1b86
+Revises: 6c1e8b4d2f93
+Create Date: 2026-10-18 15:30:08.216734
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4a2e7c1b86"
+down_revision: Union[str, Sequence[str], None] = "6c1e8b4d2f93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_session_summary",
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("last_seq", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("token_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["chat_session.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_chat_session_summary_session_id_last_seq",
+        "chat_session_summary",
+        ["session_id", "last_seq"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_session_summary_session_id_last_seq", table_name="chat_session_summary")
+    op.drop_table("chat_session_summary")
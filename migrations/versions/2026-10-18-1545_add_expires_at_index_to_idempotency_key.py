@@ -0,0 +1,25 @@
+"""add expires_at index to idempotency_key
+
+Revision ID: 2b8e5f1a7c43
+Revises: 9d4a2e7c1b86
+Create Date: 2026-10-18 15:45:27.530192
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2b8e5f1a7c43"
+down_revision: Union[str, Sequence[str], None] = "9d4a2e7c1b86"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_idempotency_key_expires_at", "idempotency_key", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_key_expires_at", table_name="idempotency_key")
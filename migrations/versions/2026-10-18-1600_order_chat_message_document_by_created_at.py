@@ -0,0 +1,37 @@
+"""order chat_message_document by created_at
+
+Revision ID: 7a3c9e2f5d18
+Revises: 2b8e5f1a7c43
+Create Date: 2026-10-18 16:00:12.641857
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3c9e2f5d18"
+down_revision: Union[str, Sequence[str], None] = "2b8e5f1a7c43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_message_document_doc_id_created_at_message_id",
+        "chat_message_document",
+        ["doc_id", "created_at", "message_id"],
+        unique=True,
+    )
+    op.drop_index("ix_chat_message_document_doc_id_message_id", table_name="chat_message_document")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_chat_message_document_doc_id_message_id",
+        "chat_message_document",
+        ["doc_id", "message_id"],
+        unique=True,
+    )
+    op.drop_index("ix_chat_message_document_doc_id_created_at_message_id", table_name="chat_message_document")
@@ -0,0 +1,40 @@
+"""add chat_message change position
+
+Revision ID: 4f6b1d8e3a27
+Revises: 7a3c9e2f5d18
+Create Date: 2026-10-18 16:15:42.508317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f6b1d8e3a27"
+down_revision: Union[str, Sequence[str], None] = "7a3c9e2f5d18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_session", sa.Column("change_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("chat_message", sa.Column("change_no", sa.Integer(), server_default="0", nullable=False))
+    # The stored messages are positioned where they were added
+    op.add_column("chat_message", sa.Column("change_seq", sa.Integer(), nullable=True))
+    op.execute("UPDATE chat_message SET change_seq = seq")
+    op.alter_column("chat_message", "change_seq", existing_type=sa.Integer(), nullable=False)
+    op.create_index(
+        "ix_chat_message_session_id_change_seq_change_no",
+        "chat_message",
+        ["session_id", "change_seq", "change_no"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_session_id_change_seq_change_no", table_name="chat_message")
+    op.drop_column("chat_message", "change_seq")
+    op.drop_column("chat_message", "change_no")
+    op.drop_column("chat_session", "change_count")
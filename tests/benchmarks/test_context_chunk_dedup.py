@@ -0,0 +1,88 @@
+import random
+
+import pytest
+from faker import Faker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.enums import SenderTypeEnum
+from app.schemas.chat_message import ChatMessageCreateSchema
+from app.services.chat_message import ChatMessageService
+from app.services.context_chunk import ContextChunkService
+from tests.factories import ChatSessionFactory
+
+pytestmark = pytest.mark.benchmark
+
+SESSIONS = 200
+MESSAGES_PER_SESSION = 10
+CHUNKS_PER_MESSAGE = 5
+# Distinct retrieved chunks, a few popular documents are retrieved for most queries
+DOCUMENT_CHUNKS = 500
+
+
+async def get_storage_size(db_session: AsyncSession) -> int:
+    return await db_session.scalar(
+        text(
+            """
+            SELECT sum(pg_total_relation_size(inhrelid)) + pg_total_relation_size('context_chunk')
+            FROM pg_inherits
+            WHERE inhparent = CAST('chat_message' AS regclass)
+            """,
+        ),
+    )
+
+
+async def store_messages(db_session: AsyncSession, faker: Faker, chunks: list[dict]) -> int:
+    await db_session.execute(text("TRUNCATE chat_session, chat_message, context_chunk"))
+    await db_session.commit()
+    ContextChunkService.cache.clear()
+
+    service = ChatMessageService(db_session)
+    chunk_weights = [1 / rank for rank in range(1, len(chunks) + 1)]
+
+    for chat_session in await ChatSessionFactory.provide(db_session).create_batch(size=SESSIONS):
+        await service.create_many(
+            [
+                ChatMessageCreateSchema(
+                    session_id=chat_session.id,
+                    sender=SenderTypeEnum.AI,
+                    content=faker.sentence(),
+                    context={"chunks": random.choices(chunks, weights=chunk_weights, k=CHUNKS_PER_MESSAGE)},
+                )
+                for _ in range(MESSAGES_PER_SESSION)
+            ],
+        )
+
+    return await get_storage_size(db_session)
+
+
+async def test_context_chunk_dedup(
+    db_session: AsyncSession,
+    faker: Faker,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+):
+    random.seed(0)
+    chunks = [
+        {"doc_id": faker.uuid4(), "chunk_index": index, "text": faker.text(max_nb_chars=1000)}
+        for index in range(DOCUMENT_CHUNKS)
+    ]
+
+    # Chunks are kept inline when they are smaller than the minimal size
+    monkeypatch.setattr(config, "context_chunk_min_size", 2**31)
+    inline_size = await store_messages(db_session, faker, chunks)
+
+    monkeypatch.undo()
+    dedup_size = await store_messages(db_session, faker, chunks)
+    stats = await ContextChunkService(db_session).get_stats()
+
+    with capsys.disabled():
+        print(  # noqa: T201
+            f"\n{stats.references:,} chunk references to {stats.chunks:,} distinct chunks: "
+            f"dedup ratio {stats.dedup_ratio:.1f}x, {stats.saved_bytes / 1024 / 1024:.1f} MiB of JSON saved"
+            f"\non disk: inline {inline_size / 1024 / 1024:.1f} MiB, deduplicated {dedup_size / 1024 / 1024:.1f} MiB",
+        )
+
+    assert stats.saved_bytes > 0
+    assert dedup_size < inline_size
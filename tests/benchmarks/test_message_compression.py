@@ -0,0 +1,152 @@
+import random
+import time
+import zlib
+
+import pytest
+from faker import Faker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = pytest.mark.benchmark
+
+MESSAGES = 5_000
+BATCH_SIZE = 500
+DICTIONARY_SIZE = 32 * 1024  # the largest window zlib can use
+
+
+def build_corpus(faker: Faker, size: int) -> list[str]:
+    """
+    Chat turns: short user questions, and longer AI answers, a third of which are long enough to be TOASTed.
+
+    Faker text is random words, which compress worse than real text, so the ratios are pessimistic.
+    """
+    corpus = []
+
+    for index in range(size):
+        if index % 2 == 0:
+            corpus.append(faker.sentence(nb_words=random.randint(5, 30)))
+        elif index % 3 == 0:
+            corpus.append("\n\n".join(faker.paragraphs(nb=random.randint(15, 40))))
+        else:
+            sentences = [f"{number}. {faker.sentence(nb_words=12)}" for number in range(1, random.randint(3, 8))]
+            corpus.append(f"{faker.paragraph(nb_sentences=4)}\n\n" + "\n".join(sentences))
+
+    return corpus
+
+
+async def measure_toast(
+    db_session: AsyncSession,
+    corpus: list[str],
+    method: str | None,
+) -> tuple[float, float, float, float]:
+    """
+    :return: Average stored bytes of a value and of a table row per message, insert and read time per message
+             in microseconds.
+    """
+    table = f"benchmark_compression_{method or 'none'}"
+    # Uncompressed values are still moved out of line when the row is too large, like compressed ones
+    column = f"content text COMPRESSION {method}" if method else "content text STORAGE EXTERNAL"
+
+    await db_session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await db_session.execute(text(f"CREATE TABLE {table} (id serial PRIMARY KEY, {column})"))
+    await db_session.commit()
+
+    started_at = time.perf_counter()
+
+    for start in range(0, len(corpus), BATCH_SIZE):
+        await db_session.execute(
+            text(f"INSERT INTO {table} (content) SELECT unnest(CAST(:contents AS text[]))"),
+            {"contents": corpus[start : start + BATCH_SIZE]},
+        )
+        await db_session.commit()
+
+    insert_elapsed = time.perf_counter() - started_at
+
+    # Computing the length of a compressed value decompresses it
+    started_at = time.perf_counter()
+    await db_session.execute(text(f"SELECT sum(length(content)) FROM {table}"))
+    read_elapsed = time.perf_counter() - started_at
+
+    value_bytes, table_bytes = (
+        await db_session.execute(
+            text(
+                f"SELECT avg(pg_column_size(content)), pg_total_relation_size('{table}') - pg_indexes_size('{table}') "
+                f"FROM {table}",
+            ),
+        )
+    ).one()
+
+    await db_session.execute(text(f"DROP TABLE {table}"))
+    await db_session.commit()
+
+    return (
+        float(value_bytes),
+        table_bytes / len(corpus),
+        insert_elapsed / len(corpus) * 1e6,
+        read_elapsed / len(corpus) * 1e6,
+    )
+
+
+def measure_zlib(corpus: list[str], dictionary: bytes | None) -> tuple[float, float, float]:
+    """
+    :return: Average compressed bytes per message, encode and decode time per message in microseconds.
+    The compressed messages would be stored as they are, so the row size is not measured.
+    """
+    kwargs = {"zdict": dictionary} if dictionary else {}
+    encoded = []
+
+    started_at = time.perf_counter()
+
+    for message in corpus:
+        compressor = zlib.compressobj(level=6, **kwargs)
+        encoded.append(compressor.compress(message.encode()) + compressor.flush())
+
+    encode_elapsed = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+
+    for data in encoded:
+        decompressor = zlib.decompressobj(**kwargs)
+        decompressor.decompress(data)
+
+    decode_elapsed = time.perf_counter() - started_at
+
+    return (
+        sum(len(data) for data in encoded) / len(corpus),
+        encode_elapsed / len(corpus) * 1e6,
+        decode_elapsed / len(corpus) * 1e6,
+    )
+
+
+async def test_message_compression(db_session: AsyncSession, faker: Faker, capsys: pytest.CaptureFixture):
+    random.seed(0)
+    Faker.seed(0)
+    corpus = build_corpus(faker, MESSAGES)
+    # The dictionary is built from other messages than the measured ones, like a dictionary trained in advance
+    dictionary = "\n".join(build_corpus(faker, 1_000)).encode()[-DICTIONARY_SIZE:]
+
+    methods = await db_session.scalar(text("SELECT enumvals FROM pg_settings WHERE name = 'default_toast_compression'"))
+    raw_bytes = sum(len(message.encode()) for message in corpus) / len(corpus)
+
+    results: dict[str, tuple[float, float | None, float, float]] = {"text": (raw_bytes, None, 0.0, 0.0)}
+
+    for method in (None, *methods):
+        results[f"TOAST {method or 'uncompressed'}"] = await measure_toast(db_session, corpus, method)
+
+    for name, dictionary_bytes in (("zlib", None), ("zlib with a preset dictionary", dictionary)):
+        value_bytes, encode_us, decode_us = measure_zlib(corpus, dictionary_bytes)
+        results[name] = (value_bytes, None, encode_us, decode_us)
+
+    with capsys.disabled():
+        print(  # noqa: T201
+            f"\n{'storage':<32}{'value bytes':>14}{'table bytes':>14}{'write us/msg':>14}{'read us/msg':>14}",
+        )
+
+        for name, (value_bytes, table_bytes, write_us, read_us) in results.items():
+            table_column = "-" if table_bytes is None else f"{table_bytes:,.0f}"
+            print(  # noqa: T201
+                f"{name:<32}{value_bytes:>14,.0f}{table_column:>14}{write_us:>14.1f}{read_us:>14.1f}",
+            )
+
+    # A dictionary gives short messages the context they lack for compression on their own
+    assert results["zlib with a preset dictionary"][0] < results["zlib"][0] < raw_bytes
@@ -0,0 +1,54 @@
+import time
+from collections.abc import Callable
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils import uuid7
+
+pytestmark = pytest.mark.benchmark
+
+ROWS = 200_000
+BATCH_SIZE = 1_000
+
+
+async def insert_rows(db_session: AsyncSession, table: str, id_factory: Callable[[], UUID]) -> tuple[float, int]:
+    await db_session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await db_session.execute(text(f"CREATE TABLE {table} (id uuid PRIMARY KEY, created_at timestamptz DEFAULT now())"))
+    await db_session.commit()
+
+    started_at = time.perf_counter()
+
+    for _ in range(ROWS // BATCH_SIZE):
+        await db_session.execute(
+            text(f"INSERT INTO {table} (id) SELECT unnest(CAST(:ids AS uuid[]))"),
+            {"ids": [id_factory() for _ in range(BATCH_SIZE)]},
+        )
+        await db_session.commit()
+
+    elapsed = time.perf_counter() - started_at
+    index_size = await db_session.scalar(text(f"SELECT pg_relation_size('{table}_pkey')"))
+
+    await db_session.execute(text(f"DROP TABLE {table}"))
+    await db_session.commit()
+
+    return elapsed, index_size
+
+
+async def test_uuid7_primary_key_inserts(db_session: AsyncSession, capsys: pytest.CaptureFixture):
+    uuid4_elapsed, uuid4_index_size = await insert_rows(db_session, "benchmark_uuid4", uuid4)
+    uuid7_elapsed, uuid7_index_size = await insert_rows(db_session, "benchmark_uuid7", uuid7)
+
+    with capsys.disabled():
+        for name, elapsed, index_size in (
+            ("uuid4", uuid4_elapsed, uuid4_index_size),
+            ("uuid7", uuid7_elapsed, uuid7_index_size),
+        ):
+            print(  # noqa: T201
+                f"\n{name}: {ROWS / elapsed:,.0f} rows/s, primary key index {index_size / 1024 / 1024:.1f} MiB",
+            )
+
+    # Sequential keys fill index pages to the fillfactor instead of splitting them in halves
+    assert uuid7_index_size < uuid4_index_size
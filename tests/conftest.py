@@ -1,16 +1,19 @@
-from typing import AsyncGenerator
+from datetime import UTC, datetime
+from typing import AsyncGenerator, Generator
 
 import pytest
 from faker import Faker
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import config
 from app.core.dependencies import get_db_session
 from app.core.enums import AppEnvEnum
+from app.core.helpers.partitions import create_default_partition, create_monthly_partitions
 from app.core.models import Base
+from app.models import ChatMessage
 
 pytest_plugins = ["tests.fixtures", "tests.unit.fixtures"]
 
@@ -43,6 +46,8 @@ async def db_session_maker(db_engine: AsyncEngine) -> async_sessionmaker[AsyncSe
         await conn.run_sync(Base.metadata.drop_all)
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+        await create_default_partition(conn, ChatMessage.__tablename__)
+        await create_monthly_partitions(conn, ChatMessage.__tablename__, datetime.now(UTC), months=2)
 
     return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -60,6 +65,21 @@ async def db_session(db_engine, db_session_maker) -> AsyncGenerator[AsyncSession
         yield session
 
 
+@pytest.fixture
+def executed_statements(db_engine: AsyncEngine) -> Generator[list[str], None, None]:
+    """Collect SQL statements sent to the database during the test."""
+    statements: list[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    yield statements
+
+    event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture(scope="session")
 def app_instance():
     """Create and provide a test app instance."""
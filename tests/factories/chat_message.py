@@ -2,6 +2,7 @@ import factory
 from factory import fuzzy
 
 from app.core.enums import SenderTypeEnum
+from app.core.tokenizer import get_tokenizer
 from app.models import ChatMessage
 from tests.factories.base import BaseSQLAlchemyFactory
 from tests.factories.chat_session import ChatSessionFactory
@@ -14,7 +15,9 @@ class ChatMessageFactory(BaseSQLAlchemyFactory[ChatMessage]):
 
     session = factory.SubFactory(ChatSessionFactory)
     session_id = factory.SelfAttribute("session.id")
+    seq = factory.Sequence(lambda n: n + 1)
 
     sender = fuzzy.FuzzyChoice(SenderTypeEnum)
     content = factory.Faker("pystr")
+    token_count = factory.LazyAttribute(lambda message: get_tokenizer().count(message.content))
     context = factory.Faker("pydict", value_types=(str,))
@@ -8,3 +8,8 @@ from tests.factories import ChatSessionFactory
 @pytest.fixture
 async def chat_session(db_session: AsyncSession) -> ChatSession:
     return await ChatSessionFactory.provide(db_session).create()
+
+
+@pytest.fixture
+async def other_chat_session(db_session: AsyncSession) -> ChatSession:
+    return await ChatSessionFactory.provide(db_session).create()
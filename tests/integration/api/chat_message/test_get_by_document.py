@@ -0,0 +1,143 @@
+from uuid import uuid4
+
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import SenderTypeEnum, TotalModeEnum
+from app.models import ChatMessageDocument, ChatSession
+from app.services.context_chunk import ContextChunkService
+
+test_url = "/api/messages/by-document"
+
+
+def build_message_data(faker: Faker, doc_ids: list[str]) -> dict:
+    return {
+        "sender": SenderTypeEnum.AI,
+        "content": faker.pystr(),
+        # Chunks long enough to be deduplicated, so that the IDs are not kept in the stored contexts
+        "context": {"chunks": [{"doc_id": doc_id, "text": faker.text(max_nb_chars=500)} for doc_id in doc_ids]},
+    }
+
+
+async def test_return_401_if_provided_wrong_api_key(
+    client: AsyncClient,
+    wrong_api_key_headers: dict,
+    faker: Faker,
+):
+    response = await client.get(f"{test_url}/{faker.pystr()}", headers=wrong_api_key_headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_returns_messages_citing_document_newest_first(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    doc_id = "docs/guide.md"
+    first_response = await client.post(
+        f"/api/sessions/{chat_session.id}/messages:batch",
+        json=[build_message_data(faker, [doc_id, "other"]), build_message_data(faker, ["other"])],
+        headers=api_key_headers,
+    )
+    second_response = await client.post(
+        f"/api/sessions/{other_chat_session.id}/messages",
+        json=build_message_data(faker, [doc_id]),
+        headers=api_key_headers,
+    )
+    ContextChunkService.cache.clear()
+
+    response = await client.get(
+        f"{test_url}/{doc_id}",
+        params={"fields": "id,session_id,context", "total_mode": TotalModeEnum.EXACT},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 2
+    # Contexts are returned with their chunks
+    assert response.json()["items"] == [
+        {key: second_response.json()[key] for key in ("id", "session_id", "context")},
+        {key: first_response.json()[0][key] for key in ("id", "session_id", "context")},
+    ]
+
+
+async def test_returns_messages_citing_document_by_cursor(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    doc_id = faker.uuid4()
+    response = await client.post(
+        f"/api/sessions/{chat_session.id}/messages:batch",
+        json=[build_message_data(faker, [doc_id]) for _ in range(5)],
+        headers=api_key_headers,
+    )
+    message_ids = [i["id"] for i in response.json()]
+
+    first_page = (await client.get(f"{test_url}/{doc_id}", params={"size": 3}, headers=api_key_headers)).json()
+    response = await client.get(
+        f"{test_url}/{doc_id}",
+        params={"size": 3, "cursor": first_page["next_page"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not response.json()["next_page"]
+    assert [i["id"] for i in first_page["items"] + response.json()["items"]] == message_ids[::-1]
+    assert "context" not in first_page["items"][0]
+
+
+async def test_returns_messages_with_client_supplied_ids_newest_first(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    doc_id = faker.uuid4()
+    # Random IDs, the newer message gets the smaller one
+    message_ids = sorted((str(uuid4()) for _ in range(2)), reverse=True)
+
+    for message_id in message_ids:
+        response = await client.post(
+            f"/api/sessions/{chat_session.id}/messages",
+            json={**build_message_data(faker, [doc_id]), "id": message_id},
+            headers=api_key_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    first_page = (await client.get(f"{test_url}/{doc_id}", params={"size": 1}, headers=api_key_headers)).json()
+    response = await client.get(
+        f"{test_url}/{doc_id}",
+        params={"size": 1, "cursor": first_page["next_page"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in first_page["items"] + response.json()["items"]] == message_ids[::-1]
+
+
+async def test_deletes_cited_documents_with_session(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    await client.post(
+        f"/api/sessions/{chat_session.id}/messages",
+        json=build_message_data(faker, [faker.uuid4()]),
+        headers=api_key_headers,
+    )
+
+    response = await client.delete(f"/api/sessions/{chat_session.id}", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert await db_session.scalar(select(func.count()).select_from(ChatMessageDocument)) == 0
@@ -0,0 +1,105 @@
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import TotalModeEnum
+from app.models import ChatSession
+from tests.factories import ChatMessageFactory, ChatSessionFactory
+
+test_url = "/api/messages/search"
+
+
+async def test_return_401_if_provided_wrong_api_key(
+    client: AsyncClient,
+    wrong_api_key_headers: dict,
+):
+    response = await client.get(test_url, headers=wrong_api_key_headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_returns_422_if_query_not_provided(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    response = await client.get(test_url, params={"user_id": faker.uuid4(), "q": ""}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+async def test_returns_matching_messages_of_user_sessions_most_relevant_first(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    user_session = await ChatSessionFactory.provide(db_session).create(user_id=chat_session.user_id)
+    best_match = await ChatMessageFactory.provide(db_session).create(
+        session=chat_session, content="Postgres indexes and more indexes for postgres"
+    )
+    match = await ChatMessageFactory.provide(db_session).create(session=user_session, content="How do I add an index?")
+    await ChatMessageFactory.provide(db_session).create(session=chat_session, content="Unrelated question")
+    # Messages of other users are not searched
+    await ChatMessageFactory.provide(db_session).create(content="Postgres index")
+
+    response = await client.get(
+        test_url,
+        params={"user_id": chat_session.user_id, "q": "indexing"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert [(i["id"], i["session_id"]) for i in items] == [
+        (str(best_match.id), str(best_match.session_id)),
+        (str(match.id), str(match.session_id)),
+    ]
+    assert items[0]["rank"] > items[1]["rank"]
+    assert items[1]["snippet"] == "How do I add an <b>index</b>?"
+
+
+async def test_returns_matches_by_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    messages = await ChatMessageFactory.provide(db_session).create_batch(
+        size=5, session=chat_session, content="Retrieval augmented generation"
+    )
+
+    params = {"user_id": chat_session.user_id, "q": '"augmented generation" -fine-tuning', "size": 3}
+    first_page = (await client.get(test_url, params=params, headers=api_key_headers)).json()
+
+    response = await client.get(
+        test_url,
+        params={**params, "cursor": first_page["next_page"], "total_mode": TotalModeEnum.EXACT},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 5
+    assert not response.json()["next_page"]
+    # All the messages have equal ranks, so they are ordered by their ids
+    items = first_page["items"] + response.json()["items"]
+    assert [i["id"] for i in items] == [str(i.id) for i in reversed(messages)]
+
+
+async def test_returns_empty_list_if_nothing_matches(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    await ChatMessageFactory.provide(db_session).create(session=chat_session, content="Retrieval")
+
+    response = await client.get(
+        test_url,
+        params={"user_id": chat_session.user_id, "q": "generation"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not response.json()["items"]
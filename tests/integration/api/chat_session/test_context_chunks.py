@@ -0,0 +1,170 @@
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import SenderTypeEnum
+from app.core.helpers.context_chunks import get_chunk_hash, normalize_chunk
+from app.models import ChatMessage, ChatSession, ContextChunk
+from app.services.context_chunk import ContextChunkService
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture(autouse=True)
+def clear_context_chunk_cache():
+    ContextChunkService.cache.clear()
+
+
+def build_chunk(faker: Faker) -> dict:
+    return {"doc_id": faker.uuid4(), "text": faker.text(max_nb_chars=500)}
+
+
+def build_message_data(faker: Faker, chunks: list) -> dict:
+    return {
+        "sender": faker.enum(SenderTypeEnum),
+        "content": faker.pystr(),
+        "context": {"query": faker.pystr(), "chunks": chunks},
+    }
+
+
+async def test_stores_identical_chunks_once(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    shared_chunk = build_chunk(faker)
+    small_chunk = {"doc_id": "a"}
+    first_message_data = build_message_data(faker, [shared_chunk, build_chunk(faker), small_chunk])
+    second_message_data = build_message_data(faker, [{**shared_chunk}])
+
+    first_response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json=first_message_data,
+        headers=api_key_headers,
+    )
+    second_response = await client.post(
+        f"{test_url}/{other_chat_session.id}/messages",
+        json=second_message_data,
+        headers=api_key_headers,
+    )
+
+    assert first_response.status_code == second_response.status_code == status.HTTP_201_CREATED
+    assert first_response.json()["context"] == first_message_data["context"]
+    assert second_response.json()["context"] == second_message_data["context"]
+
+    assert await db_session.scalar(select(func.count()).select_from(ContextChunk)) == 2
+
+    stored_context = await db_session.scalar(select(ChatMessage.context).filter_by(id=first_response.json()["id"]))
+    assert [set(chunk) for chunk in stored_context["chunks"]] == [{"$chunk"}, {"$chunk"}, {"doc_id"}]
+    assert stored_context["query"] == first_message_data["context"]["query"]
+
+
+async def test_returns_messages_with_expanded_chunks(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    chunk = build_chunk(faker)
+    messages_data = [build_message_data(faker, [chunk]), build_message_data(faker, [chunk, build_chunk(faker)])]
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages:batch", json=messages_data, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [i["context"] for i in response.json()] == [i["context"] for i in messages_data]
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"fields": "id,context"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["context"] for i in response.json()["items"]] == [i["context"] for i in messages_data]
+
+
+async def test_fetches_missing_chunks_with_single_query(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    executed_statements: list[str],
+):
+    messages_data = [build_message_data(faker, [build_chunk(faker), build_chunk(faker)]) for _ in range(3)]
+    await client.post(f"{test_url}/{chat_session.id}/messages:batch", json=messages_data, headers=api_key_headers)
+    ContextChunkService.cache.clear()
+
+    executed_statements.clear()
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages", params={"fields": "context"}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["context"] for i in response.json()["items"]] == [i["context"] for i in messages_data]
+    assert len([i for i in executed_statements if "FROM context_chunk" in i]) == 1
+
+    executed_statements.clear()
+    await client.get(f"{test_url}/{chat_session.id}/messages", params={"fields": "context"}, headers=api_key_headers)
+
+    assert not [i for i in executed_statements if "FROM context_chunk" in i]
+
+
+async def test_returns_deduplication_stats(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    chunk = build_chunk(faker)
+    messages_data = [build_message_data(faker, [chunk]) for _ in range(4)]
+    await client.post(f"{test_url}/{chat_session.id}/messages:batch", json=messages_data, headers=api_key_headers)
+
+    stats = await ContextChunkService(db_session).get_stats()
+
+    chunk_size = await db_session.scalar(select(ContextChunk.size))
+    assert (stats.chunks, stats.references) == (1, 4)
+    assert (stats.stored_bytes, stats.referenced_bytes) == (chunk_size, 4 * chunk_size)
+    assert stats.dedup_ratio == 4
+    assert stats.saved_bytes == 3 * chunk_size - stats.reference_bytes
+
+
+async def test_does_not_expand_client_chunks_that_look_like_references(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    stored_response = await client.post(
+        f"{test_url}/{other_chat_session.id}/messages",
+        json=build_message_data(faker, [build_chunk(faker)]),
+        headers=api_key_headers,
+    )
+    ContextChunkService.cache.clear()
+
+    # A reference to the chunk of another session, small enough to be kept inline
+    stored_chunk_hash = get_chunk_hash(normalize_chunk(stored_response.json()["context"]["chunks"][0]))
+    message_data = build_message_data(faker, [{"$chunk": stored_chunk_hash}])
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["context"] == message_data["context"]
+
+    ContextChunkService.cache.clear()
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/{response.json()['id']}",
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["context"] == message_data["context"]
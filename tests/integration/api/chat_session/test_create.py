@@ -1,8 +1,14 @@
+from uuid import UUID
+
 from faker import Faker
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.chat_session import ChatSessionDetailSchema
+from app.core.enums import SenderTypeEnum
+from app.models import ChatMessage, ChatSession
+from app.schemas.chat_session import ChatSessionCreatedSchema, ChatSessionDetailSchema
 
 test_url = "/api/sessions"
 
@@ -51,3 +57,92 @@ async def test_returns_422_if_schema_not_valid(
     response = await client.post(test_url, json={"title": faker.pybool()}, headers=api_key_headers)
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_creates_chat_session_with_initial_messages(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    executed_statements: list[str],
+):
+    messages_data = [
+        {
+            "sender": faker.enum(SenderTypeEnum),
+            "content": faker.pystr(),
+            "context": faker.pydict(value_types=(str,)),
+        }
+        for _ in range(2)
+    ]
+
+    response = await client.post(
+        test_url,
+        json={
+            "user_id": faker.uuid4(),
+            "title": faker.pystr(),
+            "messages": messages_data,
+        },
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(executed_statements) == 2
+
+    response_obj = ChatSessionCreatedSchema.model_validate(response.json())
+
+    db_objs = (await db_session.scalars(select(ChatMessage).order_by(ChatMessage.seq))).all()
+    assert [i.id for i in db_objs] == response_obj.message_ids
+    assert [i.content for i in db_objs] == [i["content"] for i in messages_data]
+    assert all(i.session_id == response_obj.id for i in db_objs)
+
+
+async def test_returns_stored_chat_session_if_id_exists(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    session_data = {
+        "id": faker.uuid4(),
+        "user_id": faker.uuid4(),
+        "title": faker.pystr(),
+        "messages": [{"sender": faker.enum(SenderTypeEnum), "content": faker.pystr(), "context": {}}],
+    }
+
+    response = await client.post(test_url, json=session_data, headers=api_key_headers)
+    resent_response = await client.post(test_url, json=session_data, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["id"] == session_data["id"]
+    assert resent_response.status_code == status.HTTP_200_OK
+    assert resent_response.json()["id"] == session_data["id"]
+
+    assert len((await db_session.scalars(select(ChatMessage))).all()) == 1
+
+
+async def test_returns_409_if_initial_message_ids_exist(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    messages_data = [
+        {"id": faker.uuid4(), "sender": faker.enum(SenderTypeEnum), "content": faker.pystr(), "context": {}},
+    ]
+
+    response = await client.post(
+        test_url,
+        json={"user_id": faker.uuid4(), "title": faker.pystr(), "messages": messages_data},
+        headers=api_key_headers,
+    )
+    conflict_response = await client.post(
+        test_url,
+        json={"user_id": faker.uuid4(), "title": faker.pystr(), "messages": messages_data},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert conflict_response.status_code == status.HTTP_409_CONFLICT
+
+    assert [i.id for i in (await db_session.scalars(select(ChatSession))).all()] == [UUID(response.json()["id"])]
+    assert len((await db_session.scalars(select(ChatMessage))).all()) == 1
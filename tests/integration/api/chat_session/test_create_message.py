@@ -1,10 +1,13 @@
+import asyncio
+
 from faker import Faker
 from fastapi import status
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.enums import SenderTypeEnum
 from app.models import ChatSession
+from app.repositories.chat_message import ChatMessageRepository
 from app.schemas.chat_message import ChatMessageSchema
 
 test_url = "/api/sessions"
@@ -52,6 +55,27 @@ async def test_creates_and_returns_message(
     assert response_obj.session_id == chat_session.id
 
 
+async def test_creates_message_in_single_statement(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    executed_statements: list[str],
+):
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json={
+            "sender": faker.enum(SenderTypeEnum),
+            "content": faker.pystr(),
+            "context": faker.pydict(value_types=(str,)),
+        },
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(executed_statements) == 1
+
+
 async def test_returns_404_if_chat_session_not_exists(
     client: AsyncClient,
     api_key_headers: dict,
@@ -69,3 +93,110 @@ async def test_returns_404_if_chat_session_not_exists(
     )
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_assigns_increasing_seq_within_chat_session(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    seqs = []
+
+    for session in (chat_session, chat_session, other_chat_session, chat_session):
+        response = await client.post(
+            f"{test_url}/{session.id}/messages",
+            json={
+                "sender": faker.enum(SenderTypeEnum),
+                "content": faker.pystr(),
+                "context": faker.pydict(value_types=(str,)),
+            },
+            headers=api_key_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        seqs.append(response.json()["seq"])
+
+    assert seqs == [1, 2, 1, 3]
+
+
+async def test_returns_stored_message_if_id_exists(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    message_data = {
+        "id": faker.uuid4(),
+        "sender": faker.enum(SenderTypeEnum),
+        "content": faker.pystr(),
+        "context": faker.pydict(value_types=(str,)),
+    }
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+    resent_response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json=message_data,
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert resent_response.status_code == status.HTTP_200_OK
+    assert resent_response.json() == response.json()
+    assert response.json()["id"] == message_data["id"]
+
+    await db_session.refresh(chat_session)
+    assert chat_session.message_count == 1
+    assert chat_session.last_message_seq == 1
+
+
+async def test_returns_409_if_message_id_taken_by_another_session(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    message_data = {"id": faker.uuid4(), "sender": faker.enum(SenderTypeEnum), "content": faker.pystr(), "context": {}}
+
+    await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+    response = await client.post(
+        f"{test_url}/{other_chat_session.id}/messages",
+        json=message_data,
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+async def test_keeps_message_count_if_same_id_inserted_concurrently(
+    db_session: AsyncSession,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    message_data = {
+        "id": faker.uuid4(cast_to=None),
+        "session_id": chat_session.id,
+        "sender": faker.enum(SenderTypeEnum),
+        "content": faker.pystr(),
+        "context": {},
+    }
+
+    async with db_session_maker() as first_session, db_session_maker() as second_session:
+        await ChatMessageRepository(first_session).upsert(message_data, autocommit=False)
+
+        # The second upsert starts before the first one commits and waits for the session row lock
+        second_upsert = asyncio.create_task(ChatMessageRepository(second_session).upsert(message_data))
+        await asyncio.sleep(0.2)
+        await first_session.commit()
+
+        message, created = await second_upsert
+
+    assert not created
+    assert message.id == message_data["id"]
+
+    await db_session.refresh(chat_session)
+    assert chat_session.message_count == 1
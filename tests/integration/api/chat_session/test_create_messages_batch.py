@@ -0,0 +1,169 @@
+import asyncio
+from uuid import UUID
+
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.enums import SenderTypeEnum
+from app.models import ChatMessage, ChatSession
+from app.repositories.chat_message import ChatMessageRepository
+from app.schemas.chat_message import ChatMessageDetailSchema
+
+test_url = "/api/sessions"
+
+
+def build_messages_data(faker: Faker, size: int) -> list[dict]:
+    return [
+        {
+            "sender": faker.enum(SenderTypeEnum),
+            "content": faker.pystr(),
+            "context": faker.pydict(value_types=(str,)),
+        }
+        for _ in range(size)
+    ]
+
+
+async def test_return_403_if_provided_wrong_api_key(
+    client: AsyncClient,
+    wrong_api_key_headers: dict,
+    faker: Faker,
+):
+    response = await client.post(f"{test_url}/{faker.uuid4()}/messages:batch", headers=wrong_api_key_headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_returns_422_if_messages_not_provided(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.post(f"{test_url}/{chat_session.id}/messages:batch", json=[], headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+async def test_creates_and_returns_messages_in_order(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    executed_statements: list[str],
+):
+    messages_data = build_messages_data(faker, size=3)
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages:batch",
+        json=messages_data,
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(executed_statements) == 1
+
+    response_objs = TypeAdapter(list[ChatMessageDetailSchema]).validate_python(response.json())
+    assert [i.content for i in response_objs] == [i["content"] for i in messages_data]
+    assert [i.seq for i in response_objs] == [1, 2, 3]
+    assert all(i.session_id == chat_session.id for i in response_objs)
+
+    db_objs = (await db_session.scalars(select(ChatMessage).order_by(ChatMessage.seq))).all()
+    assert [i.id for i in db_objs] == [i.id for i in response_objs]
+
+
+async def test_returns_404_if_chat_session_not_exists(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    response = await client.post(
+        f"{test_url}/{faker.uuid4()}/messages:batch",
+        json=build_messages_data(faker, size=2),
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert not (await db_session.scalars(select(ChatMessage))).all()
+
+
+async def test_returns_409_if_message_ids_exist(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    # The conflicts roll back the session of the test, which expires the fixtures
+    session_urls = [f"{test_url}/{chat_session.id}", f"{test_url}/{other_chat_session.id}"]
+    messages_data = [{**message_data, "id": faker.uuid4()} for message_data in build_messages_data(faker, size=2)]
+
+    response = await client.post(
+        f"{session_urls[0]}/messages:batch",
+        json=messages_data,
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+    for session_url in session_urls:
+        resent_response = await client.post(
+            f"{session_url}/messages:batch",
+            json=[*build_messages_data(faker, size=1), messages_data[1]],
+            headers=api_key_headers,
+        )
+
+        assert resent_response.status_code == status.HTTP_409_CONFLICT
+
+    db_objs = (await db_session.scalars(select(ChatMessage).order_by(ChatMessage.seq))).all()
+    assert [str(i.id) for i in db_objs] == [i["id"] for i in messages_data]
+
+    # Deleting by ID expects a single message
+    await ChatMessageRepository(db_session).delete(db_objs[1].id)
+
+
+async def test_returns_409_if_message_ids_repeated(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    message_id = faker.uuid4()
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages:batch",
+        json=[{**message_data, "id": message_id} for message_data in build_messages_data(faker, size=2)],
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert not (await db_session.scalars(select(ChatMessage))).all()
+
+
+async def test_creates_concurrent_messages_with_same_id_once(
+    db_session: AsyncSession,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    faker: Faker,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    message_data = {**build_messages_data(faker, size=1)[0], "id": faker.uuid4(cast_to=None)}
+
+    async def create(session_id: UUID) -> None:
+        async with db_session_maker() as session:
+            await ChatMessageRepository(session).create_many([{**message_data, "session_id": session_id}])
+
+    results = await asyncio.gather(
+        create(chat_session.id),
+        create(other_chat_session.id),
+        return_exceptions=True,
+    )
+
+    assert sorted(type(result).__name__ for result in results) == ["ConflictError", "NoneType"]
+    assert len((await db_session.scalars(select(ChatMessage))).all()) == 1
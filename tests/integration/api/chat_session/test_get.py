@@ -38,6 +38,27 @@ async def test_returns_chat_session(
     assert response_obj == ChatSessionDetailSchema.model_validate(chat_session)
 
 
+async def test_returns_only_requested_chat_session_fields(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(f"{test_url}/{chat_session.id}", params={"fields": "id,title"}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": str(chat_session.id), "title": chat_session.title}
+
+
+async def test_returns_422_if_unknown_chat_session_field_requested(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(f"{test_url}/{chat_session.id}", params={"fields": "secret"}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
 async def test_returns_404_if_chat_session_not_exists(
     client: AsyncClient,
     api_key_headers: dict,
@@ -4,6 +4,7 @@ from httpx import AsyncClient
 from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.enums import ChatSessionSortEnum, SenderTypeEnum, SortOrderEnum, TotalModeEnum
 from app.schemas.chat_session import ChatSessionSchema
 from tests.factories import ChatSessionFactory
 
@@ -48,6 +49,110 @@ async def test_returns_sessions_by_user_id(
     assert {i.id for i in response_objs} == {i.id for i in target_sessions}
 
 
+async def test_returns_only_requested_session_fields(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    user_id = faker.uuid4()
+    target_session = await ChatSessionFactory.provide(db_session).create(user_id=user_id)
+
+    response = await client.get(test_url, params={"user_id": user_id, "fields": "title"}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    # `last_activity_at` and `id` are the cursor keyset, so they are always returned
+    assert response.json()["items"] == [
+        {
+            "id": str(target_session.id),
+            "title": target_session.title,
+            "last_activity_at": target_session.last_activity_at.isoformat().replace("+00:00", "Z"),
+        },
+    ]
+
+
+async def test_returns_most_recently_active_sessions_first(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    executed_statements: list[str],
+):
+    user_id = faker.uuid4()
+    oldest_session, *other_sessions = await ChatSessionFactory.provide(db_session).create_batch(size=3, user_id=user_id)
+    contents = [faker.pystr(), faker.pystr()]
+
+    await client.post(
+        f"{test_url}/{oldest_session.id}/messages:batch",
+        json=[{"sender": SenderTypeEnum.USER, "content": content, "context": {}} for content in contents],
+        headers=api_key_headers,
+    )
+
+    executed_statements.clear()
+    response = await client.get(test_url, params={"user_id": user_id}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    # The counters are stored on the sessions, so the messages are not read
+    assert not [i for i in executed_statements if "chat_message" in i]
+
+    response_objs = TypeAdapter(list[ChatSessionSchema]).validate_python(response.json()["items"])
+    assert [i.id for i in response_objs] == [oldest_session.id, *(i.id for i in reversed(other_sessions))]
+    assert (response_objs[0].message_count, response_objs[0].last_message_preview) == (2, contents[-1])
+    assert response_objs[0].last_activity_at > response_objs[1].last_activity_at
+    assert (response_objs[1].message_count, response_objs[1].last_message_preview) == (0, None)
+
+
+async def test_returns_sessions_by_user_id_newest_first_by_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    user_id = faker.uuid4()
+    target_sessions = await ChatSessionFactory.provide(db_session).create_batch(size=5, user_id=user_id)
+
+    response = await client.get(test_url, params={"user_id": user_id, "size": 3}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    assert first_page["next_page"]
+
+    response = await client.get(
+        test_url,
+        params={"user_id": user_id, "size": 3, "cursor": first_page["next_page"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    second_page = response.json()
+    assert not second_page["next_page"]
+
+    response_objs = TypeAdapter(list[ChatSessionSchema]).validate_python(first_page["items"] + second_page["items"])
+    assert [i.id for i in response_objs] == [i.id for i in reversed(target_sessions)]
+
+
+async def test_returns_exact_total_of_user_sessions(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    size = 3
+    user_id = faker.uuid4()
+    await ChatSessionFactory.provide(db_session).create_batch(size=size, user_id=user_id)
+    _wrong_sessions = await ChatSessionFactory.provide(db_session).create_batch(size=size)
+
+    response = await client.get(
+        test_url,
+        params={"user_id": user_id, "total_mode": TotalModeEnum.EXACT, "size": 1},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == size
+    assert response.json()["total_mode"] == TotalModeEnum.EXACT
+
+
 async def test_returns_empty_list_if_user_id_not_exists(
     client: AsyncClient,
     api_key_headers: dict,
@@ -66,3 +171,105 @@ async def test_returns_422_if_user_id_not_provided(
     response = await client.get(test_url, headers=api_key_headers)
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+async def test_returns_favorite_sessions(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    user_id = faker.uuid4()
+    favorite_sessions = await ChatSessionFactory.provide(db_session).create_batch(
+        size=2, user_id=user_id, is_favorite=True
+    )
+    other_sessions = await ChatSessionFactory.provide(db_session).create_batch(
+        size=2, user_id=user_id, is_favorite=False
+    )
+
+    for is_favorite, target_sessions in ((True, favorite_sessions), (False, other_sessions)):
+        response = await client.get(
+            test_url,
+            params={"user_id": user_id, "is_favorite": is_favorite},
+            headers=api_key_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [i["id"] for i in response.json()["items"]] == [str(i.id) for i in reversed(target_sessions)]
+
+
+async def test_returns_sessions_in_requested_order_by_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    user_id = faker.uuid4()
+    target_sessions = await ChatSessionFactory.provide(db_session).create_batch(size=5, user_id=user_id)
+    # Activity of the oldest session moves it to the end of the activity order, but not of the creation order
+    await client.post(
+        f"{test_url}/{target_sessions[0].id}/messages",
+        json={"sender": SenderTypeEnum.USER, "content": faker.pystr(), "context": {}},
+        headers=api_key_headers,
+    )
+
+    for sort, order, expected_sessions in (
+        (ChatSessionSortEnum.CREATED, SortOrderEnum.ASC, target_sessions),
+        (ChatSessionSortEnum.CREATED, SortOrderEnum.DESC, target_sessions[::-1]),
+        (ChatSessionSortEnum.LAST_ACTIVITY, SortOrderEnum.ASC, [*target_sessions[1:], target_sessions[0]]),
+    ):
+        params = {"user_id": user_id, "sort": sort, "order": order, "size": 3}
+        first_page = (await client.get(test_url, params=params, headers=api_key_headers)).json()
+        response = await client.get(
+            test_url,
+            params={**params, "cursor": first_page["next_page"]},
+            headers=api_key_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        items = first_page["items"] + response.json()["items"]
+        assert [i["id"] for i in items] == [str(i.id) for i in expected_sessions]
+
+
+async def test_returns_sessions_by_title(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    user_id = faker.uuid4()
+    factory = ChatSessionFactory.provide(db_session)
+    target_session = await factory.create(user_id=user_id, title="Vector search with 100% recall")
+    await factory.create(user_id=user_id, title="Vector search with 100 results")
+    await factory.create(title="Vector search with 100% recall")
+
+    # `%` is matched literally, and typos only match fuzzy searches
+    for title_contains, expected_sessions in (("SEARCH WITH 100%", [target_session]), ("vectr", [])):
+        response = await client.get(
+            test_url,
+            params={"user_id": user_id, "title_contains": title_contains},
+            headers=api_key_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [i["id"] for i in response.json()["items"]] == [str(i.id) for i in expected_sessions]
+
+
+async def test_returns_sessions_with_similar_titles_if_fuzzy(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    user_id = faker.uuid4()
+    target_session = await ChatSessionFactory.provide(db_session).create(user_id=user_id, title="Embedding models")
+    await ChatSessionFactory.provide(db_session).create(user_id=user_id, title="Reranking")
+
+    response = await client.get(
+        test_url,
+        params={"user_id": user_id, "title_contains": "embeding", "fuzzy": True},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(target_session.id)]
@@ -0,0 +1,145 @@
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.enums import ChatSessionSortEnum, SortOrderEnum
+
+test_url = "/api/sessions"
+
+USERS = 20
+SESSIONS_PER_USER = 500
+MANY_SESSIONS = 20_000
+user_id = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.fixture
+def executed_queries(db_engine: AsyncEngine) -> Generator[list[tuple[str, Any]], None, None]:
+    """Collect session list queries sent to the database during the test, with their parameters."""
+    queries: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, *_args):
+        if statement.startswith("SELECT") and "FROM chat_session" in statement:
+            queries.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    yield queries
+
+    event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+async def sessions(db_session: AsyncSession, db_engine: AsyncEngine):
+    await db_session.execute(
+        text(
+            f"""
+            INSERT INTO chat_session (id, user_id, title, is_favorite, last_activity_at, created_at)
+            SELECT
+                gen_random_uuid(),
+                CAST('00000000-0000-0000-0000-' || lpad(CAST(number % {USERS} AS text), 12, '0') AS uuid),
+                md5(CAST(number AS text)),
+                number % 50 = 0,
+                now() - random() * interval '30 days',
+                now() - random() * interval '30 days'
+            FROM generate_series(1, {USERS * SESSIONS_PER_USER}) AS number
+            """,
+        ),
+    )
+    await db_session.commit()
+
+    # Sets the visibility map, which tells the planner that index-only scans don't need to read the table
+    async with db_engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE chat_session"))
+
+
+@pytest.mark.parametrize(
+    ("params", "index"),
+    [
+        ({}, "ix_chat_session_user_id_last_activity_at"),
+        ({"is_favorite": True}, "ix_chat_session_user_id_last_activity_at_favorite"),
+        ({"is_favorite": False}, "ix_chat_session_user_id_last_activity_at"),
+        ({"order": SortOrderEnum.ASC}, "ix_chat_session_user_id_last_activity_at"),
+        ({"sort": ChatSessionSortEnum.CREATED}, "ix_chat_session_user_id_created_at"),
+        (
+            {"sort": ChatSessionSortEnum.CREATED, "order": SortOrderEnum.ASC, "is_favorite": True},
+            "ix_chat_session_user_id_created_at",
+        ),
+    ],
+)
+@pytest.mark.usefixtures("sessions")
+async def test_reads_session_list_by_index_only_scans(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    executed_queries: list[tuple[str, Any]],
+    params: dict,
+    index: str,
+):
+    params = {"user_id": user_id, "size": 5, **params}
+    first_page = (await client.get(test_url, params=params, headers=api_key_headers)).json()
+
+    response = await client.get(test_url, params={**params, "cursor": first_page["next_page"]}, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(executed_queries) == 2
+
+    for statement, parameters in executed_queries:
+        result = await (await db_session.connection()).exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        plan = "\n".join(result.scalars())
+
+        assert f"Index Only Scan using {index} " in plan or f"Index Only Scan Backward using {index} " in plan, plan
+        assert "Seq Scan" not in plan, plan
+        assert "Sort" not in plan, plan
+
+
+@pytest.fixture
+async def many_sessions(db_session: AsyncSession, db_engine: AsyncEngine):
+    """Sessions of a user who has so many of them that scanning all their titles is slower than the title index."""
+    await db_session.execute(
+        text(
+            f"""
+            INSERT INTO chat_session (id, user_id, title)
+            SELECT gen_random_uuid(), CAST('{user_id}' AS uuid), md5(CAST(number AS text))
+            FROM generate_series(1, {MANY_SESSIONS}) AS number
+            """,
+        ),
+    )
+    await db_session.commit()
+
+    async with db_engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE chat_session"))
+
+
+@pytest.mark.parametrize("fuzzy", [False, True])
+@pytest.mark.usefixtures("many_sessions")
+async def test_searches_titles_by_trigram_index(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    executed_queries: list[tuple[str, Any]],
+    fuzzy: bool,
+):
+    title = await db_session.scalar(text("SELECT md5('1')"))
+
+    response = await client.get(
+        test_url,
+        params={"user_id": user_id, "title_contains": title[4:16].upper(), "fuzzy": fuzzy},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["title"] for i in response.json()["items"]] == [title]
+
+    statement, parameters = executed_queries[-1]
+    result = await (await db_session.connection()).exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    plan = "\n".join(result.scalars())
+
+    assert "Bitmap Index Scan on ix_chat_session_title_trgm" in plan, plan
+    assert "Seq Scan" not in plan, plan
@@ -4,8 +4,9 @@ from httpx import AsyncClient
 from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.enums import SenderTypeEnum, TotalModeEnum
 from app.models import ChatSession
-from app.schemas.chat_message import ChatMessageSchema
+from app.schemas.chat_message import ChatMessagePartialSchema
 from tests.factories import ChatMessageFactory
 
 test_url = "/api/sessions"
@@ -43,12 +44,63 @@ async def test_returns_chat_session_messages(
 
     assert response.status_code == status.HTTP_200_OK
 
-    response_objs = TypeAdapter(list[ChatMessageSchema]).validate_python(response.json()["items"])
+    response_objs = TypeAdapter(list[ChatMessagePartialSchema]).validate_python(response.json()["items"])
     assert len(response_objs) == size
     assert {i.id for i in response_objs} == {i.id for i in target_messages}
     assert [i.session_id == chat_session.id for i in response_objs]
 
 
+async def test_returns_chat_session_messages_without_context_by_default(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    await ChatMessageFactory.provide(db_session).create_batch(size=2, session=chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [set(i) for i in response.json()["items"]] == [
+        {"id", "session_id", "seq", "sender", "content", "is_offloaded", "is_streaming", "token_count"}
+    ] * 2
+
+
+async def test_returns_only_requested_message_fields(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    target_message = await ChatMessageFactory.provide(db_session).create(session=chat_session)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"fields": "content,context"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    # `seq` is the cursor keyset, so it is always returned
+    assert response.json()["items"] == [
+        {"seq": target_message.seq, "content": target_message.content, "context": target_message.context},
+    ]
+
+
+async def test_returns_422_if_unknown_message_field_requested(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"fields": "content,password"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
 async def test_returns_empty_list_if_messages_not_exist(
     client: AsyncClient,
     api_key_headers: dict,
@@ -68,3 +120,115 @@ async def test_returns_404_if_chat_session_not_exists(
     response = await client.get(f"{test_url}/{faker.uuid4()}/messages", headers=api_key_headers)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_returns_chat_session_messages_in_chronological_order_by_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    target_messages = await ChatMessageFactory.provide(db_session).create_batch(size=5, session=chat_session)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"size": 3},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    assert first_page["next_page"]
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"size": 3, "cursor": first_page["next_page"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    second_page = response.json()
+    assert not second_page["next_page"]
+
+    response_objs = TypeAdapter(list[ChatMessagePartialSchema]).validate_python(
+        first_page["items"] + second_page["items"]
+    )
+    assert [i.id for i in response_objs] == [i.id for i in target_messages]
+
+
+async def test_returns_400_if_cursor_not_valid(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"cursor": "bm90LWEta2V5c2V0"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_returns_no_total_by_default(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    await ChatMessageFactory.provide(db_session).create_batch(size=3, session=chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] is None
+    assert response.json()["total_mode"] == TotalModeEnum.NONE
+
+
+async def test_returns_exact_total_from_message_counter(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    size = 3
+
+    for _ in range(size):
+        await client.post(
+            f"{test_url}/{chat_session.id}/messages",
+            json={
+                "sender": faker.enum(SenderTypeEnum),
+                "content": faker.pystr(),
+                "context": faker.pydict(value_types=(str,)),
+            },
+            headers=api_key_headers,
+        )
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"total_mode": TotalModeEnum.EXACT, "size": 1},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == size
+    assert response.json()["total_mode"] == TotalModeEnum.EXACT
+
+
+async def test_returns_estimated_total(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    await ChatMessageFactory.provide(db_session).create_batch(size=3, session=chat_session)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages",
+        params={"total_mode": TotalModeEnum.ESTIMATE},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] >= 0
+    assert response.json()["total_mode"] == TotalModeEnum.ESTIMATE
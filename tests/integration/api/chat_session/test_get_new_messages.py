@@ -0,0 +1,318 @@
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.enums import SenderTypeEnum
+from app.models import ChatSession
+from tests.factories import ChatMessageFactory
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture
+def executed_queries(db_engine: AsyncEngine) -> Generator[list[tuple[str, Any]], None, None]:
+    """Collect queries sent to the database during the test, with their parameters."""
+    queries: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, *_args):
+        queries.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    yield queries
+
+    event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def test_return_401_if_provided_wrong_api_key(
+    client: AsyncClient,
+    wrong_api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/since", headers=wrong_api_key_headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_returns_messages_added_after_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    seen_messages = await ChatMessageFactory.provide(db_session).create_batch(size=2, session=chat_session)
+    await ChatMessageFactory.provide(db_session).create_batch(size=2, session=other_chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/since", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(i.id) for i in seen_messages]
+    cursor = response.json()["cursor"]
+
+    new_messages = await ChatMessageFactory.provide(db_session).create_batch(size=3, session=chat_session)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since", params={"after": cursor}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(i.id) for i in new_messages]
+    assert not response.json()["has_more"]
+
+
+async def test_returns_304_if_no_messages_added(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    await ChatMessageFactory.provide(db_session).create_batch(size=2, session=chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/since", headers=api_key_headers)
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"after": response.json()["cursor"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+
+async def test_returns_304_if_session_has_no_messages(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/since", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+async def test_returns_404_if_chat_session_not_exists(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    response = await client.get(f"{test_url}/{faker.uuid4()}/messages/since", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_accepts_next_page_of_message_list(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    messages = await ChatMessageFactory.provide(db_session).create_batch(size=3, session=chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages", params={"size": 1}, headers=api_key_headers)
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"after": response.json()["next_page"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(i.id) for i in messages[1:]]
+
+
+async def test_returns_more_messages_by_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    messages = await ChatMessageFactory.provide(db_session).create_batch(size=5, session=chat_session)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since", params={"size": 3}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    assert first_page["has_more"]
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"size": 3, "after": first_page["cursor"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    second_page = response.json()
+    assert not second_page["has_more"]
+    assert [i["id"] for i in first_page["items"] + second_page["items"]] == [str(i.id) for i in messages]
+
+
+async def test_returns_streaming_message_again_when_finalized(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    messages = []
+
+    for is_streaming in (True, False):
+        response = await client.post(
+            f"{test_url}/{chat_session.id}/messages",
+            json={"sender": SenderTypeEnum.AI, "content": "Hello", "context": {}, "is_streaming": is_streaming},
+            headers=api_key_headers,
+        )
+        messages.append(response.json())
+
+    streaming_message, _ = messages
+    message_url = f"{test_url}/{chat_session.id}/messages/{streaming_message['id']}"
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/since", headers=api_key_headers)
+
+    assert [i["id"] for i in response.json()["items"]] == [i["id"] for i in messages]
+    cursor = response.json()["cursor"]
+
+    response = await client.post(
+        f"{message_url}/content", content=", world", headers={**api_key_headers, "Content-Type": "text/plain"}
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    # Appended content is not a change
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since", params={"after": cursor}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await client.post(f"{message_url}:finalize", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since", params={"after": cursor}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(i["id"], i["seq"], i["content"], i["is_streaming"]) for i in response.json()["items"]] == [
+        (streaming_message["id"], streaming_message["seq"], "Hello, world", False),
+    ]
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"after": response.json()["cursor"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+async def test_returns_messages_finalized_after_position_of_message_list(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    messages = []
+
+    for is_streaming in (True, False):
+        response = await client.post(
+            f"{test_url}/{chat_session.id}/messages",
+            json={"sender": SenderTypeEnum.AI, "content": "Hello", "context": {}, "is_streaming": is_streaming},
+            headers=api_key_headers,
+        )
+        messages.append(response.json())
+
+    streaming_message, message = messages
+
+    # The list is read up to the streaming message
+    response = await client.get(f"{test_url}/{chat_session.id}/messages", params={"size": 1}, headers=api_key_headers)
+    next_page = response.json()["next_page"]
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages/{streaming_message['id']}:finalize", headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since", params={"after": next_page}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(i["id"], i["is_streaming"]) for i in response.json()["items"]] == [
+        (message["id"], False),
+        (streaming_message["id"], False),
+    ]
+
+
+async def test_returns_only_requested_message_fields(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    message = await ChatMessageFactory.provide(db_session).create(session=chat_session)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"fields": "content,context"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    # `seq` is the cursor keyset, so it is always returned
+    assert response.json()["items"] == [{"seq": message.seq, "content": message.content, "context": message.context}]
+
+
+async def test_returns_400_if_cursor_not_valid(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"after": "bm90LWEta2V5c2V0"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_reads_new_messages_by_single_index_range_scan(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    executed_queries: list[tuple[str, Any]],
+):
+    await ChatMessageFactory.provide(db_session).create_batch(size=3, session=chat_session)
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since", params={"size": 1}, headers=api_key_headers
+    )
+
+    executed_queries.clear()
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/since",
+        params={"after": response.json()["cursor"]},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(executed_queries) == 1
+    (statement, parameters), *_ = executed_queries
+
+    # Prevents scans of whole partitions, which the planner prefers for the few messages of the test
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    result = await (await db_session.connection()).exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    plan = "\n".join(result.scalars())
+
+    # The session is read by its primary key, and its messages by a limited range scan of each partition,
+    # only the returned messages are sorted
+    assert "Index Scan using chat_session_pkey" in plan, plan
+    assert "Limit" in plan.split("Merge Append")[0], plan
+    assert plan.count("Index Scan using") - 1 == plan.count("_session_id_change_seq_change_no_idx"), plan
+    assert "Seq Scan" not in plan, plan
@@ -0,0 +1,181 @@
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import config
+from app.core.enums import SenderTypeEnum
+from app.models import ChatSession
+from tests.factories import ChatMessageFactory
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture
+def executed_queries(db_engine: AsyncEngine) -> Generator[list[tuple[str, Any]], None, None]:
+    """Collect queries sent to the database during the test, with their parameters."""
+    queries: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, *_args):
+        queries.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    yield queries
+
+    event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def test_return_401_if_provided_wrong_api_key(
+    client: AsyncClient,
+    wrong_api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window", params={"max_tokens": 100}, headers=wrong_api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize(
+    ("max_tokens", "expected_messages", "expected_has_more"),
+    [
+        (100, [0, 1, 2, 3], False),
+        (9, [1, 2, 3], True),
+        (8, [2, 3], True),
+        (4, [], True),
+    ],
+)
+async def test_returns_most_recent_messages_within_budget(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+    max_tokens: int,
+    expected_messages: list[int],
+    expected_has_more: bool,
+):
+    messages = [
+        await ChatMessageFactory.provide(db_session).create(session=chat_session, token_count=token_count)
+        for token_count in (2, 1, 3, 5)
+    ]
+    await ChatMessageFactory.provide(db_session).create(session=other_chat_session, token_count=1)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window", params={"max_tokens": max_tokens}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(messages[i].id) for i in expected_messages]
+    assert response.json()["token_count"] == sum(messages[i].token_count for i in expected_messages)
+    assert response.json()["has_more"] is expected_has_more
+
+
+async def test_returns_empty_window_if_session_has_no_messages(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window", params={"max_tokens": 100}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"items": [], "token_count": 0, "has_more": False, "summary": None}
+
+
+async def test_returns_404_if_chat_session_not_exists(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    response = await client.get(
+        f"{test_url}/{faker.uuid4()}/window", params={"max_tokens": 100}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_returns_422_if_budget_not_valid(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window", params={"max_tokens": 0}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def test_counts_tokens_of_full_content_when_message_is_created(
+    client: AsyncClient,
+    api_key_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    chat_session: ChatSession,
+):
+    monkeypatch.setattr(config, "blob_storage_path", tmp_path)
+    monkeypatch.setattr(config, "blob_offload_threshold", 100)
+    monkeypatch.setattr(config, "blob_content_preview_length", 10)
+    content = "Hello, world! " * 20
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json={"sender": SenderTypeEnum.AI, "content": content, "context": {}},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["token_count"] == 80
+
+    # Offloaded content is returned in full, as it is counted in full
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window",
+        params={"max_tokens": 100, "fields": "content,token_count"},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["items"] == [{"content": content, "token_count": 80}]
+
+
+async def test_walks_only_messages_within_budget(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    executed_queries: list[tuple[str, Any]],
+):
+    await ChatMessageFactory.provide(db_session).create_batch(size=20, session=chat_session, token_count=1)
+
+    executed_queries.clear()
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window", params={"max_tokens": 3}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(executed_queries) == 1
+    (statement, parameters), *_ = executed_queries
+
+    # Prevents scans of whole partitions, which the planner prefers for the few messages of the test
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    result = await (await db_session.connection()).exec_driver_sql(
+        f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF, SUMMARY OFF) {statement}", parameters
+    )
+    plan = "\n".join(result.scalars())
+
+    # The newest messages are walked one by one until the budget is exceeded, and the window is read by a range scan
+    assert "Recursive Union (actual rows=4" in plan, plan
+    message_scans = [line for line in plan.splitlines() if "Scan" in line and " on chat_message" in line]
+    assert message_scans, plan
+    assert all("_session_id_seq_idx" in line for line in message_scans), plan
+    assert "Seq Scan" not in plan, plan
@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.enums import SenderTypeEnum
+from app.core.schemas import IdempotencyRequestSchema
+from app.models import ChatMessage, ChatSession, IdempotencyKey
+from app.repositories.idempotency_key import IdempotencyKeyRepository
+from app.schemas.chat_message import ChatMessageCreateSchema, ChatMessageDetailSchema
+from app.services.chat_message import ChatMessageService
+from app.services.idempotency_key import IdempotencyKeyService
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture(autouse=True)
+def clear_idempotency_cache():
+    IdempotencyKeyService.cache.clear()
+
+
+def build_message_data(faker: Faker) -> dict:
+    return {
+        "sender": faker.enum(SenderTypeEnum),
+        "content": faker.pystr(),
+        "context": faker.pydict(value_types=(str,)),
+    }
+
+
+async def test_replays_message_creation(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    executed_statements: list[str],
+):
+    headers = {**api_key_headers, "Idempotency-Key": faker.uuid4()}
+    message_data = build_message_data(faker)
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.headers["Idempotent-Replayed"] == "false"
+
+    executed_statements.clear()
+    replayed_response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=headers)
+
+    assert replayed_response.status_code == status.HTTP_201_CREATED
+    assert replayed_response.headers["Idempotent-Replayed"] == "true"
+    assert replayed_response.json() == response.json()
+    assert not executed_statements
+
+    assert await db_session.scalar(select(func.count()).select_from(ChatMessage)) == 1
+
+
+async def test_replays_from_database_on_cache_miss(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    executed_statements: list[str],
+):
+    headers = {**api_key_headers, "Idempotency-Key": faker.uuid4()}
+    message_data = build_message_data(faker)
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=headers)
+
+    IdempotencyKeyService.cache.clear()
+    executed_statements.clear()
+    replayed_response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=headers)
+
+    assert replayed_response.headers["Idempotent-Replayed"] == "true"
+    assert replayed_response.json() == response.json()
+    assert len(executed_statements) == 1
+    assert "chat_message" not in executed_statements[0]
+
+
+async def test_replays_messages_batch_creation(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    headers = {**api_key_headers, "Idempotency-Key": faker.uuid4()}
+    messages_data = [build_message_data(faker) for _ in range(2)]
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages:batch", json=messages_data, headers=headers)
+    replayed_response = await client.post(
+        f"{test_url}/{chat_session.id}/messages:batch",
+        json=messages_data,
+        headers=headers,
+    )
+
+    assert replayed_response.status_code == status.HTTP_201_CREATED
+    assert replayed_response.json() == response.json()
+    assert await db_session.scalar(select(func.count()).select_from(ChatMessage)) == 2
+
+
+async def test_replays_session_creation(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+):
+    headers = {**api_key_headers, "Idempotency-Key": faker.uuid4()}
+    session_data = {"user_id": faker.uuid4(), "title": faker.pystr(), "messages": [build_message_data(faker)]}
+
+    response = await client.post(test_url, json=session_data, headers=headers)
+    replayed_response = await client.post(test_url, json=session_data, headers=headers)
+
+    assert replayed_response.status_code == status.HTTP_201_CREATED
+    assert replayed_response.json() == response.json()
+    assert await db_session.scalar(select(func.count()).select_from(ChatSession)) == 1
+    assert await db_session.scalar(select(func.count()).select_from(ChatMessage)) == 1
+
+
+async def test_returns_422_if_key_used_with_different_request(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    headers = {**api_key_headers, "Idempotency-Key": faker.uuid4()}
+
+    await client.post(f"{test_url}/{chat_session.id}/messages", json=build_message_data(faker), headers=headers)
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json=build_message_data(faker),
+        headers=headers,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert await db_session.scalar(select(func.count()).select_from(ChatMessage)) == 1
+
+
+async def test_does_not_replay_expired_key(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    key = faker.uuid4()
+    await db_session.execute(
+        insert(IdempotencyKey).values(
+            key=key,
+            request_hash=faker.sha256(),
+            response={},
+            expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        ),
+    )
+    await db_session.commit()
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json=build_message_data(faker),
+        headers={**api_key_headers, "Idempotency-Key": key},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.headers["Idempotent-Replayed"] == "false"
+
+    db_obj = await db_session.scalar(select(IdempotencyKey).execution_options(populate_existing=True))
+    assert db_obj.response == response.json()
+    assert db_obj.expires_at > datetime.now(timezone.utc)
+
+
+async def test_returns_response_of_concurrent_request_with_same_key(
+    db_session: AsyncSession,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    request = IdempotencyRequestSchema(key=faker.uuid4(), request_hash=faker.sha256())
+    winner_response = {"id": faker.uuid4()}
+
+    async def create() -> ChatMessage:
+        message = await ChatMessageService(db_session).create(
+            ChatMessageCreateSchema(session_id=chat_session.id, **build_message_data(faker)),
+            autocommit=False,
+        )
+
+        # The concurrent request commits the same key while this one is in progress
+        async with db_session_maker() as other_session:
+            await IdempotencyKeyRepository(other_session).create(
+                {
+                    "key": request.key,
+                    "request_hash": request.request_hash,
+                    "response": winner_response,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(minutes=1),
+                },
+            )
+
+        return message
+
+    response, replayed = await IdempotencyKeyService(db_session).get_or_create(request, create, ChatMessageDetailSchema)
+
+    assert replayed
+    assert response == winner_response
+    assert not (await db_session.scalars(select(ChatMessage))).all()
+
+
+async def test_purges_expired_keys_in_batches(
+    db_session: AsyncSession,
+    faker: Faker,
+):
+    now = datetime.now(timezone.utc)
+    active_key = faker.uuid4()
+    await db_session.execute(
+        insert(IdempotencyKey),
+        [
+            {
+                "key": key,
+                "request_hash": faker.sha256(),
+                "response": {},
+                "expires_at": now + timedelta(minutes=1) if key == active_key else now - timedelta(seconds=1),
+            }
+            for key in [active_key, *(faker.uuid4() for _ in range(5))]
+        ],
+    )
+    await db_session.commit()
+
+    assert await IdempotencyKeyRepository(db_session).purge_expired(batch_size=2) == 5
+    assert (await db_session.scalars(select(IdempotencyKey.key))).all() == [active_key]
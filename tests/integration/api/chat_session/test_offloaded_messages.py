@@ -0,0 +1,188 @@
+from pathlib import Path
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.enums import SenderTypeEnum
+from app.models import ChatMessage, ChatSession
+from tests.factories import ChatMessageFactory
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture(autouse=True)
+def blob_storage_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.setattr(config, "blob_storage_path", tmp_path)
+    monkeypatch.setattr(config, "blob_offload_threshold", 1024)
+    monkeypatch.setattr(config, "blob_content_preview_length", 100)
+
+    return tmp_path
+
+
+def build_message_data(faker: Faker, content_size: int, context_size: int = 0) -> dict:
+    return {
+        "sender": faker.enum(SenderTypeEnum),
+        "content": faker.pystr(min_chars=content_size, max_chars=content_size),
+        "context": {"document": faker.pystr(min_chars=context_size, max_chars=context_size)},
+    }
+
+
+async def test_offloads_oversized_content_and_context(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    blob_storage_path: Path,
+):
+    message_data = build_message_data(faker, content_size=5000, context_size=5000)
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["is_offloaded"]
+    assert response.json()["content"] == message_data["content"][:100]
+    assert response.json()["context"] == {}
+
+    stored = (await db_session.execute(select(ChatMessage).filter_by(id=response.json()["id"]))).scalar_one()
+    assert stored.content == message_data["content"][:100]
+    assert (blob_storage_path / stored.content_blob[:2] / stored.content_blob[2:4] / stored.content_blob).is_file()
+    assert stored.context_blob is not None
+
+
+async def test_keeps_small_messages_inline(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    blob_storage_path: Path,
+):
+    message_data = build_message_data(faker, content_size=500)
+
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not response.json()["is_offloaded"]
+    assert response.json()["content"] == message_data["content"]
+    assert not list(blob_storage_path.iterdir())
+
+
+async def test_writes_no_blobs_for_rejected_messages(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+    blob_storage_path: Path,
+):
+    message_id = str((await ChatMessageFactory.provide(db_session).create(session=chat_session)).id)
+    session_url = f"{test_url}/{chat_session.id}"
+    message_data = build_message_data(faker, content_size=5000, context_size=5000)
+
+    response = await client.post(f"{test_url}/{faker.uuid4()}/messages", json=message_data, headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.post(
+        f"{session_url}/messages:batch", json=[{**message_data, "id": message_id}], headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    # Re-sending a stored message
+    response = await client.post(
+        f"{session_url}/messages", json={**message_data, "id": message_id}, headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not list(blob_storage_path.iterdir())
+
+
+async def test_returns_previews_in_message_listing(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    messages_data = [build_message_data(faker, content_size=5000), build_message_data(faker, content_size=10)]
+    await client.post(f"{test_url}/{chat_session.id}/messages:batch", json=messages_data, headers=api_key_headers)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(i["content"], i["is_offloaded"]) for i in response.json()["items"]] == [
+        (messages_data[0]["content"][:100], True),
+        (messages_data[1]["content"], False),
+    ]
+
+
+async def test_returns_full_offloaded_message(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    message_data = build_message_data(faker, content_size=5000, context_size=5000)
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/{response.json()['id']}",
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["content"] == message_data["content"]
+    assert response.json()["context"] == message_data["context"]
+
+
+async def test_returns_offloaded_message_content(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    message_data = build_message_data(faker, content_size=5000)
+    response = await client.post(f"{test_url}/{chat_session.id}/messages", json=message_data, headers=api_key_headers)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/{response.json()['id']}/content",
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "text/plain; charset=utf-8"
+    assert response.text == message_data["content"]
+
+
+async def test_returns_inline_message_content(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    message = await ChatMessageFactory.provide(db_session).create(session=chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/{message.id}/content", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == message.content
+
+
+async def test_returns_404_if_message_not_in_session(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    message = await ChatMessageFactory.provide(db_session).create(session=other_chat_session)
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages/{message.id}", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,305 @@
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.enums import SenderTypeEnum
+from app.core.pagination import encode_keyset_cursor
+from app.models import ChatSession, ChatSessionSummary
+from app.repositories.chat_message import ChatMessageRepository
+from app.services.chat_session_summary import ChatSessionSummaryService
+from tests.factories import ChatMessageFactory
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture(autouse=True)
+def summary_interval(monkeypatch: pytest.MonkeyPatch) -> int:
+    monkeypatch.setattr(config, "summary_interval", 2)
+
+    return 2
+
+
+async def get_summaries(db_session: AsyncSession, session_id: UUID | str) -> list[ChatSessionSummary]:
+    return list(
+        await db_session.scalars(
+            select(ChatSessionSummary)
+            .filter(ChatSessionSummary.session_id == session_id)
+            .order_by(ChatSessionSummary.last_seq)
+            .execution_options(populate_existing=True)
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    ("seqs", "expected"),
+    [
+        ([1], None),
+        ([3], None),
+        ([4], 2),
+        ([5], None),
+        ([6], 4),
+        ([3, 4, 5], 2),
+        ([5, 6, 7, 8, 9], 6),
+    ],
+)
+def test_summary_is_due_every_interval_behind_the_latest_messages(seqs: list[int], expected: int | None):
+    session_id = uuid4()
+    messages = [SimpleNamespace(session_id=session_id, seq=seq) for seq in seqs]
+
+    assert ChatSessionSummaryService.get_due_positions(messages).get(session_id) == expected
+
+
+async def test_summarizes_session_in_background_after_messages_are_added(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    for content in ("first\nline", "second", "third"):
+        response = await client.post(
+            f"{test_url}/{chat_session.id}/messages",
+            json={"sender": SenderTypeEnum.USER, "content": content, "context": {}},
+            headers=api_key_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    assert await get_summaries(db_session, chat_session.id) == []
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages:batch",
+        json=[
+            {"sender": SenderTypeEnum.AI, "content": content, "context": {}} for content in ("fourth", "fifth", "sixth")
+        ],
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+    summaries = await get_summaries(db_session, chat_session.id)
+
+    assert [summary.last_seq for summary in summaries] == [4]
+    assert summaries[0].content == "USER: first\nUSER: second\nUSER: third\nAI: fourth"
+    assert summaries[0].token_count == 12
+
+
+@pytest.mark.parametrize("variant", ["plain", "client_id", "idempotent"])
+async def test_summarizes_session_created_with_initial_messages(
+    monkeypatch: pytest.MonkeyPatch,
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    faker: Faker,
+    variant: str,
+):
+    monkeypatch.setattr(config, "summary_interval", 50)
+    session_data = {
+        "user_id": faker.uuid4(),
+        "title": faker.sentence(),
+        "messages": [{"sender": SenderTypeEnum.USER, "content": str(i), "context": {}} for i in range(1, 101)],
+    }
+    headers = api_key_headers
+
+    if variant == "client_id":
+        session_data["id"] = faker.uuid4()
+    elif variant == "idempotent":
+        headers = {**api_key_headers, "Idempotency-Key": faker.uuid4()}
+
+    response = await client.post(test_url, json=session_data, headers=headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+    summaries = await get_summaries(db_session, response.json()["id"])
+
+    assert [summary.last_seq for summary in summaries] == [50]
+    assert summaries[0].content == "\n".join(f"USER: {i}" for i in range(1, 51))
+
+
+async def test_summarizes_incrementally_from_previous_summary(
+    db_session: AsyncSession,
+    chat_session: ChatSession,
+):
+    for seq, content in enumerate(("first", "second", "third", "fourth"), start=1):
+        await ChatMessageFactory.provide(db_session).create(
+            session=chat_session, seq=seq, sender=SenderTypeEnum.USER, content=content
+        )
+
+    service = ChatSessionSummaryService(db_session)
+
+    assert (await service.summarize(chat_session.id, 2)).content == "USER: first\nUSER: second"
+    assert (await service.summarize(chat_session.id, 4)).content == (
+        "USER: first\nUSER: second\nUSER: third\nUSER: fourth"
+    )
+    assert await service.summarize(chat_session.id, 4) is None
+
+    summaries = await get_summaries(db_session, chat_session.id)
+
+    assert [summary.last_seq for summary in summaries] == [2, 4]
+
+
+async def test_summarizes_streaming_message_once_it_is_finalized(
+    db_session: AsyncSession,
+    chat_session: ChatSession,
+):
+    messages = [
+        await ChatMessageFactory.provide(db_session).create(
+            session=chat_session, seq=seq, sender=SenderTypeEnum.USER, content=content, is_streaming=seq == 2
+        )
+        for seq, content in enumerate(("first", "sec", "third", "fourth"), start=1)
+    ]
+    message_repository = ChatMessageRepository(db_session)
+    await message_repository.append_content(chat_session.id, messages[1].id, "ond")
+
+    service = ChatSessionSummaryService(db_session)
+
+    assert (await service.summarize(chat_session.id, 4)).content == "USER: first"
+
+    await message_repository.finalize(chat_session.id, messages[1].id)
+
+    assert (await service.summarize(chat_session.id, 4)).content == (
+        "USER: first\nUSER: second\nUSER: third\nUSER: fourth"
+    )
+
+
+async def test_keeps_end_of_summary_within_max_length(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    chat_session: ChatSession,
+):
+    monkeypatch.setattr(config, "summary_max_length", 10)
+
+    for seq, content in enumerate(("first", "second"), start=1):
+        await ChatMessageFactory.provide(db_session).create(
+            session=chat_session, seq=seq, sender=SenderTypeEnum.USER, content=content
+        )
+
+    summary = await ChatSessionSummaryService(db_session).summarize(chat_session.id, 2)
+
+    assert summary.content == "ER: second"
+
+
+async def test_get_summary_returns_latest_summary(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    db_session.add_all(
+        [
+            ChatSessionSummary(session_id=chat_session.id, last_seq=2, content="older", token_count=1),
+            ChatSessionSummary(session_id=chat_session.id, last_seq=4, content="latest", token_count=1),
+            ChatSessionSummary(session_id=other_chat_session.id, last_seq=6, content="other", token_count=1),
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get(f"{test_url}/{chat_session.id}/summary", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["content"] == "latest"
+    assert response.json()["last_seq"] == 4
+    assert response.json()["cursor"] == encode_keyset_cursor([4])
+
+
+async def test_get_summary_returns_404_if_session_has_no_summary(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    faker: Faker,
+):
+    for session_id in (chat_session.id, faker.uuid4()):
+        response = await client.get(f"{test_url}/{session_id}/summary", headers=api_key_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    ("max_tokens", "expected_messages", "expected_has_more"),
+    [
+        (100, [2, 3], False),
+        (7, [3], True),
+        (3, [], True),
+    ],
+)
+async def test_window_starts_with_latest_summary(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    max_tokens: int,
+    expected_messages: list[int],
+    expected_has_more: bool,
+):
+    messages = [
+        await ChatMessageFactory.provide(db_session).create(session=chat_session, seq=seq, token_count=token_count)
+        for seq, token_count in enumerate((2, 1, 3, 4), start=1)
+    ]
+    db_session.add(ChatSessionSummary(session_id=chat_session.id, last_seq=2, content="summary", token_count=3))
+    await db_session.commit()
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window",
+        params={"max_tokens": max_tokens, "summary": True},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(messages[i].id) for i in expected_messages]
+    assert response.json()["token_count"] == 3 + sum(messages[i].token_count for i in expected_messages)
+    assert response.json()["has_more"] is expected_has_more
+    assert response.json()["summary"]["content"] == "summary"
+    assert response.json()["summary"]["last_seq"] == 2
+
+
+async def test_window_without_summary_if_session_has_none(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    message = await ChatMessageFactory.provide(db_session).create(session=chat_session, seq=1, token_count=2)
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window",
+        params={"max_tokens": 100, "summary": True},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(message.id)]
+    assert response.json()["token_count"] == 2
+    assert response.json()["summary"] is None
+
+
+async def test_window_without_summary_over_budget(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+):
+    messages = [
+        await ChatMessageFactory.provide(db_session).create(session=chat_session, seq=seq, token_count=token_count)
+        for seq, token_count in enumerate((4, 3, 5), start=1)
+    ]
+    db_session.add(ChatSessionSummary(session_id=chat_session.id, last_seq=2, content="summary", token_count=100))
+    await db_session.commit()
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/window",
+        params={"max_tokens": 10, "summary": True},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in response.json()["items"]] == [str(message.id) for message in messages[1:]]
+    assert response.json()["token_count"] == 8
+    assert response.json()["has_more"] is True
+    assert response.json()["summary"] is None
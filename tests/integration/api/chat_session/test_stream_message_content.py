@@ -0,0 +1,176 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.enums import SenderTypeEnum
+from app.models import ChatMessageChunk, ChatSession
+from app.services.chat_message import ChatMessageService
+from tests.factories import ChatMessageFactory
+
+test_url = "/api/sessions"
+
+
+@pytest.fixture
+async def streaming_message(client: AsyncClient, api_key_headers: dict, chat_session: ChatSession) -> dict:
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages",
+        json={"sender": SenderTypeEnum.AI, "content": "Hello", "context": {}, "is_streaming": True},
+        headers=api_key_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["is_streaming"]
+
+    return response.json()
+
+
+async def append(client: AsyncClient, api_key_headers: dict, message: dict, content: str | bytes) -> int:
+    response = await client.post(
+        f"{test_url}/{message['session_id']}/messages/{message['id']}/content",
+        content=content,
+        headers={**api_key_headers, "Content-Type": "text/plain"},
+    )
+
+    return response.status_code
+
+
+async def test_return_401_if_provided_wrong_api_key(
+    client: AsyncClient,
+    wrong_api_key_headers: dict,
+    streaming_message: dict,
+):
+    assert await append(client, wrong_api_key_headers, streaming_message, "!") == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_appends_content_visible_to_readers(
+    client: AsyncClient,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    streaming_message: dict,
+):
+    assert await append(client, api_key_headers, streaming_message, ", wörld") == status.HTTP_204_NO_CONTENT
+    assert await append(client, api_key_headers, streaming_message, "!") == status.HTTP_204_NO_CONTENT
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/{streaming_message['id']}", headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["content"] == "Hello, wörld!"
+    assert response.json()["is_streaming"]
+
+    response = await client.get(f"{test_url}/{chat_session.id}/messages", headers=api_key_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [i["content"] for i in response.json()["items"]] == ["Hello, wörld!"]
+
+
+async def test_finalizes_streaming_message(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    streaming_message: dict,
+):
+    await append(client, api_key_headers, streaming_message, ", world")
+
+    response = await client.post(
+        f"{test_url}/{chat_session.id}/messages/{streaming_message['id']}:finalize", headers=api_key_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["content"] == "Hello, world"
+    assert response.json()["token_count"] == 3
+    assert not response.json()["is_streaming"]
+
+    # The content is moved to the message, and becomes the preview of the session
+    assert not (await db_session.scalars(select(ChatMessageChunk))).all()
+
+    await db_session.refresh(chat_session)
+    assert chat_session.last_message_preview == "Hello, world"[: config.session_preview_length]
+
+    response = await client.get(
+        f"{test_url}/{chat_session.id}/messages/{streaming_message['id']}", headers=api_key_headers
+    )
+
+    assert response.json()["content"] == "Hello, world"
+
+
+async def test_returns_409_if_message_not_streaming(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    chat_session: ChatSession,
+    streaming_message: dict,
+):
+    message = await ChatMessageFactory.provide(db_session).create(session=chat_session)
+    finalize_url = f"{test_url}/{chat_session.id}/messages/{streaming_message['id']}:finalize"
+
+    assert await append(client, api_key_headers, {"session_id": chat_session.id, "id": message.id}, "!") == (
+        status.HTTP_409_CONFLICT
+    )
+
+    response = await client.post(finalize_url, headers=api_key_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.post(finalize_url, headers=api_key_headers)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert await append(client, api_key_headers, streaming_message, "!") == status.HTTP_409_CONFLICT
+
+
+async def test_returns_404_if_message_not_exists(
+    client: AsyncClient,
+    api_key_headers: dict,
+    faker: Faker,
+    other_chat_session: ChatSession,
+    streaming_message: dict,
+):
+    # A message is appended to within its session only
+    other_message = {**streaming_message, "session_id": other_chat_session.id}
+    assert await append(client, api_key_headers, other_message, "!") == status.HTTP_404_NOT_FOUND
+
+    missing_message = {**streaming_message, "id": faker.uuid4()}
+    assert await append(client, api_key_headers, missing_message, "!") == status.HTTP_404_NOT_FOUND
+
+    response = await client.post(
+        f"{test_url}/{streaming_message['session_id']}/messages/{faker.uuid4()}:finalize", headers=api_key_headers
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_returns_400_if_content_not_utf8(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    api_key_headers: dict,
+    streaming_message: dict,
+):
+    assert await append(client, api_key_headers, streaming_message, b"\xff\xfe") == status.HTTP_400_BAD_REQUEST
+    assert not (await db_session.scalars(select(ChatMessageChunk))).all()
+
+
+async def test_stores_streamed_content_in_batches(
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    streaming_message: dict,
+):
+    monkeypatch.setattr(config, "message_chunk_flush_size", 10)
+    monkeypatch.setattr(config, "message_chunk_flush_interval", 60)
+
+    async def chunks() -> AsyncIterator[str]:
+        for part in ("ab", "cde", "fghij", "k", "lmnopqrstu", "vw"):
+            yield part
+
+    await ChatMessageService(db_session).append_content(
+        streaming_message["session_id"], streaming_message["id"], chunks()
+    )
+
+    stored = await db_session.scalars(
+        select(ChatMessageChunk.content).filter_by(message_id=streaming_message["id"]).order_by("position")
+    )
+    assert stored.all() == ["abcdefghij", "klmnopqrstu", "vw"]
@@ -0,0 +1,300 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from urllib.parse import urlencode
+
+import pytest
+from faker import Faker
+from fastapi import FastAPI, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import config
+from app.core.dependencies import get_db_session
+from app.core.enums import SenderTypeEnum
+from app.core.listener import NotificationListener
+from app.models import ChatMessage, ChatSession
+from app.schemas.chat_message import ChatMessageCreateSchema
+from app.services.chat_message import ChatMessageService
+
+test_url = "/api/sessions"
+
+
+class EventStream:
+    """
+    Response of a streaming request, read while it is being sent.
+
+    `httpx.ASGITransport` returns responses after they are complete, which streams never are.
+    """
+
+    def __init__(self):
+        self.status_code: int | None = None
+        self.started = asyncio.Event()
+        self.chunks: asyncio.Queue[str] = asyncio.Queue()
+
+    async def read_event(self, seconds: float = 5) -> str:
+        """Returns the next event (or comment) of the stream, without the terminating blank line."""
+        return (await asyncio.wait_for(self.chunks.get(), seconds)).removesuffix("\n\n")
+
+    async def read_messages(self, seconds: float = 5) -> tuple[str, list[dict]]:
+        """Returns the ID and the messages of the next event with messages."""
+        while (event := await self.read_event(seconds)).startswith(":"):
+            pass
+
+        fields = dict(line.split(": ", 1) for line in event.splitlines())
+        assert fields["event"] == "messages"
+
+        return fields["id"], json.loads(fields["data"])["items"]
+
+
+@pytest.fixture
+def open_stream(
+    app_instance: FastAPI,
+    api_key_headers: dict,
+    db_session: AsyncSession,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> Generator[Callable[..., AbstractAsyncContextManager[EventStream]], None, None]:
+    """
+    Opens streams with database sessions of their own, like in the app: a stream is cancelled when the client
+    disconnects, which can be in the middle of a query.
+    """
+
+    async def get_stream_db_session() -> AsyncGenerator[AsyncSession, None]:
+        async with db_session_maker() as session:
+            yield session
+
+    app_instance.dependency_overrides[get_db_session] = get_stream_db_session
+
+    @asynccontextmanager
+    async def open_stream(path: str, params: dict | None = None, headers: dict | None = None):
+        stream = EventStream()
+        request_sent = False
+        disconnected = asyncio.Event()
+
+        async def receive() -> dict:
+            nonlocal request_sent
+
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                stream.status_code = message["status"]
+                stream.started.set()
+            elif message["type"] == "http.response.body" and (body := message.get("body")):
+                stream.chunks.put_nowait(body.decode())
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": urlencode(params or {}).encode(),
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in {**api_key_headers, **(headers or {})}.items()
+            ],
+            "server": ("test", 80),
+            "client": ("127.0.0.1", 12345),
+        }
+        task = asyncio.create_task(app_instance(scope, receive, send))
+
+        try:
+            await asyncio.wait_for(stream.started.wait(), 5)
+            yield stream
+
+        finally:
+            disconnected.set()
+            await asyncio.wait_for(task, 5)
+
+    yield open_stream
+
+    del app_instance.dependency_overrides[get_db_session]
+
+
+@pytest.fixture
+async def add_messages(
+    db_session_maker: async_sessionmaker[AsyncSession],
+    faker: Faker,
+) -> Callable[..., AbstractAsyncContextManager[list[ChatMessage]]]:
+    """Adds messages to a session in a transaction of its own, like another request would."""
+
+    async def add_messages(chat_session: ChatSession, size: int = 1) -> list[ChatMessage]:
+        async with db_session_maker() as session:
+            return await ChatMessageService(session).create_many(
+                [
+                    ChatMessageCreateSchema(
+                        session_id=chat_session.id,
+                        sender=SenderTypeEnum.AI,
+                        content=faker.sentence(),
+                        context={},
+                    )
+                    for _ in range(size)
+                ],
+            )
+
+    return add_messages
+
+
+async def test_streams_messages_as_they_are_added(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    add_messages: Callable,
+    chat_session: ChatSession,
+    other_chat_session: ChatSession,
+):
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream") as stream:
+        assert stream.status_code == status.HTTP_200_OK
+        assert await stream.read_event() == ": keepalive"
+
+        first_messages = await add_messages(chat_session, 2)
+        await add_messages(other_chat_session)
+        _, items = await stream.read_messages()
+
+        assert [i["id"] for i in items] == [str(i.id) for i in first_messages]
+
+        second_messages = await add_messages(chat_session)
+        _, items = await stream.read_messages()
+
+        assert [i["id"] for i in items] == [str(i.id) for i in second_messages]
+
+    assert ChatMessageService.listener.subscribers == 0
+
+
+async def test_streams_streaming_message_again_when_finalized(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    db_session_maker: async_sessionmaker[AsyncSession],
+    chat_session: ChatSession,
+):
+    async def chunks() -> AsyncGenerator[str, None]:
+        yield ", world"
+
+    async with db_session_maker() as session:
+        message = await ChatMessageService(session).create(
+            ChatMessageCreateSchema(
+                session_id=chat_session.id, sender=SenderTypeEnum.AI, content="Hello", context={}, is_streaming=True
+            ),
+        )
+
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream") as stream:
+        _, items = await stream.read_messages()
+
+        assert [(i["id"], i["content"], i["is_streaming"]) for i in items] == [(str(message.id), "Hello", True)]
+
+        async with db_session_maker() as session:
+            await ChatMessageService(session).append_content(chat_session.id, message.id, chunks())
+            await ChatMessageService(session).finalize(chat_session.id, message.id)
+
+        _, items = await stream.read_messages()
+
+        assert [(i["id"], i["content"], i["is_streaming"]) for i in items] == [(str(message.id), "Hello, world", False)]
+
+
+async def test_resumes_from_last_event_id(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    add_messages: Callable,
+    chat_session: ChatSession,
+):
+    seen_messages = await add_messages(chat_session, 2)
+
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream") as stream:
+        event_id, items = await stream.read_messages()
+
+        assert [i["id"] for i in items] == [str(i.id) for i in seen_messages]
+
+    missed_messages = await add_messages(chat_session, 2)
+
+    async with open_stream(
+        f"{test_url}/{chat_session.id}/messages/stream", headers={"Last-Event-ID": event_id}
+    ) as stream:
+        _, items = await stream.read_messages()
+
+        assert [i["id"] for i in items] == [str(i.id) for i in missed_messages]
+
+
+async def test_resumes_from_cursor(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    add_messages: Callable,
+    chat_session: ChatSession,
+):
+    messages = await add_messages(chat_session, 3)
+
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream", params={"size": 1}) as stream:
+        cursor, _ = await stream.read_messages()
+
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream", params={"after": cursor}) as stream:
+        _, items = await stream.read_messages()
+
+        assert [i["id"] for i in items] == [str(i.id) for i in messages[1:]]
+
+
+async def test_sends_messages_of_slow_client_in_batches(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    add_messages: Callable,
+    chat_session: ChatSession,
+):
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream", params={"size": 2}) as stream:
+        await stream.read_event()
+
+        messages = []
+
+        for _ in range(5):
+            messages.extend(await add_messages(chat_session))
+
+        # The client has read nothing while the messages were added
+        await asyncio.sleep(0.2)
+        streamed = []
+
+        while len(streamed) < len(messages):
+            _, items = await stream.read_messages()
+            assert len(items) <= 2
+            streamed.extend(items)
+
+        assert [i["id"] for i in streamed] == [str(i.id) for i in messages]
+
+
+async def test_returns_404_if_chat_session_not_exists(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    faker: Faker,
+):
+    async with open_stream(f"{test_url}/{faker.uuid4()}/messages/stream") as stream:
+        assert stream.status_code == status.HTTP_404_NOT_FOUND
+
+    assert ChatMessageService.listener.subscribers == 0
+
+
+async def test_sends_keepalive_comments(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    monkeypatch: pytest.MonkeyPatch,
+    chat_session: ChatSession,
+):
+    monkeypatch.setattr(config, "message_stream_keepalive_interval", 0.05)
+
+    async with open_stream(f"{test_url}/{chat_session.id}/messages/stream") as stream:
+        assert [await stream.read_event() for _ in range(3)] == [": keepalive"] * 3
+
+
+async def test_shares_listener_connection_between_streams(
+    open_stream: Callable[..., AbstractAsyncContextManager[EventStream]],
+    add_messages: Callable,
+    chat_session: ChatSession,
+):
+    listener: NotificationListener = ChatMessageService.listener
+
+    async with (
+        open_stream(f"{test_url}/{chat_session.id}/messages/stream") as first_stream,
+        open_stream(f"{test_url}/{chat_session.id}/messages/stream") as second_stream,
+    ):
+        assert listener.subscribers == 2
+
+        messages = await add_messages(chat_session)
+
+        for stream in (first_stream, second_stream):
+            _, items = await stream.read_messages()
+            assert [i["id"] for i in items] == [str(i.id) for i in messages]
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+from app.core.blob_storage import LocalBlobStorage
+from app.core.exceptions.exceptions import NotFoundError
+
+
+@pytest.fixture
+def blob_storage(tmp_path: Path) -> LocalBlobStorage:
+    return LocalBlobStorage(tmp_path)
+
+
+async def test_returns_stored_blob(blob_storage: LocalBlobStorage):
+    key = await blob_storage.put(b"payload")
+
+    assert await blob_storage.get(key) == b"payload"
+
+
+async def test_stores_blobs_under_content_hash_paths(blob_storage: LocalBlobStorage, tmp_path: Path):
+    key = await blob_storage.put(b"payload")
+
+    assert key == await blob_storage.put(b"payload")
+    assert blob_storage.get_path(key) == tmp_path / key[:2] / key[2:4] / key
+    assert [path.name for path in tmp_path.rglob("*") if path.is_file()] == [key]
+
+
+async def test_raises_not_found_error_if_blob_not_exists(blob_storage: LocalBlobStorage):
+    with pytest.raises(NotFoundError):
+        await blob_storage.get(blob_storage.get_key(b"missing"))
+
+
+def test_raises_not_found_error_if_key_not_valid(blob_storage: LocalBlobStorage):
+    with pytest.raises(NotFoundError):
+        blob_storage.get_path("../../etc/passwd")
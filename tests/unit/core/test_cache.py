@@ -0,0 +1,55 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def monotonic(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    return now
+
+
+def test_returns_cached_value():
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_evicts_least_recently_used_entry():
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_expires_entries(monotonic: list[float]):
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=120)
+    monotonic[0] += 60
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_does_not_cache_if_disabled():
+    cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl=60)
+
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
@@ -0,0 +1,38 @@
+from app.core.helpers.context_chunks import get_chunk_hash, get_chunk_ref, get_document_ids, normalize_chunk
+
+
+def test_normalizes_chunks_regardless_of_key_order():
+    first = normalize_chunk({"text": "Paris is the capital of France", "meta": {"page": 1, "doc_id": "a"}})
+    second = normalize_chunk({"meta": {"doc_id": "a", "page": 1}, "text": "Paris is the capital of France"})
+
+    assert first == second
+    assert get_chunk_hash(first) == get_chunk_hash(second)
+
+
+def test_keeps_non_ascii_characters_in_normalized_chunks():
+    assert normalize_chunk({"text": "Größe"}) == '{"text":"Größe"}'.encode()
+
+
+def test_returns_hash_of_chunk_ref():
+    assert get_chunk_ref({"$chunk": "abc"}) == "abc"
+
+
+def test_returns_none_for_inline_chunks():
+    assert get_chunk_ref({"$chunk": "abc", "text": "inline"}) is None
+    assert get_chunk_ref({"text": "inline"}) is None
+    assert get_chunk_ref("inline") is None
+
+
+def test_returns_distinct_document_ids_of_chunks():
+    context = {
+        "query": "capital of France",
+        "chunks": [{"doc_id": "a"}, {"doc_id": 7}, {"doc_id": "a"}, {"doc_id": True}, {"text": "no id"}, "inline"],
+    }
+
+    assert get_document_ids(context) == ["a", "7"]
+
+
+def test_returns_no_document_ids_if_context_has_no_chunks():
+    assert get_document_ids({"chunks": {"doc_id": "a"}}) == []
+    assert get_document_ids({}) == []
+    assert get_document_ids(None) == []
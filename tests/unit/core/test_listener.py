@@ -0,0 +1,84 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.listener import NotificationListener, Subscription
+
+channel = "test_channel"
+
+
+async def notify(db_session: AsyncSession, payload: str) -> None:
+    await db_session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+    await db_session.commit()
+
+
+async def test_wakes_up_subscribers_of_notified_key(db_session: AsyncSession):
+    listener = NotificationListener(channel)
+
+    async with listener.subscribe("a") as first, listener.subscribe("a") as second, listener.subscribe("b") as other:
+        await notify(db_session, "a")
+
+        assert await listener.wait(first, 5)
+        assert await listener.wait(second, 5)
+        assert not await listener.wait(other, 0.1)
+
+
+async def test_collapses_notifications_of_slow_subscriber(db_session: AsyncSession):
+    listener = NotificationListener(channel)
+
+    async with listener.subscribe("a") as subscription:
+        for _ in range(3):
+            await notify(db_session, "a")
+
+        # Lets all the notifications arrive before the subscriber waits
+        await asyncio.sleep(0.2)
+
+        assert await listener.wait(subscription, 5)
+        assert not await listener.wait(subscription, 0.1)
+
+
+async def test_does_not_deliver_rolled_back_notifications(db_session: AsyncSession):
+    listener = NotificationListener(channel)
+
+    async with listener.subscribe("a") as subscription:
+        await db_session.execute(text("SELECT pg_notify(:channel, 'a')"), {"channel": channel})
+        await db_session.rollback()
+
+        assert not await listener.wait(subscription, 0.1)
+
+
+async def test_closes_connection_after_last_subscriber_leaves():
+    listener = NotificationListener(channel)
+
+    async with listener.subscribe("a"):
+        async with listener.subscribe("b"):
+            assert listener.subscribers == 2
+
+        assert listener._connection is not None
+
+    assert listener.subscribers == 0
+    assert listener._connection is None
+
+
+async def test_wakes_up_all_subscribers_when_connection_is_lost(db_session: AsyncSession):
+    listener = NotificationListener(channel)
+
+    async with listener.subscribe("a") as first, listener.subscribe("b") as second:
+        pid = listener._connection.get_server_pid()
+        await db_session.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+
+        assert await listener.wait(first, 5)
+        assert await second.wait(5)
+
+        # The next wait reconnects, and notifications are delivered again
+        waiter = asyncio.create_task(listener.wait(first, 5))
+        await asyncio.sleep(0.1)
+        await notify(db_session, "a")
+
+        assert await waiter
+        assert listener._connection.get_server_pid() != pid
+
+
+async def test_subscription_times_out():
+    assert not await Subscription().wait(0.01)
@@ -0,0 +1,17 @@
+import pytest
+
+from app.core.tokenizer import WordTokenizer
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("", 0),
+        ("  \n\t ", 0),
+        ("Hello, wörld!", 4),
+        ("It's 42.", 5),
+        ("snake_case_name()", 3),
+    ],
+)
+def test_counts_words_and_punctuation_marks(text: str, expected: int):
+    assert WordTokenizer().count(text) == expected
@@ -0,0 +1,32 @@
+import time
+
+from app.core.utils import UUID7Generator, format_server_sent_event
+
+
+def test_uuid7_has_version_and_timestamp():
+    started_at = time.time_ns() // 1_000_000
+
+    value = UUID7Generator()()
+
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert started_at <= value.int >> 80 <= time.time_ns() // 1_000_000
+
+
+def test_uuid7_values_are_strictly_increasing():
+    uuid7 = UUID7Generator()
+
+    values = [uuid7() for _ in range(10_000)]
+
+    assert values == sorted(set(values))
+
+
+def test_formats_server_sent_event():
+    assert format_server_sent_event('{"a": 1}\n{"b": 2}', event="messages", event_id="c") == (
+        'id: c\nevent: messages\ndata: {"a": 1}\ndata: {"b": 2}\n\n'
+    )
+    assert format_server_sent_event("x") == "data: x\n\n"
+
+
+def test_formats_keepalive_comment():
+    assert format_server_sent_event(None) == ": keepalive\n\n"
@@ -0,0 +1,73 @@
+from faker import Faker
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import SenderTypeEnum
+from app.models import ChatMessageDocument, ChatSession
+from app.repositories.chat_message import ChatMessageRepository
+
+
+def build_message_data(faker: Faker, chat_session: ChatSession, doc_ids: list[str]) -> dict:
+    return {
+        "id": faker.uuid4(cast_to=None),
+        "session_id": chat_session.id,
+        "sender": faker.enum(SenderTypeEnum),
+        "content": faker.pystr(),
+        "context": {"chunks": [{"doc_id": doc_id} for doc_id in doc_ids]},
+    }
+
+
+async def get_cited_documents(db_session: AsyncSession) -> set[tuple]:
+    result = await db_session.execute(select(ChatMessageDocument.doc_id, ChatMessageDocument.message_id))
+
+    return set(result.tuples().all())
+
+
+async def test_indexes_cited_documents_of_created_messages(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    repository = ChatMessageRepository(db_session)
+    first_message, _ = await repository.create_many(
+        [build_message_data(faker, chat_session, ["a", "b"]), build_message_data(faker, chat_session, [])],
+    )
+    # Chunks of the service are already replaced with references, so their IDs are passed separately
+    third_message = await repository.create(
+        {**build_message_data(faker, chat_session, []), "document_ids": ["a"]},
+    )
+
+    assert await get_cited_documents(db_session) == {
+        ("a", first_message.id),
+        ("b", first_message.id),
+        ("a", third_message.id),
+    }
+
+
+async def test_indexes_cited_documents_of_resent_message_once(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    repository = ChatMessageRepository(db_session)
+    message_data = build_message_data(faker, chat_session, ["a"])
+
+    message, _ = await repository.upsert(message_data)
+    await repository.upsert(message_data)
+
+    assert await get_cited_documents(db_session) == {("a", message.id)}
+
+
+async def test_deletes_cited_documents_with_message(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    repository = ChatMessageRepository(db_session)
+    message, other_message = await repository.create_many(
+        [build_message_data(faker, chat_session, ["a"]), build_message_data(faker, chat_session, ["a"])],
+    )
+
+    await repository.delete(message.id)
+
+    assert await get_cited_documents(db_session) == {("a", other_message.id)}
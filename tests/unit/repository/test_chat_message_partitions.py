@@ -0,0 +1,182 @@
+from datetime import UTC, datetime
+
+import pytest
+from faker import Faker
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import SenderTypeEnum, ToastCompressionEnum
+from app.core.helpers.partitions import create_monthly_partitions, get_partitions, month_start
+from app.models import ChatMessage, ChatMessageDocument, ChatSession
+from app.repositories.chat_message import ChatMessageRepository
+from app.services.chat_message import ChatMessageService
+
+expired_month = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+async def expired_partition(db_session: AsyncSession):
+    await create_monthly_partitions(db_session, ChatMessage.__tablename__, expired_month, months=1)
+    await db_session.commit()
+
+    yield "chat_message_p202001"
+
+    await db_session.execute(text('DROP TABLE IF EXISTS "chat_message_p202001"'))
+    await db_session.commit()
+
+
+async def insert_message(db_session: AsyncSession, chat_session: ChatSession, created_at: datetime, faker: Faker):
+    chat_session.message_count += 1
+    chat_session.last_message_seq += 1
+
+    await db_session.execute(
+        insert(ChatMessage).values(
+            session_id=chat_session.id,
+            seq=chat_session.last_message_seq,
+            sender=faker.enum(SenderTypeEnum),
+            content=faker.pystr(),
+            token_count=1,
+            created_at=created_at,
+        ),
+    )
+    await db_session.commit()
+
+
+async def test_creates_partitions_ahead(db_session: AsyncSession):
+    created, removed = await ChatMessageService(db_session).maintain_partitions(months_ahead=3)
+
+    partitions = {partition.name for partition in await get_partitions(db_session, ChatMessage.__tablename__)}
+
+    assert f"chat_message_p{month_start(datetime.now(UTC), 3):%Y%m}" in created
+    assert set(created) <= partitions
+    assert not removed
+
+
+async def test_drops_expired_partitions_and_updates_message_count(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+    expired_partition: str,
+):
+    await insert_message(db_session, chat_session, datetime(2020, 1, 15, tzinfo=UTC), faker)
+    await insert_message(db_session, chat_session, datetime.now(UTC), faker)
+
+    _, removed = await ChatMessageService(db_session).maintain_partitions(months_ahead=0, retention_months=12)
+
+    assert removed == [expired_partition]
+    assert await db_session.scalar(select(func.count()).select_from(ChatMessage)) == 1
+
+    await db_session.refresh(chat_session)
+    assert chat_session.message_count == 1
+
+
+async def test_clears_last_message_preview_if_all_messages_expired(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+    expired_partition: str,
+):
+    chat_session.last_message_preview = faker.pystr()
+    await insert_message(db_session, chat_session, datetime(2020, 1, 15, tzinfo=UTC), faker)
+
+    await ChatMessageService(db_session).maintain_partitions(months_ahead=0, retention_months=12)
+
+    await db_session.refresh(chat_session)
+    assert (chat_session.message_count, chat_session.last_message_preview) == (0, None)
+
+
+async def test_deletes_cited_documents_of_expired_messages(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+    expired_partition: str,
+):
+    await insert_message(db_session, chat_session, datetime(2020, 1, 15, tzinfo=UTC), faker)
+    await db_session.execute(
+        insert(ChatMessageDocument).values(
+            id=faker.uuid4(cast_to=None),
+            doc_id=faker.uuid4(),
+            message_id=faker.uuid4(cast_to=None),
+            session_id=chat_session.id,
+            created_at=datetime(2020, 1, 15, tzinfo=UTC),
+        ),
+    )
+    message = await ChatMessageRepository(db_session).create(
+        {
+            "session_id": chat_session.id,
+            "sender": SenderTypeEnum.USER,
+            "content": faker.pystr(),
+            "context": {},
+            "document_ids": ["a"],
+        },
+    )
+
+    await ChatMessageService(db_session).maintain_partitions(months_ahead=0, retention_months=12)
+
+    result = await db_session.scalars(select(ChatMessageDocument.message_id))
+    assert result.all() == [message.id]
+
+
+async def test_detaches_expired_partitions(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+    expired_partition: str,
+):
+    await insert_message(db_session, chat_session, datetime(2020, 1, 15, tzinfo=UTC), faker)
+
+    await ChatMessageRepository(db_session).drop_partitions(month_start(expired_month, 1), detach_only=True)
+
+    assert not await db_session.scalar(select(func.count()).select_from(ChatMessage))
+    assert await db_session.scalar(text(f'SELECT count(*) FROM "{expired_partition}"')) == 1
+
+
+async def test_session_messages_query_skips_partitions_older_than_session(
+    db_session: AsyncSession,
+    chat_session: ChatSession,
+    expired_partition: str,
+):
+    stmt = ChatMessageRepository(db_session).get_session_query(chat_session.id)
+    compiled = stmt.compile(dialect=(await db_session.connection()).dialect, compile_kwargs={"literal_binds": True})
+
+    plan = "\n".join((await db_session.execute(text(f"EXPLAIN (ANALYZE, COSTS OFF) {compiled}"))).scalars())
+
+    assert next(line for line in plan.splitlines() if expired_partition in line).endswith("(never executed)")
+
+
+async def get_column_compression(db_session: AsyncSession) -> set[tuple[str, str, str]]:
+    result = await db_session.execute(
+        text(
+            """
+            SELECT attrelid::regclass::text, attname, attcompression::text
+            FROM pg_attribute
+            WHERE attname IN ('content', 'context')
+                AND attrelid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'chat_message'::regclass)
+            """,
+        ),
+    )
+
+    return set(result.tuples().all())
+
+
+async def test_sets_compression_of_existing_partitions(db_session: AsyncSession, expired_partition: str):
+    service = ChatMessageService(db_session)
+
+    altered = await service.set_compression(ToastCompressionEnum.PGLZ)
+
+    try:
+        assert ChatMessage.__tablename__ in altered
+        assert expired_partition in altered
+        assert {compression for *_, compression in await get_column_compression(db_session)} == {"p"}
+        assert not await service.set_compression(ToastCompressionEnum.PGLZ)
+
+        await create_monthly_partitions(db_session, ChatMessage.__tablename__, datetime(2019, 1, 1, tzinfo=UTC), 1)
+        # New partitions inherit the compression of the table
+        assert {compression for *_, compression in await get_column_compression(db_session)} == {"p"}
+
+    finally:
+        await service.set_compression(None)
+        await db_session.execute(text('DROP TABLE IF EXISTS "chat_message_p201901"'))
+        await db_session.commit()
+
+    assert {compression for *_, compression in await get_column_compression(db_session)} == {""}
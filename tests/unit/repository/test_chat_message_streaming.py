@@ -0,0 +1,64 @@
+import asyncio
+
+from faker import Faker
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.enums import SenderTypeEnum
+from app.models import ChatMessage, ChatMessageChunk, ChatSession
+from app.repositories.chat_message import ChatMessageRepository
+
+
+async def create_streaming_message(db_session: AsyncSession, faker: Faker, chat_session: ChatSession) -> ChatMessage:
+    return await ChatMessageRepository(db_session).create(
+        {
+            "session_id": chat_session.id,
+            "sender": faker.enum(SenderTypeEnum),
+            "content": "",
+            "context": {},
+            "is_streaming": True,
+        },
+    )
+
+
+async def test_appends_concurrently_in_order_of_commits(
+    db_session: AsyncSession,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    message = await create_streaming_message(db_session, faker, chat_session)
+
+    async with db_session_maker() as first_session, db_session_maker() as second_session:
+        await ChatMessageRepository(first_session).append_content(chat_session.id, message.id, "a", autocommit=False)
+
+        # The second append waits for the first one to commit, and takes the next position
+        second_append = asyncio.create_task(
+            ChatMessageRepository(second_session).append_content(chat_session.id, message.id, "b")
+        )
+        await asyncio.sleep(0.2)
+        await first_session.commit()
+
+        assert await second_append == 2
+
+    finalized = await ChatMessageRepository(db_session).finalize(chat_session.id, message.id)
+
+    assert finalized.content == "ab"
+    assert not finalized.is_streaming
+
+
+async def test_deletes_chunks_with_message(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    repository = ChatMessageRepository(db_session)
+    message = await create_streaming_message(db_session, faker, chat_session)
+    other_message = await create_streaming_message(db_session, faker, chat_session)
+
+    for obj in (message, other_message):
+        await repository.append_content(chat_session.id, obj.id, faker.pystr())
+
+    await repository.delete(message.id)
+
+    assert (await db_session.scalars(select(ChatMessageChunk.message_id))).all() == [other_message.id]
@@ -0,0 +1,58 @@
+import pytest
+from faker import Faker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.enums import SenderTypeEnum
+from app.models import ChatSession
+from app.repositories.chat_message import ChatMessageRepository
+
+
+def build_message_data(faker: Faker, chat_session: ChatSession, content: str | None = None) -> dict:
+    return {
+        "session_id": chat_session.id,
+        "sender": faker.enum(SenderTypeEnum),
+        "content": content or faker.pystr(),
+        "context": {},
+    }
+
+
+async def test_updates_session_activity_with_message_inserts(
+    db_session: AsyncSession,
+    faker: Faker,
+    monkeypatch: pytest.MonkeyPatch,
+    chat_session: ChatSession,
+):
+    monkeypatch.setattr(config, "session_preview_length", 10)
+    created_at = chat_session.last_activity_at
+
+    messages = await ChatMessageRepository(db_session).create_many(
+        [build_message_data(faker, chat_session) for _ in range(2)]
+        + [build_message_data(faker, chat_session, "a" * 20)],
+    )
+
+    await db_session.refresh(chat_session)
+    assert chat_session.message_count == 3
+    assert chat_session.last_activity_at == messages[-1].created_at > created_at
+    assert chat_session.last_message_preview == "a" * 10
+
+
+async def test_updates_session_preview_with_message_deletes(
+    db_session: AsyncSession,
+    faker: Faker,
+    chat_session: ChatSession,
+):
+    repository = ChatMessageRepository(db_session)
+    first_message, second_message = await repository.create_many(
+        [build_message_data(faker, chat_session) for _ in range(2)],
+    )
+
+    await repository.delete(second_message.id)
+
+    await db_session.refresh(chat_session)
+    assert (chat_session.message_count, chat_session.last_message_preview) == (1, first_message.content)
+
+    await repository.delete(first_message.id)
+
+    await db_session.refresh(chat_session)
+    assert (chat_session.message_count, chat_session.last_message_preview) == (0, None)
@@ -30,3 +30,14 @@ async def test_creates_and_returns_uncommited_model_object_if_autocommit_false(
 
     assert result.id
     assert not db_obj
+
+
+async def test_creates_model_object_in_single_statement(
+    faker: Faker,
+    test_repository: TestRepository,
+    executed_statements: list[str],
+):
+    await test_repository.create(obj_data={"title": faker.pystr()})
+
+    assert len(executed_statements) == 1
+    assert executed_statements[0].startswith("INSERT")
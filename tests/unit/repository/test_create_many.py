@@ -0,0 +1,33 @@
+from faker import Faker
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.unit.fixtures import TestModel, TestRepository
+
+
+async def test_creates_and_returns_model_objects_in_order(
+    db_session: AsyncSession,
+    faker: Faker,
+    test_repository: TestRepository,
+    executed_statements: list[str],
+):
+    titles = [faker.pystr() for _ in range(3)]
+
+    result: list[TestModel] = await test_repository.create_many(objs_data=[{"title": title} for title in titles])
+
+    assert len(executed_statements) == 1
+
+    db_objs = (await db_session.scalars(select(TestModel))).all()
+
+    assert [i.title for i in result] == titles
+    assert {i.id for i in db_objs} == {i.id for i in result}
+
+
+async def test_returns_empty_list_if_no_objects_provided(
+    test_repository: TestRepository,
+    executed_statements: list[str],
+):
+    result = await test_repository.create_many(objs_data=[])
+
+    assert not result
+    assert not executed_statements
@@ -41,3 +41,25 @@ async def test_returns_not_found_error_if_model_object_not_exists(
 ):
     with pytest.raises(NotFoundError):
         await test_repository.delete(obj_id=faker.uuid4(cast_to=None))
+
+
+async def test_deletes_model_object_in_single_statement(
+    test_repository: TestRepository,
+    test_object: TestModel,
+    executed_statements: list[str],
+):
+    await test_repository.delete(obj_id=test_object.id)
+
+    assert len(executed_statements) == 1
+    assert executed_statements[0].startswith("DELETE")
+
+
+async def test_detects_not_existing_model_object_in_single_statement(
+    faker: Faker,
+    test_repository: TestRepository,
+    executed_statements: list[str],
+):
+    with pytest.raises(NotFoundError):
+        await test_repository.delete(obj_id=faker.uuid4(cast_to=None))
+
+    assert len(executed_statements) == 1
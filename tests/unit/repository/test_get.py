@@ -28,3 +28,12 @@ async def test_returns_none_if_object_not_exists_and_raise_error_false(
 ):
     result = await test_repository.get(obj_id=faker.uuid4(cast_to=None), raise_error=False)
     assert not result
+
+
+async def test_returns_row_with_requested_fields(
+    test_repository: TestRepository,
+    test_object: TestModel,
+):
+    result = await test_repository.get(obj_id=test_object.id, fields=["title"])
+
+    assert result._asdict() == {"title": test_object.title}
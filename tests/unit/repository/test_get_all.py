@@ -1,5 +1,8 @@
+from fastapi_pagination.api import set_params
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.enums import TotalModeEnum
+from app.core.pagination import Page
 from tests.unit.fixtures import TestFactory, TestModel, TestRepository
 
 
@@ -19,3 +22,58 @@ async def test_returns_model_objects_if_raw_result(
 async def test_returns_empty_list_if_objects_not_exist_and_raw_result(test_repository: TestRepository):
     result: list[TestModel] = await test_repository.get_all(raw_result=True)
     assert not result
+
+
+async def test_returns_page_with_exact_total(
+    db_session: AsyncSession,
+    test_repository: TestRepository,
+):
+    size = 3
+    await TestFactory.provide(db_session).create_batch(size=size)
+
+    with set_params(Page.__params_type__(page=1, size=2)):
+        result = await test_repository.get_all(total_mode=TotalModeEnum.EXACT)
+
+    assert len(result.items) == 2
+    assert result.total == size
+    assert result.pages == 2
+    assert result.has_next
+
+
+async def test_returns_page_without_total(
+    db_session: AsyncSession,
+    test_repository: TestRepository,
+):
+    await TestFactory.provide(db_session).create_batch(size=2)
+
+    with set_params(Page.__params_type__(page=1, size=2)):
+        result = await test_repository.get_all(total_mode=TotalModeEnum.NONE)
+
+    assert len(result.items) == 2
+    assert result.total is None
+    assert result.total_mode == TotalModeEnum.NONE
+    assert not result.has_next
+
+
+async def test_returns_page_with_estimated_total(
+    db_session: AsyncSession,
+    test_repository: TestRepository,
+):
+    await TestFactory.provide(db_session).create_batch(size=2)
+
+    with set_params(Page.__params_type__(page=1, size=2)):
+        result = await test_repository.get_all(total_mode=TotalModeEnum.ESTIMATE)
+
+    assert result.total >= 0
+    assert result.total_mode == TotalModeEnum.ESTIMATE
+
+
+async def test_returns_rows_with_requested_fields_if_raw_result(
+    db_session: AsyncSession,
+    test_repository: TestRepository,
+):
+    objects = await TestFactory.provide(db_session).create_batch(size=2)
+
+    result = await test_repository.get_all(raw_result=True, fields=["id"])
+
+    assert sorted(i._asdict()["id"] for i in result) == sorted(i.id for i in objects)
@@ -55,3 +55,15 @@ async def test_returns_not_found_error_if_model_object_not_exists(
             obj_id=faker.uuid4(cast_to=None),
             obj_data={"title": faker.pystr()},
         )
+
+
+async def test_updates_model_object_in_single_statement(
+    faker: Faker,
+    test_repository: TestRepository,
+    test_object: TestModel,
+    executed_statements: list[str],
+):
+    await test_repository.update(obj_id=test_object.id, obj_data={"title": faker.pystr()})
+
+    assert len(executed_statements) == 1
+    assert executed_statements[0].startswith("UPDATE")
@@ -0,0 +1,38 @@
+from faker import Faker
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.unit.fixtures import TestModel, TestRepository
+
+
+async def test_creates_model_object_with_supplied_id(
+    db_session: AsyncSession,
+    faker: Faker,
+    test_repository: TestRepository,
+    executed_statements: list[str],
+):
+    obj_id = faker.uuid4(cast_to=None)
+
+    result, created = await test_repository.upsert(obj_data={"id": obj_id, "title": faker.pystr()})
+
+    assert len(executed_statements) == 1
+    assert created
+    assert result.id == obj_id
+    assert (await db_session.scalar(select(TestModel))).id == obj_id
+
+
+async def test_returns_stored_model_object_if_id_exists(
+    db_session: AsyncSession,
+    faker: Faker,
+    test_repository: TestRepository,
+):
+    obj_id = faker.uuid4(cast_to=None)
+    title = faker.pystr()
+
+    await test_repository.upsert(obj_data={"id": obj_id, "title": title})
+    result, created = await test_repository.upsert(obj_data={"id": obj_id, "title": faker.pystr()})
+
+    assert not created
+    assert result.id == obj_id
+    assert result.title == title
+    assert await db_session.scalar(select(func.count()).select_from(TestModel)) == 1